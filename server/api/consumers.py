@@ -0,0 +1,46 @@
+# server/api/consumers.py
+# WebSocket consumers, routed in api/routing.py
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .services.realtime import RealtimePublisher
+from .services.unread_counter import UnreadCounter
+
+
+class EventsConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Per-user push channel for notifications, messages and the unread badge
+
+    Connect to /ws/events/?token=<auth token> (or with a session cookie). The
+    current unread count is sent right after the connection is accepted, and
+    events published by RealtimePublisher follow.
+    """
+
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group_name = RealtimePublisher.user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        # Also warms the counter, so later adjustments are pushed to this connection
+        count = await database_sync_to_async(UnreadCounter.get)(user.id)
+        await self.send_json({'type': 'unread_count', 'count': count})
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Keepalive for proxies that drop idle connections
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def push(self, event):
+        await self.send_json(event['payload'])
@@ -0,0 +1,44 @@
+# server/api/management/commands/backfill_conversations.py
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from api.models import Message
+from api.services.conversation_service import ConversationService
+
+
+class Command(BaseCommand):
+    help = 'Build Conversation threads (last message, unread counts) from existing messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Messages read per query',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        seen = set()
+        scanned = 0
+        last = None
+
+        # Keyset pagination over (timestamp, id); each new pair is rebuilt once from its messages
+        while True:
+            messages = Message.objects.order_by('timestamp', 'id')
+            if last is not None:
+                messages = messages.filter(Q(timestamp__gt=last[0]) | Q(timestamp=last[0], id__gt=last[1]))
+            batch = list(messages.values_list('timestamp', 'id', 'sender_id', 'receiver_id')[:batch_size])
+            if not batch:
+                break
+
+            for _, _, sender_id, receiver_id in batch:
+                key = ConversationService.key(sender_id, receiver_id)
+                if key not in seen:
+                    seen.add(key)
+                    ConversationService.refresh(sender_id, receiver_id)
+
+            scanned += len(batch)
+            last = batch[-1][:2]
+            self.stdout.write(f"Scanned {scanned} messages, {len(seen)} conversations")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {len(seen)} conversations from {scanned} messages"))
@@ -0,0 +1,64 @@
+# server/api/management/commands/manage_metric_partitions.py
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.services.partition_service import PartitionManager
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly metrics partitions and drop or detach expired ones (Postgres only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='Months of future partitions to keep (defaults to METRICS_PARTITIONS)',
+        )
+        parser.add_argument(
+            '--expire-before',
+            help='Expire partitions that end on or before this date (YYYY-MM-DD); '
+                 'defaults to each table\'s retention_days',
+        )
+        parser.add_argument(
+            '--detach',
+            action='store_true',
+            help='Detach expired partitions as standalone tables instead of dropping them',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List existing partitions without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        expire_before = None
+        if options['expire_before']:
+            expire_before = datetime.strptime(options['expire_before'], '%Y-%m-%d').date()
+
+        for manager in PartitionManager.all():
+            if not manager.is_partitioned():
+                self.stdout.write(self.style.WARNING(f"{manager.table} is not partitioned, skipping"))
+                continue
+
+            if options['dry_run']:
+                months = manager.existing_months()
+                self.stdout.write(
+                    f"{manager.table}: {len(months)} partitions"
+                    + (f" ({months[0]:%Y-%m} to {months[-1]:%Y-%m})" if months else "")
+                )
+                continue
+
+            created = manager.ensure_partitions(options['months_ahead'])
+            for name in created:
+                self.stdout.write(f"Created {name}")
+
+            cutoff = expire_before
+            if cutoff is None and manager.config['retention_days'] is not None:
+                cutoff = timezone.now().date() - timedelta(days=manager.config['retention_days'])
+            if cutoff is not None:
+                for name in manager.expire_partitions(cutoff, detach=options['detach']):
+                    self.stdout.write(f"{'Detached' if options['detach'] else 'Dropped'} {name}")
+
+        self.stdout.write(self.style.SUCCESS('Partition maintenance complete'))
@@ -0,0 +1,40 @@
+# server/api/management/commands/rotate_token_encryption.py
+from django.core.management.base import BaseCommand
+from api.models import SocialMediaAccount
+from api.utils import crypto
+
+
+class Command(BaseCommand):
+    help = 'Re-encrypt stored OAuth tokens with the current ENCRYPTION_KEY (old keys go in ENCRYPTION_KEY_FALLBACKS)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Accounts updated per query',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        rotated = 0
+
+        accounts = SocialMediaAccount.objects.only('id', 'access_token', 'refresh_token')
+        for account in accounts.iterator(chunk_size=batch_size):
+            if account.access_token:
+                account.access_token = crypto.rotate(account.access_token)
+            if account.refresh_token:
+                account.refresh_token = crypto.rotate(account.refresh_token)
+            batch.append(account)
+
+            if len(batch) >= batch_size:
+                SocialMediaAccount.objects.bulk_update(batch, ['access_token', 'refresh_token'])
+                rotated += len(batch)
+                batch = []
+
+        if batch:
+            SocialMediaAccount.objects.bulk_update(batch, ['access_token', 'refresh_token'])
+            rotated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rotated tokens for {rotated} accounts"))
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SNAPSHOT_FIELDS = [
+    "date", "followers_count", "following_count", "posts_count",
+    "engagement_rate", "reach", "impressions", "profile_views",
+    "website_clicks", "daily_growth",
+]
+
+
+def backfill_snapshots(apps, schema_editor):
+    """Seed one snapshot per account from its newest RealTimeMetrics row"""
+    RealTimeMetrics = apps.get_model("api", "RealTimeMetrics")
+    AccountMetricsSnapshot = apps.get_model("api", "AccountMetricsSnapshot")
+
+    if schema_editor.connection.vendor == "postgresql":
+        latest_rows = RealTimeMetrics.objects.order_by("account_id", "-date").distinct("account_id")
+    else:
+        # DISTINCT ON is Postgres-only; (account, date) is unique, so matching the newest date picks one row
+        newest_date = (
+            RealTimeMetrics.objects.filter(account_id=models.OuterRef("account_id"))
+            .order_by("-date")
+            .values("date")[:1]
+        )
+        latest_rows = RealTimeMetrics.objects.filter(date=models.Subquery(newest_date))
+    latest_rows = latest_rows.values("account_id", *SNAPSHOT_FIELDS)
+
+    batch = []
+    for row in latest_rows.iterator(chunk_size=2000):
+        batch.append(AccountMetricsSnapshot(**row))
+        if len(batch) >= 2000:
+            AccountMetricsSnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        AccountMetricsSnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0018_client_marketing_agent_client_website_agent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountMetricsSnapshot",
+            fields=[
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="metrics_snapshot",
+                        serialize=False,
+                        to="api.socialmediaaccount",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("followers_count", models.IntegerField(default=0)),
+                ("following_count", models.IntegerField(default=0)),
+                ("posts_count", models.IntegerField(default=0)),
+                (
+                    "engagement_rate",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                ("reach", models.IntegerField(default=0)),
+                ("impressions", models.IntegerField(default=0)),
+                ("profile_views", models.IntegerField(default=0)),
+                ("website_clicks", models.IntegerField(default=0)),
+                ("daily_growth", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0019_accountmetricssnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SocialSyncState",
+            fields=[
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="sync_state",
+                        serialize=False,
+                        to="api.socialmediaaccount",
+                    ),
+                ),
+                (
+                    "profile_etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="ETag of the last channel/profile response",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "profile_hash",
+                    models.CharField(
+                        blank=True,
+                        help_text="Hash of the last stored profile payload",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "posts_etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="ETag of the last post listing response",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "stats_etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="ETag of the last video statistics response",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "recent_post_ids",
+                    models.JSONField(
+                        default=list,
+                        help_text="Post ids from the last listing response",
+                    ),
+                ),
+                (
+                    "last_post_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Publish time of the newest synced post",
+                        null=True,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
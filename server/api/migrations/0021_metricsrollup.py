@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0020_socialsyncstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricsRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("week", "Week"), ("month", "Month")], max_length=10
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("followers_count", models.IntegerField(default=0)),
+                ("following_count", models.IntegerField(default=0)),
+                ("posts_count", models.IntegerField(default=0)),
+                (
+                    "engagement_rate",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                ("reach", models.BigIntegerField(default=0)),
+                ("impressions", models.BigIntegerField(default=0)),
+                ("profile_views", models.BigIntegerField(default=0)),
+                ("website_clicks", models.BigIntegerField(default=0)),
+                ("follower_growth", models.IntegerField(default=0)),
+                ("days_covered", models.PositiveSmallIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metrics_rollups",
+                        to="api.socialmediaaccount",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-period_start"],
+                "unique_together": {("account", "period", "period_start")},
+            },
+        ),
+    ]
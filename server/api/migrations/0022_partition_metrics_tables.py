@@ -0,0 +1,103 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:00
+#
+# Converts api_realtimemetrics to a monthly range-partitioned table (by date)
+# on Postgres. Partitioned tables need the partition key in every unique
+# constraint, so the primary key becomes (id, date) in the database; the
+# (account, date) unique key already includes it. Other backends keep a plain
+# table.
+#
+# api_postmetrics stays a plain table: partitioning it by posted_at would put
+# posted_at into its unique key, and a YouTube video's publish time changes
+# when it goes public, so the (account, post_id) upserts would insert a
+# second row instead of updating the first.
+
+from datetime import date
+
+from django.db import migrations
+
+
+# table, partition column, column type, unique columns
+PARTITIONED_TABLES = [
+    ("api_realtimemetrics", "date", "date", ["account_id", "date"]),
+]
+
+# Partitions created beyond the current month at migration time
+MONTHS_AHEAD = 3
+
+
+def add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def add_constraints(cursor, table, column, unique_columns, primary_key):
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({primary_key})')
+    cursor.execute(
+        f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{"_".join(unique_columns)}_uniq" '
+        f'UNIQUE ({", ".join(unique_columns)})'
+    )
+    cursor.execute(
+        f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_account_id_fk" FOREIGN KEY (account_id) '
+        f'REFERENCES api_socialmediaaccount (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+    cursor.execute(f'CREATE INDEX "{table}_account_id_idx" ON "{table}" (account_id)')
+    cursor.execute(f'CREATE INDEX "{table}_{column}_idx" ON "{table}" ({column})')
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, column, column_type, unique_columns in PARTITIONED_TABLES:
+            cursor.execute(
+                f'CREATE TABLE "{table}_partitioned" (LIKE "{table}" INCLUDING DEFAULTS) '
+                f"PARTITION BY RANGE ({column})"
+            )
+
+            cursor.execute(f'SELECT min({column}), max({column}) FROM "{table}"')
+            first, last = cursor.fetchone()
+            today = date.today().replace(day=1)
+            month = (first.date() if hasattr(first, "date") else first).replace(day=1) if first else today
+            last_month = (last.date() if hasattr(last, "date") else last).replace(day=1) if last else today
+            end = max(add_months(today, MONTHS_AHEAD), last_month)
+
+            while month <= end:
+                lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+                if column_type == "timestamptz":
+                    lower, upper = f"{lower} 00:00:00+00", f"{upper} 00:00:00+00"
+                cursor.execute(
+                    f'CREATE TABLE "{table}_p{month.year}_{month.month:02d}" '
+                    f'PARTITION OF "{table}_partitioned" FOR VALUES FROM (%s) TO (%s)',
+                    [lower, upper],
+                )
+                month = add_months(month, 1)
+            cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}_partitioned" DEFAULT')
+
+            cursor.execute(f'INSERT INTO "{table}_partitioned" SELECT * FROM "{table}"')
+            cursor.execute(f'DROP TABLE "{table}"')
+            cursor.execute(f'ALTER TABLE "{table}_partitioned" RENAME TO "{table}"')
+            add_constraints(cursor, table, column, unique_columns, f"id, {column}")
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, column, column_type, unique_columns in PARTITIONED_TABLES:
+            cursor.execute(f'CREATE TABLE "{table}_plain" (LIKE "{table}" INCLUDING DEFAULTS)')
+            cursor.execute(f'INSERT INTO "{table}_plain" SELECT * FROM "{table}"')
+            cursor.execute(f'DROP TABLE "{table}" CASCADE')
+            cursor.execute(f'ALTER TABLE "{table}_plain" RENAME TO "{table}"')
+            add_constraints(cursor, table, column, unique_columns, "id")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0021_metricsrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
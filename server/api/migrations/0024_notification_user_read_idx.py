@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0023_emailoutbox"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "read", "-created_at"], name="notification_user_read_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0024_notification_user_read_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="event_count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="group_key",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(
+                    ("read", False), models.Q(("group_key", ""), _negated=True)
+                ),
+                fields=["user", "group_key"],
+                name="notification_coalesce_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="NotificationDigest",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("group_key", models.CharField(max_length=100)),
+                (
+                    "notification_type",
+                    models.CharField(
+                        choices=[
+                            ("task_assigned", "Task Assigned"),
+                            ("task_completed", "Task Completed"),
+                            ("task_overdue", "Task Overdue"),
+                            ("payment_due", "Payment Due"),
+                            ("payment_received", "Payment Received"),
+                            ("payment_verification", "Payment Verification"),
+                            ("invoice_created", "Invoice Created"),
+                            ("invoice_overdue", "Invoice Overdue"),
+                            ("invoice_reminder", "Invoice Reminder"),
+                            ("content_submitted", "Content Submitted"),
+                            ("content_approved", "Content Approved"),
+                            ("content_rejected", "Content Rejected"),
+                            ("content_posted", "Content Posted"),
+                            ("message_received", "Message Received"),
+                            ("website_phase_completed", "Website Phase Completed"),
+                            ("website_demo_ready", "Website Demo Ready"),
+                            ("course_enrollment", "Course Enrollment"),
+                            ("course_completed", "Course Completed"),
+                            ("subscription_activated", "Subscription Activated"),
+                            ("subscription_created", "Subscription Created"),
+                            ("subscription_cancelled", "Subscription Cancelled"),
+                            ("subscription_renewal", "Subscription Renewal"),
+                            ("user_registered", "User Registered"),
+                            ("performance_update", "Performance Update"),
+                            ("general", "General"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("source_name", models.CharField(blank=True, max_length=255)),
+                ("event_count", models.PositiveIntegerField(default=1)),
+                ("previews", models.JSONField(default=list)),
+                ("send_after", models.DateTimeField()),
+                (
+                    "created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notification_digests",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["send_after"],
+                "indexes": [
+                    models.Index(
+                        fields=["send_after"], name="notificationdigest_due_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "group_key"), name="unique_notification_digest"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0026_conversations"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contentpost",
+            index=models.Index(
+                fields=["client", "-scheduled_date", "-id"], name="contentpost_client_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contentpost",
+            index=models.Index(
+                fields=["-scheduled_date", "-id"], name="contentpost_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["sender", "-timestamp", "-id"], name="message_sender_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["receiver", "-timestamp", "-id"], name="message_receiver_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notification_user_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="synclog",
+            index=models.Index(
+                fields=["account", "-started_at", "-id"], name="synclog_account_feed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["wallet", "-created_at", "-id"], name="transaction_wallet_feed_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0027_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="clientservicesettings",
+            index=models.Index(
+                condition=models.Q(("assigned_agent__isnull", False)),
+                fields=["service_type", "client"],
+                name="service_assigned_agent_idx",
+            ),
+        ),
+    ]
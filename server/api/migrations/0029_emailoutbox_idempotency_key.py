@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0028_service_assigned_agent_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailoutbox",
+            name="idempotency_key",
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+    ]
@@ -2,13 +2,14 @@
 # Django Models for SMMA Dashboard System
 
 from django.db import models
+from django.db.models.functions import Concat
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
-from cryptography.fernet import Fernet
-from django.conf import settings
 import uuid
 import json
 
+from .utils import crypto
+
 class User(AbstractUser):
     """Extended User model with role-based access"""
     ROLE_CHOICES = [
@@ -92,13 +93,21 @@ class SocialMediaAccount(models.Model):
 
     def encrypt_token(self, token):
         """Encrypt access token"""
-        f = Fernet(settings.ENCRYPTION_KEY.encode())
-        return f.encrypt(token.encode()).decode()
+        return crypto.encrypt(token)
 
     def decrypt_token(self, encrypted_token):
         """Decrypt access token"""
-        f = Fernet(settings.ENCRYPTION_KEY.encode())
-        return f.decrypt(encrypted_token.encode()).decode()
+        return crypto.decrypt(encrypted_token)
+
+    def get_access_token(self):
+        """Decrypted access token, served from the short-TTL credential cache"""
+        return crypto.decrypt_cached(self.id, 'access_token', self.access_token)
+
+    def get_refresh_token(self):
+        """Decrypted refresh token, or None when the account has none"""
+        if not self.refresh_token:
+            return None
+        return crypto.decrypt_cached(self.id, 'refresh_token', self.refresh_token)
 
     def save(self, *args, **kwargs):
         if self.access_token and not self.access_token.startswith('gAAAAA'):  # Not encrypted
@@ -127,6 +136,108 @@ class RealTimeMetrics(models.Model):
         unique_together = ['account', 'date']
         ordering = ['-date']
 
+
+class AccountMetricsSnapshot(models.Model):
+    """Denormalized copy of the newest RealTimeMetrics row for each account"""
+    SNAPSHOT_FIELDS = [
+        'date', 'followers_count', 'following_count', 'posts_count',
+        'engagement_rate', 'reach', 'impressions', 'profile_views',
+        'website_clicks', 'daily_growth',
+    ]
+
+    account = models.OneToOneField(
+        SocialMediaAccount,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='metrics_snapshot'
+    )
+    date = models.DateField()
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    posts_count = models.IntegerField(default=0)
+    engagement_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    reach = models.IntegerField(default=0)
+    impressions = models.IntegerField(default=0)
+    profile_views = models.IntegerField(default=0)
+    website_clicks = models.IntegerField(default=0)
+    daily_growth = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Snapshot for {self.account.username} ({self.date})"
+
+    @classmethod
+    def update_from_metrics(cls, metrics):
+        """Copy a RealTimeMetrics row into the snapshot unless a newer day is already stored"""
+        values = {field: getattr(metrics, field) for field in cls.SNAPSHOT_FIELDS}
+        values['updated_at'] = timezone.now()
+        updated = cls.objects.filter(
+            account_id=metrics.account_id,
+            date__lte=metrics.date
+        ).update(**values)
+        if not updated:
+            cls.objects.get_or_create(account_id=metrics.account_id, defaults=values)
+
+
+class SocialSyncState(models.Model):
+    """Incremental sync cursor and conditional-request validators for an account"""
+    account = models.OneToOneField(
+        SocialMediaAccount,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='sync_state'
+    )
+    profile_etag = models.CharField(max_length=255, blank=True, help_text='ETag of the last channel/profile response')
+    profile_hash = models.CharField(max_length=64, blank=True, help_text='Hash of the last stored profile payload')
+    posts_etag = models.CharField(max_length=255, blank=True, help_text='ETag of the last post listing response')
+    stats_etag = models.CharField(max_length=255, blank=True, help_text='ETag of the last video statistics response')
+    recent_post_ids = models.JSONField(default=list, help_text='Post ids from the last listing response')
+    last_post_at = models.DateTimeField(blank=True, null=True, help_text='Publish time of the newest synced post')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Sync state for {self.account.username}"
+
+    @classmethod
+    def for_account(cls, account):
+        state, _ = cls.objects.get_or_create(account=account)
+        return state
+
+
+class MetricsRollup(models.Model):
+    """Weekly or monthly downsample of RealTimeMetrics, kept after daily rows expire"""
+    PERIOD_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    account = models.ForeignKey(SocialMediaAccount, on_delete=models.CASCADE, related_name='metrics_rollups')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    # Point-in-time counts are taken from the last day in the period
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    posts_count = models.IntegerField(default=0)
+    # Averaged over the days in the period
+    engagement_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    # Summed over the days in the period
+    reach = models.BigIntegerField(default=0)
+    impressions = models.BigIntegerField(default=0)
+    profile_views = models.BigIntegerField(default=0)
+    website_clicks = models.BigIntegerField(default=0)
+    follower_growth = models.IntegerField(default=0)
+    days_covered = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['account', 'period', 'period_start']
+        ordering = ['-period_start']
+
+    def __str__(self):
+        return f"{self.account.username} {self.period} of {self.period_start}"
+
+
 class PostMetrics(models.Model):
     """Individual post metrics from social media platforms"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -149,6 +260,43 @@ class PostMetrics(models.Model):
         unique_together = ['account', 'post_id']
         ordering = ['-posted_at']
 
+class ClientQuerySet(models.QuerySet):
+    def _service_agent(self, service_type):
+        return ClientServiceSettings.objects.filter(
+            client=models.OuterRef('pk'),
+            service_type=service_type,
+            assigned_agent__isnull=False
+        )
+
+    def with_classification(self):
+        """
+        Annotate what ClientSerializer reads, so a list costs a fixed number of queries
+
+        The has_*/client_type/needs_* properties and the service agent
+        properties use these annotations when present.
+        """
+        agent_name = Concat(
+            'assigned_agent__user__first_name', models.Value(' '), 'assigned_agent__user__last_name',
+            output_field=models.CharField()
+        )
+        return self.annotate(
+            _has_social_accounts=models.Exists(
+                SocialMediaAccount.objects.filter(client=models.OuterRef('pk'), is_active=True)
+            ),
+            _has_website_projects=models.Exists(
+                WebsiteProject.objects.filter(client=models.OuterRef('pk'))
+            ),
+            _marketing_agent_id=models.Subquery(self._service_agent('marketing').values('assigned_agent_id')[:1]),
+            _marketing_agent_name=models.Subquery(
+                self._service_agent('marketing').annotate(agent_name=agent_name).values('agent_name')[:1]
+            ),
+            _website_agent_id=models.Subquery(self._service_agent('website').values('assigned_agent_id')[:1]),
+            _website_agent_name=models.Subquery(
+                self._service_agent('website').annotate(agent_name=agent_name).values('agent_name')[:1]
+            ),
+        ).select_related('user', 'assigned_agent__user').prefetch_related('service_settings__assigned_agent__user')
+
+
 class Client(models.Model):
     """Enhanced Client model with PayPal integration"""
     STATUS_CHOICES = [
@@ -233,31 +381,24 @@ class Client(models.Model):
         help_text='List of active services for this client: marketing, website, courses'
     )
 
+    objects = ClientQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - {self.company} ({self.get_current_plan_display()})"
 
     @property
     def total_followers(self):
         """Calculate total followers across all connected accounts"""
-        from .models import RealTimeMetrics  # Import here to avoid circular import
-        latest_metrics = RealTimeMetrics.objects.filter(
+        return AccountMetricsSnapshot.objects.filter(
             account__client=self
-        ).order_by('account', '-date').distinct('account')
-        return sum(metric.followers_count for metric in latest_metrics)
+        ).aggregate(total=models.Sum('followers_count'))['total'] or 0
 
     @property
     def average_engagement_rate(self):
         """Calculate average engagement rate across all accounts"""
-        from .models import RealTimeMetrics  # Import here to avoid circular import
-        latest_metrics = RealTimeMetrics.objects.filter(
+        return AccountMetricsSnapshot.objects.filter(
             account__client=self
-        ).order_by('account', '-date').distinct('account')
-        
-        if not latest_metrics:
-            return 0
-        
-        total_engagement = sum(metric.engagement_rate for metric in latest_metrics)
-        return total_engagement / len(latest_metrics)
+        ).aggregate(avg=models.Avg('engagement_rate'))['avg'] or 0
 
     @property
     def has_active_subscription(self):
@@ -284,11 +425,15 @@ class Client(models.Model):
     @property
     def has_social_accounts(self):
         """Check if client has connected any social media accounts"""
+        if hasattr(self, '_has_social_accounts'):
+            return self._has_social_accounts
         return self.social_accounts.filter(is_active=True).exists()
 
     @property
     def has_website_projects(self):
         """Check if client has any website projects"""
+        if hasattr(self, '_has_website_projects'):
+            return self._has_website_projects
         return self.website_projects.exists()
 
     @property
@@ -376,6 +521,14 @@ class ClientServiceSettings(models.Model):
     class Meta:
         unique_together = ['client', 'service_type']
         ordering = ['-created_at']
+        indexes = [
+            # Anti-join probe for clients with nobody assigned to a service
+            models.Index(
+                fields=['service_type', 'client'],
+                name='service_assigned_agent_idx',
+                condition=models.Q(assigned_agent__isnull=False)
+            ),
+        ]
         verbose_name = 'Client Service Setting'
         verbose_name_plural = 'Client Service Settings'
 
@@ -403,6 +556,10 @@ class SyncLog(models.Model):
 
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            # Keyset pages of an account's sync history
+            models.Index(fields=['account', '-started_at', '-id'], name='synclog_account_feed_idx'),
+        ]
 
 
 class Task(models.Model):
@@ -498,6 +655,11 @@ class ContentPost(models.Model):
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            # Keyset pages per client, and across clients for admins
+            models.Index(fields=['client', '-scheduled_date', '-id'], name='contentpost_client_feed_idx'),
+            models.Index(fields=['-scheduled_date', '-id'], name='contentpost_feed_idx'),
+        ]
 
 class ContentImage(models.Model):
     """Images for content posts"""
@@ -628,6 +790,49 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Keyset pages of a user's sent and received messages
+            models.Index(fields=['sender', '-timestamp', '-id'], name='message_sender_feed_idx'),
+            models.Index(fields=['receiver', '-timestamp', '-id'], name='message_receiver_feed_idx'),
+        ]
+
+
+class Conversation(models.Model):
+    """Thread between two users, kept in step with Message by ConversationService"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # '<lower user id>:<higher user id>', so each pair has exactly one thread
+    key = models.CharField(max_length=73, unique=True)
+    last_message = models.ForeignKey(
+        Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Conversation {self.key}"
+
+
+class ConversationParticipant(models.Model):
+    """A user's side of a conversation: inbox ordering, unread count and read marker"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='participants')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_memberships')
+    other_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    # Copy of Conversation.last_message_at so the inbox is one index scan
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='unique_conversation_participant'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-last_message_at'], name='conversation_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} in {self.conversation.key}"
 
 class Invoice(models.Model):
     """Invoice management for client billing"""
@@ -817,12 +1022,86 @@ class Notification(models.Model):
     notification_type = models.CharField(max_length=30, choices=NOTIFICATION_TYPES)  # Increased from 20 to 30
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    # Coalesced notifications: '<type>:<source>' and how many events were merged in
+    group_key = models.CharField(max_length=100, blank=True, default='')
+    event_count = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Per-user lists (optionally unread only) newest first, and unread counts
+            models.Index(fields=['user', 'read', '-created_at'], name='notification_user_read_idx'),
+            # Keyset pages of the full list
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_feed_idx'),
+            # Open (unread) coalesced notification lookup
+            models.Index(
+                fields=['user', 'group_key'],
+                name='notification_coalesce_idx',
+                condition=models.Q(read=False) & ~models.Q(group_key=''),
+            ),
+        ]
+
+
+class NotificationDigest(models.Model):
+    """Events waiting to be emailed as one digest per (user, group_key)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_digests')
+    group_key = models.CharField(max_length=100)
+    notification_type = models.CharField(max_length=30, choices=Notification.NOTIFICATION_TYPES)
+    source_name = models.CharField(max_length=255, blank=True)
+    event_count = models.PositiveIntegerField(default=1)
+    previews = models.JSONField(default=list)
+    send_after = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['send_after']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'group_key'], name='unique_notification_digest'),
+        ]
+        indexes = [
+            models.Index(fields=['send_after'], name='notificationdigest_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_key} digest for {self.user.email} ({self.event_count})"
+
+
+class EmailOutbox(models.Model):
+    """Transactional email queued for delivery by the send_email_outbox task"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    provider_id = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    # Key of the send this row went out in; retries repeat it with the same rows
+    idempotency_key = models.CharField(max_length=100, blank=True, db_index=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='emailoutbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
 
 
 class ClientAccessRequest(models.Model):
@@ -1418,6 +1697,10 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of a wallet's history
+            models.Index(fields=['wallet', '-created_at', '-id'], name='transaction_wallet_feed_idx'),
+        ]
 
 
 class WalletAutoRecharge(models.Model):
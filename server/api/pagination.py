@@ -0,0 +1,133 @@
+# server/api/pagination.py
+"""
+Keyset (cursor) pagination for high-volume feeds
+
+PageNumberPagination runs a COUNT(*) and an OFFSET scan on every page, so deep
+pages of a long history get slower and slower. FeedPagination instead
+continues from the (keyset_field, id) pair of the last row it returned, so
+every page is one index range scan of page_size + 1 rows, no matter how deep.
+
+Viewsets opt in with:
+
+    pagination_class = FeedPagination
+    keyset_field = 'created_at'   # newest first; ties broken by id
+
+Responses are {'next': <url or null>, 'previous': null, 'results': [...]}.
+There is no count. Clients follow next until it is null. Requests that still
+send ?page= get the old page-number response, so existing callers keep
+working.
+
+DirectoryPagination is plain page-number pagination with a page_size
+parameter, for bounded listings that are searched and jumped around in.
+"""
+
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Newest-first pagination on (keyset_field, id) with an opaque cursor"""
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 20
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, instance):
+        position = [getattr(instance, self.field).isoformat(), str(instance.pk)]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            value = parse_datetime(value)
+            # UUID or integer depending on the model; a malformed pk must not reach the query
+            pk = model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.field = getattr(view, 'keyset_field', self.keyset_field)
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(f'-{self.field}', '-pk')
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            value, pk = position
+            # field <= value keeps a plain index range scan; only rows tied on value are checked against pk
+            queryset = queryset.filter(**{f'{self.field}__lte': value}).exclude(**{self.field: value, 'pk__gte': pk})
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class FeedPagination(KeysetPagination):
+    """Keyset pagination by default; ?page= falls back to page numbers for older callers"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if PageNumberPagination.page_query_param in request.query_params:
+            self.legacy = PageNumberPagination()
+            return self.legacy.paginate_queryset(queryset, request, view)
+        self.legacy = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class DirectoryPagination(PageNumberPagination):
+    """Page numbers with a client-chosen page size"""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
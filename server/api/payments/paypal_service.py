@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 from ..models import Client, Invoice, User
+from ..utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class PayPalPaymentService:
         self.webhook_id = settings.PAYPAL_WEBHOOK_ID
         self.access_token = None
         self.token_expires_at = None
+        self.http = get_http_client('paypal')
     
     def get_access_token(self):
         """Get PayPal access token"""
@@ -34,11 +36,12 @@ class PayPalPaymentService:
             }
             data = 'grant_type=client_credentials'
             
-            response = requests.post(
+            response = self.http.post(
                 url, 
                 headers=headers, 
                 data=data,
-                auth=(self.client_id, self.client_secret)
+                auth=(self.client_id, self.client_secret),
+                idempotent=True
             )
             response.raise_for_status()
             
@@ -92,7 +95,7 @@ class PayPalPaymentService:
                 }
             }
             
-            response = requests.post(url, headers=self.get_headers(), json=order_data)
+            response = self.http.post(url, headers=self.get_headers(), json=order_data, idempotent=True)
             response.raise_for_status()
             order = response.json()
             
@@ -143,7 +146,7 @@ class PayPalPaymentService:
                 }
             }
             
-            response = requests.post(url, headers=self.get_headers(), json=subscription_data)
+            response = self.http.post(url, headers=self.get_headers(), json=subscription_data, idempotent=True)
             response.raise_for_status()
             subscription = response.json()
             
@@ -173,7 +176,7 @@ class PayPalPaymentService:
                 "reason": reason
             }
             
-            response = requests.post(url, headers=self.get_headers(), json=cancel_data)
+            response = self.http.post(url, headers=self.get_headers(), json=cancel_data, idempotent=True)
             response.raise_for_status()
             
             logger.info(f"Cancelled PayPal subscription {subscription_id}")
@@ -188,7 +191,7 @@ class PayPalPaymentService:
         try:
             url = f"{self.base_url}/v2/checkout/orders/{order_id}/capture"
             
-            response = requests.post(url, headers=self.get_headers())
+            response = self.http.post(url, headers=self.get_headers(), idempotent=True)
             response.raise_for_status()
             
             return response.json()
@@ -202,7 +205,7 @@ class PayPalPaymentService:
         try:
             url = f"{self.base_url}/v1/billing/subscriptions/{subscription_id}"
             
-            response = requests.get(url, headers=self.get_headers())
+            response = self.http.get(url, headers=self.get_headers())
             response.raise_for_status()
             
             return response.json()
@@ -223,7 +226,7 @@ class PayPalPaymentService:
                 "category": "SOFTWARE"
             }
             
-            product_response = requests.post(product_url, headers=self.get_headers(), json=product_data)
+            product_response = self.http.post(product_url, headers=self.get_headers(), json=product_data, idempotent=True)
             product_response.raise_for_status()
             product = product_response.json()
             
@@ -264,7 +267,7 @@ class PayPalPaymentService:
                 }
             }
             
-            plan_response = requests.post(plan_url, headers=self.get_headers(), json=plan_data)
+            plan_response = self.http.post(plan_url, headers=self.get_headers(), json=plan_data, idempotent=True)
             plan_response.raise_for_status()
             plan = plan_response.json()
             
@@ -378,7 +381,7 @@ class PayPalPaymentService:
                 "webhook_event": json.loads(request_body)
             }
             
-            response = requests.post(verify_url, headers=self.get_headers(), json=verify_data)
+            response = self.http.post(verify_url, headers=self.get_headers(), json=verify_data, idempotent=True)
             response.raise_for_status()
             
             verification_result = response.json()
@@ -0,0 +1,10 @@
+# server/api/routing.py
+# WebSocket URL routes, mounted in server/asgi.py
+
+from django.urls import path
+
+from .consumers import EventsConsumer
+
+websocket_urlpatterns = [
+    path('ws/events/', EventsConsumer.as_asgi()),
+]
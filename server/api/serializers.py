@@ -7,7 +7,7 @@ from django.contrib.auth import authenticate
 from .models import (
     ContentImage, ContentRequest, ContentRequestImage, User, Client, Task, ContentPost, PerformanceData,
     Message, Invoice, TeamMember, Project, File, Notification,
-    SocialMediaAccount, RealTimeMetrics, WebsiteProject, WebsitePhase,
+    SocialMediaAccount, RealTimeMetrics, SyncLog, WebsiteProject, WebsitePhase,
     Course, CourseModule, CourseLesson, CourseProgress, CourseCertificate, CoursePurchase,
     Wallet, Transaction, WalletAutoRecharge, Giveaway, GiveawayWinner, SupportTicket, TicketMessage,
     Agent, ClientServiceSettings, WebsiteVersion, Campaign, ContentSchedule, ClientAccessRequest
@@ -243,9 +243,7 @@ class SocialMediaAccountSerializer(serializers.ModelSerializer):
         
         # Get latest metrics
         try:
-            latest_metrics = RealTimeMetrics.objects.filter(
-                account=instance
-            ).order_by('-date').first()
+            latest_metrics = getattr(instance, 'metrics_snapshot', None)
             
             if latest_metrics:
                 data['followers_count'] = latest_metrics.followers_count
@@ -278,6 +276,17 @@ class RealTimeMetricsSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class SyncLogSerializer(serializers.ModelSerializer):
+    """Sync log serializer"""
+    class Meta:
+        model = SyncLog
+        fields = [
+            'id', 'account', 'sync_type', 'status', 'records_processed',
+            'error_message', 'started_at', 'completed_at'
+        ]
+        read_only_fields = fields
+
+
 class ClientServiceSettingsSerializer(serializers.ModelSerializer):
     """Serializer for client service settings"""
     service_type_display = serializers.CharField(source='get_service_type_display', read_only=True)
@@ -355,25 +364,35 @@ class ClientSerializer(serializers.ModelSerializer):
             return obj.assigned_agent.user.email
         return None
 
+    # Service agents come from Client.objects.with_classification() annotations when present,
+    # otherwise from one lookup per service cached for the object
+
+    def _service_agent(self, obj, service_type):
+        if hasattr(obj, f'_{service_type}_agent_id'):
+            agent_id = getattr(obj, f'_{service_type}_agent_id')
+            return (str(agent_id), getattr(obj, f'_{service_type}_agent_name')) if agent_id else (None, None)
+
+        cache = obj.__dict__.setdefault('_service_agents', {})
+        if service_type not in cache:
+            agent = obj.marketing_agent if service_type == 'marketing' else obj.website_agent
+            cache[service_type] = (str(agent.id), f"{agent.user.first_name} {agent.user.last_name}") if agent else (None, None)
+        return cache[service_type]
+
     def get_marketing_agent_id(self, obj):
         """Get marketing agent ID"""
-        agent = obj.marketing_agent
-        return str(agent.id) if agent else None
+        return self._service_agent(obj, 'marketing')[0]
 
     def get_marketing_agent_name(self, obj):
         """Get marketing agent name"""
-        agent = obj.marketing_agent
-        return f"{agent.user.first_name} {agent.user.last_name}" if agent else None
+        return self._service_agent(obj, 'marketing')[1]
 
     def get_website_agent_id(self, obj):
         """Get website agent ID"""
-        agent = obj.website_agent
-        return str(agent.id) if agent else None
+        return self._service_agent(obj, 'website')[0]
 
     def get_website_agent_name(self, obj):
         """Get website agent name"""
-        agent = obj.website_agent
-        return f"{agent.user.first_name} {agent.user.last_name}" if agent else None
+        return self._service_agent(obj, 'website')[1]
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -633,9 +652,9 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = [
             'id', 'user', 'title', 'message', 'notification_type',
-            'read', 'created_at'
+            'read', 'created_at', 'event_count'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'event_count']
 
 # Dashboard Statistics Serializers
 class DashboardStatsSerializer(serializers.Serializer):
@@ -0,0 +1,100 @@
+# server/api/services/client_directory.py
+"""
+Client directory behind the agents/my-clients endpoint
+
+directory(agent, search) is one annotated Client query:
+- eligibility: marketing agents see clients with an active social account
+  (client_type 'marketing' or 'full'), website agents see clients with a
+  website project ('website' or 'full'), other departments see everyone
+- is_assigned_to_me / is_available: whether the agent, or anyone, holds the
+  client's ClientServiceSettings row for the agent's department
+- marketing/website agent ids and names from Client.objects.with_classification()
+
+available(department) is the active clients with nobody assigned for that
+service: an anti-join on ClientServiceSettings probing the partial
+service_assigned_agent_idx index.
+
+Responses are cached per agent or per department (and per search/page) for
+settings.CACHE_TIMEOUTS['client_directory']. Any assignment change can make a
+client available or taken for every agent in a department, so keys carry a
+generation number that the signal receivers in api/signals.py bump instead of
+deleting every agent's keys.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.http import urlencode
+
+from ..models import Client, ClientServiceSettings
+
+GENERATION_KEY = 'client_directory:generation'
+
+SEARCH_FIELDS = ['name', 'company', 'email', 'user__first_name', 'user__last_name']
+
+
+class ClientDirectory:
+    """Department-scoped client listing for agents"""
+
+    @staticmethod
+    def directory(agent, search=None):
+        department_agents = ClientServiceSettings.objects.filter(
+            client=OuterRef('pk'), service_type=agent.department
+        )
+        clients = Client.objects.with_classification().annotate(
+            is_assigned_to_me=Exists(department_agents.filter(assigned_agent=agent)),
+            is_available=~Exists(department_agents.filter(assigned_agent__isnull=False)),
+        )
+
+        if agent.department == 'marketing':
+            clients = clients.filter(_has_social_accounts=True)
+        elif agent.department == 'website':
+            clients = clients.filter(_has_website_projects=True)
+
+        if search:
+            query = Q()
+            for field in SEARCH_FIELDS:
+                query |= Q(**{f'{field}__icontains': search})
+            clients = clients.filter(query)
+
+        return clients.order_by('name', 'pk')
+
+    @staticmethod
+    def available(department):
+        """Active clients without an agent for the department's service"""
+        assigned = ClientServiceSettings.objects.filter(
+            client=OuterRef('pk'), service_type=department, assigned_agent__isnull=False
+        )
+        return Client.objects.with_classification().filter(status='active').filter(
+            ~Exists(assigned)
+        ).order_by('name', 'pk')
+
+    @staticmethod
+    def key(scope, params):
+        generation = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+        digest = hashlib.md5(urlencode(sorted(params.items())).encode()).hexdigest()
+        return f"client_directory:{generation}:{scope}:{digest}"
+
+    @staticmethod
+    def get_or_compute(scope, params, compute):
+        """Cached response for the scope (an agent id or 'available:<department>') and query params"""
+        key = ClientDirectory.key(scope, params)
+        data = cache.get(key)
+        if data is None:
+            data = compute()
+            cache.set(key, data, timeout=settings.CACHE_TIMEOUTS['client_directory'])
+        return data
+
+    # ---------- invalidation ----------
+
+    @staticmethod
+    def invalidate():
+        def bump():
+            try:
+                cache.incr(GENERATION_KEY)
+            except ValueError:
+                cache.set(GENERATION_KEY, 2, timeout=None)
+        transaction.on_commit(bump)
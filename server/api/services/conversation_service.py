@@ -0,0 +1,148 @@
+# server/api/services/conversation_service.py
+"""
+Conversation threads over Message
+
+Every pair of users who exchanged messages has one Conversation. Each side
+has a ConversationParticipant holding its unread count, last-read marker and
+a copy of the thread's last_message_at, so the inbox is a single index scan
+on (user, -last_message_at).
+
+New messages are recorded by the Message post_save receiver in the same
+transaction. Read changes go through mark_conversation_read and
+message_read/message_unread. Writes for a thread lock its Conversation row, so concurrent
+messages and reads serialize per pair and never race. refresh() rebuilds a
+thread from its messages; the backfill_conversations command uses it for
+existing history.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import Conversation, ConversationParticipant, Message
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationService:
+    """Maintain denormalized conversation state"""
+
+    @staticmethod
+    def key(user_id, other_user_id):
+        return ':'.join(sorted([str(user_id), str(other_user_id)]))
+
+    @staticmethod
+    def _locked(user_id, other_user_id):
+        """The pair's conversation, created with both participants if needed, locked for this transaction"""
+        conversation, created = Conversation.objects.get_or_create(key=ConversationService.key(user_id, other_user_id))
+        if created:
+            ConversationParticipant.objects.bulk_create([
+                ConversationParticipant(conversation=conversation, user_id=user, other_user_id=other)
+                for user, other in dict.fromkeys([(user_id, other_user_id), (other_user_id, user_id)])
+            ], ignore_conflicts=True)
+        return Conversation.objects.select_for_update().get(pk=conversation.pk)
+
+    @staticmethod
+    def _between(user_id, other_user_id):
+        return Message.objects.filter(
+            Q(sender_id=user_id, receiver_id=other_user_id) |
+            Q(sender_id=other_user_id, receiver_id=user_id)
+        )
+
+    @staticmethod
+    def record_message(message):
+        """Move the thread's last-message pointer and count the message as unread for its receiver"""
+        with transaction.atomic():
+            conversation = ConversationService._locked(message.sender_id, message.receiver_id)
+            participants = ConversationParticipant.objects.filter(conversation=conversation)
+
+            if conversation.last_message_at is None or message.timestamp >= conversation.last_message_at:
+                conversation.last_message = message
+                conversation.last_message_at = message.timestamp
+                conversation.save(update_fields=['last_message', 'last_message_at'])
+                participants.update(last_message_at=message.timestamp)
+                # Sending a message means the sender has read the thread up to it
+                participants.filter(user_id=message.sender_id).update(last_read_at=message.timestamp)
+
+            if not message.read and message.receiver_id != message.sender_id:
+                participants.filter(user_id=message.receiver_id).update(unread_count=F('unread_count') + 1)
+        return conversation
+
+    @staticmethod
+    def mark_conversation_read(user, other_user_id):
+        """Mark every message from other_user_id to user as read; returns how many changed"""
+        with transaction.atomic():
+            # Reading doesn't start a thread; one exists for any pair that exchanged messages
+            conversation = Conversation.objects.select_for_update().filter(
+                key=ConversationService.key(user.id, other_user_id)
+            ).first()
+            updated = Message.objects.filter(sender_id=other_user_id, receiver=user, read=False).update(read=True)
+            if conversation is not None:
+                ConversationParticipant.objects.filter(conversation=conversation, user=user).update(
+                    unread_count=0, last_read_at=timezone.now()
+                )
+        return updated
+
+    @staticmethod
+    def message_read(message):
+        """Count one message (already updated to read) out of its receiver's unread total"""
+        ConversationParticipant.objects.filter(
+            conversation__key=ConversationService.key(message.sender_id, message.receiver_id),
+            user_id=message.receiver_id
+        ).update(unread_count=Greatest(F('unread_count') - 1, 0))
+
+    @staticmethod
+    def message_unread(message):
+        """Count one message (already updated to unread) back into its receiver's unread total"""
+        ConversationParticipant.objects.filter(
+            conversation__key=ConversationService.key(message.sender_id, message.receiver_id),
+            user_id=message.receiver_id
+        ).update(unread_count=F('unread_count') + 1)
+
+    @staticmethod
+    def forget_user(user):
+        """Delete the user's threads; every message in them goes with the user"""
+        Conversation.objects.filter(participants__user=user).delete()
+
+    @staticmethod
+    def refresh(user_id, other_user_id, create=True):
+        """Rebuild a thread's pointers and unread counts from its messages (None if missing and not create)"""
+        with transaction.atomic():
+            if create:
+                conversation = ConversationService._locked(user_id, other_user_id)
+            else:
+                conversation = Conversation.objects.select_for_update().filter(
+                    key=ConversationService.key(user_id, other_user_id)
+                ).first()
+                if conversation is None:
+                    return None
+            messages = ConversationService._between(user_id, other_user_id)
+            last_message = messages.order_by('-timestamp', '-id').first()
+
+            conversation.last_message = last_message
+            conversation.last_message_at = last_message.timestamp if last_message else None
+            conversation.save(update_fields=['last_message', 'last_message_at'])
+
+            for participant in ConversationParticipant.objects.filter(conversation=conversation):
+                participant.last_message_at = conversation.last_message_at
+                participant.unread_count = messages.filter(
+                    sender_id=participant.other_user_id, receiver_id=participant.user_id, read=False
+                ).count()
+                if participant.last_read_at is None:
+                    participant.last_read_at = messages.filter(
+                        Q(sender_id=participant.user_id) | Q(receiver_id=participant.user_id, read=True)
+                    ).order_by('-timestamp').values_list('timestamp', flat=True).first()
+                participant.save(update_fields=['last_message_at', 'unread_count', 'last_read_at'])
+        return conversation
+
+    @staticmethod
+    def inbox(user):
+        """The user's conversations, most recent first, with everything the inbox shows"""
+        return ConversationParticipant.objects.filter(
+            user=user, last_message_at__isnull=False
+        ).select_related(
+            'other_user', 'conversation__last_message__sender', 'conversation__last_message__receiver'
+        ).order_by('-last_message_at')
@@ -0,0 +1,127 @@
+# server/api/services/dashboard_cache.py
+"""
+Cache for the admin, client and agent dashboard stats
+
+One key per scope ('admin', client id, agent id) holding the computed stats,
+kept for settings.CACHE_TIMEOUTS['dashboard_stats'] and deleted by the model
+signals in api/signals.py (and explicitly after bulk writes) as soon as the
+underlying data changes.
+
+Stampede protection:
+- on a miss only the caller holding the scope's rebuild lock computes; the
+  others wait briefly for its result
+- entries are refreshed probabilistically before they expire (XFetch), so a
+  popular key is rebuilt by one request instead of all of them at once
+"""
+
+import logging
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'dashboard_stats'
+
+# Longest a rebuild may hold the lock, and how long others wait for it
+LOCK_TIMEOUT = 30
+WAIT_SECONDS = 2.0
+WAIT_INTERVAL = 0.05
+
+# Higher values refresh earlier (XFetch beta)
+EARLY_REFRESH_BETA = 1.0
+
+
+class DashboardStatsCache:
+    """Key-per-scope dashboard stats with event invalidation"""
+
+    @staticmethod
+    def key(scope, scope_id=None):
+        return f"{KEY_PREFIX}:{scope}" if scope_id is None else f"{KEY_PREFIX}:{scope}:{scope_id}"
+
+    @staticmethod
+    def get_or_compute(key, compute):
+        """Cached stats for key, computing them with compute() when missing or due for refresh"""
+        entry = cache.get(key)
+        if entry is not None and not DashboardStatsCache._should_refresh(entry):
+            return entry['value']
+
+        lock_key = f"{key}:lock"
+        acquired = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+        if acquired is None:
+            # The cache swallows connection errors (IGNORE_EXCEPTIONS) and returns None; nothing to wait for
+            return compute()
+        if not acquired:
+            # Someone else is rebuilding: serve what we have, or wait for theirs
+            if entry is not None:
+                return entry['value']
+            deadline = time.monotonic() + WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry['value']
+            logger.warning(f"Timed out waiting for {key} rebuild, computing directly")
+            return compute()
+
+        try:
+            started = time.monotonic()
+            value = compute()
+            timeout = settings.CACHE_TIMEOUTS['dashboard_stats']
+            cache.set(key, {
+                'value': value,
+                'delta': time.monotonic() - started,
+                'expires_at': time.time() + timeout,
+            }, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    @staticmethod
+    def _should_refresh(entry):
+        """XFetch: refresh early with a probability that rises as expiry nears"""
+        jitter = entry['delta'] * EARLY_REFRESH_BETA * -math.log(1.0 - random.random())
+        return time.time() + jitter >= entry['expires_at']
+
+    # ---------- invalidation ----------
+
+    @staticmethod
+    def invalidate(admin=False, client_ids=(), agent_ids=()):
+        """
+        Drop the given scopes once the current transaction commits
+
+        Deleting after commit keeps a concurrent reader from caching the
+        pre-commit state again.
+        """
+        keys = [DashboardStatsCache.key('admin')] if admin else []
+        keys += [DashboardStatsCache.key('client', client_id) for client_id in set(client_ids) if client_id]
+        keys += [DashboardStatsCache.key('agent', agent_id) for agent_id in set(agent_ids) if agent_id]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def invalidate_clients(client_ids, admin=False):
+        """Drop the client scopes and those of the clients' assigned agents"""
+        from ..models import Client
+
+        client_ids = [client_id for client_id in set(client_ids) if client_id]
+        if not client_ids:
+            return
+        agent_ids = Client.objects.filter(
+            id__in=client_ids, assigned_agent__isnull=False
+        ).values_list('assigned_agent_id', flat=True)
+        DashboardStatsCache.invalidate(admin=admin, client_ids=client_ids, agent_ids=list(agent_ids))
+
+    @staticmethod
+    def invalidate_accounts(account_ids):
+        """Drop the client scopes owning the given social accounts"""
+        from ..models import SocialMediaAccount
+
+        client_ids = SocialMediaAccount.objects.filter(
+            id__in=set(account_ids)
+        ).values_list('client_id', flat=True)
+        DashboardStatsCache.invalidate(client_ids=list(client_ids))
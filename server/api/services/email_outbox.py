@@ -0,0 +1,205 @@
+# server/api/services/email_outbox.py
+"""
+Transactional email outbox
+
+EmailTemplates queue messages here instead of calling Resend inline. The row
+is written in the caller's transaction and a drain is scheduled on commit,
+so nothing is sent for work that rolls back and requests never wait on the
+provider. The send_email_outbox task (queue 'email') claims due rows and
+sends them through the Resend batch endpoint, up to 100 per API call, with
+exponential backoff for failures. The periodic drain catches retries and any
+dispatch lost between commit and broker.
+
+Every send carries an Idempotency-Key derived from the outbox ids, so Resend
+drops a resend of something it already accepted. The key is stored on the
+rows before the first attempt, and a retry (after backoff, or reclaimed from
+a dead worker) claims and resends the same set of rows under the same key.
+A batch rejected for validation is split, and each row then keeps its own key.
+"""
+
+import hashlib
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import EmailOutbox
+from ..utils.resend_client import send_batch, send_email, ResendError
+
+logger = logging.getLogger(__name__)
+
+# Set while a drain is already scheduled, so a burst of emails shares one task
+DRAIN_SCHEDULED_KEY = 'email_outbox:drain_scheduled'
+
+
+class EmailOutboxService:
+    """Queue transactional email and deliver it in provider batches"""
+
+    @staticmethod
+    def enqueue(to_email, subject, html):
+        """Record an email; delivery is scheduled once the current transaction commits"""
+        email = EmailOutbox.objects.create(to_email=to_email, subject=subject, html=html)
+        transaction.on_commit(EmailOutboxService.schedule_drain)
+        return email
+
+    @staticmethod
+    def schedule_drain():
+        config = settings.EMAIL_OUTBOX
+        delay = config['dispatch_delay_seconds']
+        if not cache.add(DRAIN_SCHEDULED_KEY, 1, timeout=delay):
+            return
+        try:
+            from ..tasks import send_email_outbox
+            send_email_outbox.apply_async(countdown=delay)
+        except Exception as e:
+            # The periodic drain picks the rows up
+            logger.warning(f"Could not schedule email outbox drain: {e}")
+
+    # ---------- delivery ----------
+
+    @staticmethod
+    def _claim(limit):
+        """Mark up to limit due rows as sending and return them"""
+        config = settings.EMAIL_OUTBOX
+        now = timezone.now()
+        stale = now - timedelta(seconds=config['claim_timeout_seconds'])
+
+        with transaction.atomic():
+            ids = list(EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                Q(status='pending', next_attempt_at__lte=now) |
+                # Rows left behind by a worker that died mid-send
+                Q(status='sending', claimed_at__lt=stale)
+            ).order_by('next_attempt_at').values_list('id', flat=True)[:limit])
+            # A retry has to resend the whole earlier batch to match its key
+            keys = set(EmailOutbox.objects.filter(id__in=ids).exclude(
+                idempotency_key=''
+            ).values_list('idempotency_key', flat=True))
+            if keys:
+                ids += EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                    Q(status='pending') | Q(status='sending', claimed_at__lt=stale),
+                    idempotency_key__in=keys
+                ).exclude(id__in=ids).values_list('id', flat=True)
+            EmailOutbox.objects.filter(id__in=ids).update(
+                status='sending', claimed_at=now, attempts=F('attempts') + 1
+            )
+        return list(EmailOutbox.objects.filter(id__in=ids))
+
+    @staticmethod
+    def _payload(email):
+        return {
+            'from': settings.EMAIL_FROM_ADDRESS,
+            'to': email.to_email,
+            'subject': email.subject,
+            'html': email.html,
+        }
+
+    @staticmethod
+    def _mark_sent(emails, provider_ids):
+        now = timezone.now()
+        for email, provider_id in zip(emails, provider_ids):
+            email.status = 'sent'
+            email.provider_id = provider_id or ''
+            email.sent_at = now
+            email.last_error = ''
+        EmailOutbox.objects.bulk_update(emails, ['status', 'provider_id', 'sent_at', 'last_error'])
+
+    @staticmethod
+    def _mark_failed(emails, error, permanent=False):
+        """Back off and retry, or give up on permanent errors and once max_attempts is reached"""
+        config = settings.EMAIL_OUTBOX
+        now = timezone.now()
+        # One jitter for the whole batch, so its rows come due (and are retried) together
+        jitter = random.uniform(0.5, 1)
+        for email in emails:
+            email.last_error = str(error)[:2000]
+            if permanent or email.attempts >= config['max_attempts']:
+                email.status = 'failed'
+                logger.error(f"Giving up on email to {email.to_email} after {email.attempts} attempts: {error}")
+            else:
+                backoff = min(config['backoff_base_seconds'] * 2 ** (email.attempts - 1), config['backoff_max_seconds'])
+                email.status = 'pending'
+                email.next_attempt_at = now + timedelta(seconds=backoff * jitter)
+        EmailOutbox.objects.bulk_update(emails, ['status', 'last_error', 'next_attempt_at'])
+
+    @staticmethod
+    def _idempotency_key(emails):
+        if len(emails) == 1:
+            return f"outbox-{emails[0].id}"
+        ids = ','.join(sorted(str(email.id) for email in emails))
+        return f"outbox-batch-{hashlib.sha256(ids.encode()).hexdigest()}"
+
+    @staticmethod
+    def _assign_key(emails):
+        """Store the key before sending, so a retry of this send repeats it"""
+        key = EmailOutboxService._idempotency_key(emails)
+        for email in emails:
+            email.idempotency_key = key
+        EmailOutbox.objects.bulk_update(emails, ['idempotency_key'])
+
+    @staticmethod
+    def _batches(emails):
+        """Retried rows go out with the rows and key of their earlier send, new rows as one batch"""
+        batches = {}
+        fresh = []
+        for email in emails:
+            if email.idempotency_key:
+                batches.setdefault(email.idempotency_key, []).append(email)
+            else:
+                fresh.append(email)
+        if fresh:
+            EmailOutboxService._assign_key(fresh)
+            batches[fresh[0].idempotency_key] = fresh
+        return list(batches.values())
+
+    @staticmethod
+    def _send_batch(emails):
+        try:
+            key = emails[0].idempotency_key
+            if len(emails) == 1:
+                response = send_email(EmailOutboxService._payload(emails[0]), idempotency_key=key)
+                EmailOutboxService._mark_sent(emails, [response.get('id')])
+                return len(emails), 0
+            response = send_batch([EmailOutboxService._payload(email) for email in emails], idempotency_key=key)
+            provider_ids = [item.get('id') for item in response.get('data', [])]
+            EmailOutboxService._mark_sent(emails, provider_ids + [None] * (len(emails) - len(provider_ids)))
+            return len(emails), 0
+        except ResendError as e:
+            # Validation errors won't succeed on retry; auth, rate limit and server errors might
+            permanent = e.status_code in (400, 422)
+            if permanent and len(emails) > 1:
+                # One bad message rejects the whole batch: retry individually to isolate it
+                sent = failed = 0
+                for email in emails:
+                    EmailOutboxService._assign_key([email])
+                    email_sent, email_failed = EmailOutboxService._send_batch([email])
+                    sent += email_sent
+                    failed += email_failed
+                return sent, failed
+            EmailOutboxService._mark_failed(emails, e, permanent=permanent)
+            return 0, len(emails)
+        except Exception as e:
+            EmailOutboxService._mark_failed(emails, e)
+            return 0, len(emails)
+
+    @staticmethod
+    def drain():
+        """Send due emails in provider-sized batches; returns counts"""
+        config = settings.EMAIL_OUTBOX
+        totals = {'sent': 0, 'failed': 0, 'batches': 0}
+        for _ in range(config['max_batches_per_run']):
+            emails = EmailOutboxService._claim(config['batch_size'])
+            if not emails:
+                break
+            for batch in EmailOutboxService._batches(emails):
+                sent, failed = EmailOutboxService._send_batch(batch)
+                totals['sent'] += sent
+                totals['failed'] += failed
+                totals['batches'] += 1
+        if totals['batches']:
+            logger.info(f"Email outbox drain: {totals}")
+        return totals
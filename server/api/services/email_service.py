@@ -1,15 +1,12 @@
 # server/api/services/email_service.py
-import resend
 import random
 import string
-from django.conf import settings
 from django.core.cache import cache
 import logging
 
-logger = logging.getLogger(__name__)
+from ..utils.resend_client import send_email
 
-# Set Resend API key from settings
-resend.api_key = settings.RESEND_API_KEY
+logger = logging.getLogger(__name__)
 
 class EmailService:
     """Service for sending emails via Resend"""
@@ -149,7 +146,7 @@ class EmailService:
             """
             
             # Send email via Resend
-            response = resend.Emails.send({
+            response = send_email({
                 "from": "VisionBoost <onboarding@visionboost.agency>",
                 "to": email,
                 "subject": subject,
@@ -226,7 +223,7 @@ class EmailService:
             </html>
             """
             
-            resend.Emails.send({
+            send_email({
                 "from": "VisionBoost <welcome@visionboost.agency>",
                 "to": email,
                 "subject": "Welcome to VisionBoost! 🚀",
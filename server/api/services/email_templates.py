@@ -2,14 +2,13 @@
 """
 Email template methods for all notification types
 """
-import resend
 from django.conf import settings
+from django.db import transaction
 import logging
 
-logger = logging.getLogger(__name__)
+from .email_outbox import EmailOutboxService
 
-# Set Resend API key from settings
-resend.api_key = settings.RESEND_API_KEY
+logger = logging.getLogger(__name__)
 
 
 class EmailTemplates:
@@ -17,18 +16,15 @@ class EmailTemplates:
 
     @staticmethod
     def _send_email(to_email, subject, html_content):
-        """Helper method to send email via Resend"""
+        """Queue an email in the outbox; it is sent in a batch after the transaction commits"""
         try:
-            response = resend.Emails.send({
-                "from": settings.EMAIL_FROM_ADDRESS,
-                "to": to_email,
-                "subject": subject,
-                "html": html_content
-            })
-            logger.info(f"Email sent to {to_email}: {subject}")
+            # Savepoint: a failed insert must not leave the caller's transaction unusable
+            with transaction.atomic():
+                EmailOutboxService.enqueue(to_email, subject, html_content)
+            logger.info(f"Email queued for {to_email}: {subject}")
             return True
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            logger.error(f"Failed to queue email to {to_email}: {str(e)}")
             return False
 
     @staticmethod
@@ -204,6 +200,27 @@ class EmailTemplates:
         html = EmailTemplates._base_template("New Message 💬", content)
         return EmailTemplates._send_email(email, f"New message from {sender_name}", html)
 
+    @staticmethod
+    def send_message_digest(email, name, sender_name, count, previews):
+        """Notify user of several messages from one sender (previews: the latest few)"""
+        items = "".join(
+            f'<p style="margin: 0 0 10px 0; font-style: italic;">"{preview[:100]}{"..." if len(preview) > 100 else ""}"</p>'
+            for preview in previews
+        )
+        content = f"""
+            <p>Hi {name},</p>
+            <p>You have <strong>{count} new messages</strong> from <strong>{sender_name}</strong>.</p>
+
+            <div class="highlight">
+                {items}
+            </div>
+
+            <a href="{settings.FRONTEND_URL}/dashboard/messages" class="button">View Messages</a>
+        """
+
+        html = EmailTemplates._base_template("New Messages 💬", content)
+        return EmailTemplates._send_email(email, f"{count} new messages from {sender_name}", html)
+
     # ============ TASK NOTIFICATIONS ============
 
     @staticmethod
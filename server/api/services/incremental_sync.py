@@ -0,0 +1,74 @@
+# server/api/services/incremental_sync.py
+"""
+Helpers for incremental social media syncs
+Lets the platform services skip DB writes when a fetched payload matches what is already stored
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
+
+from ..models import PostMetrics
+
+
+def payload_hash(data):
+    """Stable SHA-256 of a JSON-serializable payload"""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def has_metrics_for_today(account):
+    """True when the account's metrics snapshot already covers today"""
+    snapshot = getattr(account, 'metrics_snapshot', None)
+    return snapshot is not None and snapshot.date == timezone.now().date()
+
+
+def _comparable(value):
+    # Computed rates are floats; stored rates come back as 2-place Decimals
+    if isinstance(value, float):
+        return Decimal(str(round(value, 2)))
+    return value
+
+
+def stored_post_values(account, post_ids, fields):
+    """Map post_id -> tuple of stored field values for the given posts"""
+    rows = PostMetrics.objects.filter(
+        account=account,
+        post_id__in=post_ids
+    ).values_list('post_id', *fields)
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def stale_post_ids(account, hours, post_ids=None, limit=None):
+    """
+    Ids of stored posts not written within the last hours
+
+    Checks the given post_ids, or the account's newest limit posts when
+    post_ids is None.
+    """
+    posts = PostMetrics.objects.filter(account=account)
+    if post_ids is None:
+        posts = PostMetrics.objects.filter(pk__in=posts.order_by('-posted_at').values('pk')[:limit])
+    else:
+        posts = posts.filter(post_id__in=post_ids)
+    cutoff = timezone.now() - timedelta(hours=hours)
+    return list(posts.filter(updated_at__lt=cutoff).values_list('post_id', flat=True))
+
+
+def changed_post_rows(account, rows, fields):
+    """Drop unsaved PostMetrics rows whose compared fields match the stored values"""
+    stored = stored_post_values(account, [row.post_id for row in rows], fields)
+    return [
+        row for row in rows
+        if stored.get(row.post_id) != tuple(_comparable(getattr(row, field)) for field in fields)
+    ]
+
+
+def finish_unchanged_sync(sync_log):
+    """Close a SyncLog for a run where the platform reported no changes"""
+    sync_log.status = 'success'
+    sync_log.records_processed = 0
+    sync_log.completed_at = timezone.now()
+    sync_log.save()
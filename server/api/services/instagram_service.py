@@ -1,20 +1,42 @@
 # server/api/services/instagram_service.py
 import requests
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
-from ..models import SocialMediaAccount, RealTimeMetrics, PostMetrics, SyncLog
+from ..models import (
+    SocialMediaAccount, RealTimeMetrics, AccountMetricsSnapshot, PostMetrics, SyncLog,
+    SocialSyncState
+)
+from ..utils.http_client import get_http_client
+from .incremental_sync import (
+    payload_hash, has_metrics_for_today, stored_post_values, stale_post_ids, finish_unchanged_sync
+)
+from .dashboard_cache import DashboardStatsCache
+from .engagement_analytics import EngagementAnalyticsService
 
 logger = logging.getLogger(__name__)
 
 class InstagramService:
     """Instagram Business API service for fetching real data"""
     
+    # Graph API accepts at most 50 sub-requests per batch call
+    INSIGHTS_BATCH_SIZE = 50
+    # Upper bound on parallel insight requests when batching is unavailable
+    MAX_CONCURRENT_REQUESTS = 8
+    POST_INSIGHT_METRICS = 'reach,impressions,saves,shares'
+    # Reach, impressions, saves and shares keep growing after likes settle, so
+    # insights are refetched this often even when the media page is unchanged
+    INSIGHTS_REFRESH_HOURS = 24
+    
     def __init__(self, social_account):
         self.account = social_account
-        self.access_token = self.account.decrypt_token(social_account.access_token)
+        self.access_token = self.account.get_access_token()
         self.base_url = "https://graph.facebook.com/v18.0"
+        # Shared keep-alive pool; HTTP_CLIENTS['instagram'] sizes it for the concurrent insights fallback
+        self.http = get_http_client('instagram')
     
     def sync_profile_metrics(self):
         """Fetch and save Instagram Business account metrics"""
@@ -24,6 +46,10 @@ class InstagramService:
             status='in_progress'
         )
         
+        state = SocialSyncState.for_account(self.account)
+        # A 304 can only be trusted once today's row exists
+        up_to_date = has_metrics_for_today(self.account)
+        
         try:
             # Get basic profile info
             url = f"{self.base_url}/{self.account.account_id}"
@@ -31,8 +57,17 @@ class InstagramService:
                 'fields': 'followers_count,follows_count,media_count,profile_picture_url,username,name',
                 'access_token': self.access_token
             }
+            headers = {'If-None-Match': state.profile_etag} if up_to_date and state.profile_etag else {}
+            
+            response = self.http.get(url, params=params, headers=headers)
+            
+            if response.status_code == 304:
+                logger.info(f"Instagram profile unchanged for {self.account.username}, skipping write")
+                finish_unchanged_sync(sync_log)
+                return RealTimeMetrics.objects.filter(
+                    account=self.account, date=timezone.now().date()
+                ).first()
             
-            response = requests.get(url, params=params)
             response.raise_for_status()
             profile_data = response.json()
             
@@ -42,20 +77,33 @@ class InstagramService:
             # Calculate engagement rate
             engagement_rate = self._calculate_engagement_rate()
             
+            metric_values = {
+                'followers_count': profile_data.get('followers_count', 0),
+                'following_count': profile_data.get('follows_count', 0),
+                'posts_count': profile_data.get('media_count', 0),
+                'engagement_rate': engagement_rate,
+                'reach': insights.get('reach', 0),
+                'impressions': insights.get('impressions', 0),
+                'profile_views': insights.get('profile_views', 0),
+                'website_clicks': insights.get('website_clicks', 0),
+            }
+            
+            state.profile_etag = response.headers.get('ETag', '')
+            content_hash = payload_hash(metric_values)
+            
+            if up_to_date and content_hash == state.profile_hash:
+                logger.info(f"Instagram profile payload unchanged for {self.account.username}, skipping write")
+                state.save()
+                finish_unchanged_sync(sync_log)
+                return RealTimeMetrics.objects.filter(
+                    account=self.account, date=timezone.now().date()
+                ).first()
+            
             # Save metrics
             metrics, created = RealTimeMetrics.objects.update_or_create(
                 account=self.account,
                 date=timezone.now().date(),
-                defaults={
-                    'followers_count': profile_data.get('followers_count', 0),
-                    'following_count': profile_data.get('follows_count', 0),
-                    'posts_count': profile_data.get('media_count', 0),
-                    'engagement_rate': engagement_rate,
-                    'reach': insights.get('reach', 0),
-                    'impressions': insights.get('impressions', 0),
-                    'profile_views': insights.get('profile_views', 0),
-                    'website_clicks': insights.get('website_clicks', 0),
-                }
+                defaults=metric_values
             )
             
             # Calculate daily growth
@@ -70,9 +118,15 @@ class InstagramService:
                     metrics.daily_growth = daily_growth
                     metrics.save()
             
+            # Keep the dashboard snapshot in step with today's row
+            AccountMetricsSnapshot.update_from_metrics(metrics)
+            
             # Update last sync time
             self.account.last_sync = timezone.now()
-            self.account.save()
+            self.account.save(update_fields=['last_sync', 'updated_at'])
+            
+            state.profile_hash = content_hash
+            state.save()
             
             sync_log.status = 'success'
             sync_log.records_processed = 1
@@ -104,30 +158,67 @@ class InstagramService:
             raise e
     
     def sync_recent_posts(self, limit=25):
-        """Fetch recent posts and their metrics"""
+        """
+        Fetch recent posts and their metrics
+        
+        The media page is requested with the ETag from the previous run. When
+        it changed, insights are fetched and rows written only for posts that
+        are new, whose caption, like or comment counts moved, or whose insights
+        are older than INSIGHTS_REFRESH_HOURS. On a 304 only the stale insights
+        are refreshed.
+        """
         sync_log = SyncLog.objects.create(
             account=self.account,
             sync_type='posts',
             status='in_progress'
         )
         
+        state = SocialSyncState.for_account(self.account)
+        
         try:
             url = f"{self.base_url}/{self.account.account_id}/media"
             params = {
-                'fields': 'id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count',
+                # Signed media URLs rotate on every call, so they are left out to keep the ETag stable
+                'fields': 'id,caption,media_type,timestamp,like_count,comments_count',
                 'limit': limit,
                 'access_token': self.access_token
             }
+            headers = {'If-None-Match': state.posts_etag} if state.posts_etag else {}
+            
+            response = self.http.get(url, params=params, headers=headers)
+            
+            if response.status_code == 304:
+                logger.info(f"Instagram media unchanged for {self.account.username}, refreshing stale insights only")
+                refreshed = self._refresh_post_insights(
+                    stale_post_ids(self.account, self.INSIGHTS_REFRESH_HOURS, limit=limit)
+                )
+                finish_unchanged_sync(sync_log)
+                if refreshed:
+                    sync_log.records_processed = refreshed
+                    sync_log.save(update_fields=['records_processed'])
+                return
             
-            response = requests.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             
-            posts_processed = 0
+            post_ids = [post['id'] for post in data.get('data', [])]
+            stored = stored_post_values(self.account, post_ids, ['caption', 'likes', 'comments'])
+            stale = set(stale_post_ids(self.account, self.INSIGHTS_REFRESH_HOURS, post_ids=post_ids))
+            posts = [
+                post for post in data.get('data', [])
+                if post['id'] in stale or stored.get(post['id']) != (
+                    post.get('caption', ''), post.get('like_count', 0), post.get('comments_count', 0)
+                )
+            ]
+            
+            # Fetch insights for the changed and stale posts in as few round trips as possible
+            post_insights = self._get_posts_insights([post['id'] for post in posts])
+            
+            now = timezone.now()
+            post_rows = []
             
-            for post_data in data.get('data', []):
-                # Get detailed insights for each post
-                insights = self._get_post_insights(post_data['id'])
+            for post_data in posts:
+                insights = post_insights.get(post_data['id'], {})
                 
                 # Parse timestamp
                 posted_at = datetime.fromisoformat(
@@ -143,24 +234,43 @@ class InstagramService:
                 if reach > 0:
                     engagement_rate = ((likes + comments) / reach) * 100
                 
-                post_metrics, created = PostMetrics.objects.update_or_create(
+                post_rows.append(PostMetrics(
                     account=self.account,
                     post_id=post_data['id'],
-                    defaults={
-                        'caption': post_data.get('caption', ''),
-                        'media_type': post_data.get('media_type', ''),
-                        'posted_at': posted_at,
-                        'likes': likes,
-                        'comments': comments,
-                        'reach': insights.get('reach', 0),
-                        'impressions': insights.get('impressions', 0),
-                        'saves': insights.get('saves', 0),
-                        'shares': insights.get('shares', 0),
-                        'engagement_rate': engagement_rate,
-                    }
-                )
-                
-                posts_processed += 1
+                    caption=post_data.get('caption', ''),
+                    media_type=post_data.get('media_type', ''),
+                    posted_at=posted_at,
+                    likes=likes,
+                    comments=comments,
+                    reach=reach,
+                    impressions=insights.get('impressions', 0),
+                    saves=insights.get('saves', 0),
+                    shares=insights.get('shares', 0),
+                    engagement_rate=round(engagement_rate, 2),
+                    updated_at=now,
+                ))
+            
+            PostMetrics.objects.bulk_create(
+                post_rows,
+                update_conflicts=True,
+                unique_fields=['account', 'post_id'],
+                update_fields=[
+                    'caption', 'media_type', 'posted_at', 'likes', 'comments',
+                    'reach', 'impressions', 'saves', 'shares', 'engagement_rate',
+                    'updated_at'
+                ]
+            )
+            if post_rows:
+                DashboardStatsCache.invalidate(client_ids=[self.account.client_id])
+            
+            posts_processed = len(post_rows)
+            
+            state.posts_etag = response.headers.get('ETag', '')
+            if post_rows:
+                newest = max(row.posted_at for row in post_rows)
+                if not state.last_post_at or newest > state.last_post_at:
+                    state.last_post_at = newest
+            state.save()
             
             sync_log.status = 'success'
             sync_log.records_processed = posts_processed
@@ -202,7 +312,7 @@ class InstagramService:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -224,48 +334,119 @@ class InstagramService:
         try:
             url = f"{self.base_url}/{post_id}/insights"
             params = {
-                'metric': 'reach,impressions,saves,shares',
+                'metric': self.POST_INSIGHT_METRICS,
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
-            data = response.json()
             
-            insights = {}
-            for metric_data in data.get('data', []):
-                metric_name = metric_data['name']
-                values = metric_data.get('values', [])
-                if values:
-                    insights[metric_name] = values[0].get('value', 0)
-            
-            return insights
+            return self._parse_post_insights(response.json())
             
         except requests.RequestException as e:
             logger.warning(f"Failed to get post insights for {post_id}: {str(e)}")
             return {}
     
+    def _refresh_post_insights(self, post_ids):
+        """Refetch insights for stored posts and update their rows; returns how many were updated"""
+        if not post_ids:
+            return 0
+        
+        post_insights = self._get_posts_insights(post_ids)
+        now = timezone.now()
+        rows = []
+        for row in PostMetrics.objects.filter(account=self.account, post_id__in=post_ids):
+            insights = post_insights.get(row.post_id)
+            if not insights:
+                # Failed fetch: leave the row stale so the next run retries it
+                continue
+            row.reach = insights.get('reach', 0)
+            row.impressions = insights.get('impressions', 0)
+            row.saves = insights.get('saves', 0)
+            row.shares = insights.get('shares', 0)
+            row.engagement_rate = round(((row.likes + row.comments) / row.reach) * 100, 2) if row.reach > 0 else 0
+            row.updated_at = now
+            rows.append(row)
+        
+        PostMetrics.objects.bulk_update(
+            rows, ['reach', 'impressions', 'saves', 'shares', 'engagement_rate', 'updated_at']
+        )
+        if rows:
+            DashboardStatsCache.invalidate(client_ids=[self.account.client_id])
+        return len(rows)
+    
+    def _get_posts_insights(self, post_ids):
+        """
+        Get insights for many posts, keyed by post id
+        
+        Uses Graph API batch requests (up to 50 posts per HTTPS round trip).
+        If a batch call fails as a whole, that chunk falls back to individual
+        requests run on a bounded thread pool over the pooled session.
+        """
+        insights = {}
+        
+        for start in range(0, len(post_ids), self.INSIGHTS_BATCH_SIZE):
+            chunk = post_ids[start:start + self.INSIGHTS_BATCH_SIZE]
+            try:
+                insights.update(self._get_post_insights_batch(chunk))
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(
+                    f"Batch insights request failed for {self.account.username}, "
+                    f"fetching {len(chunk)} posts concurrently: {str(e)}"
+                )
+                with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+                    insights.update(zip(chunk, executor.map(self._get_post_insights, chunk)))
+        
+        return insights
+    
+    def _get_post_insights_batch(self, post_ids):
+        """Fetch insights for up to INSIGHTS_BATCH_SIZE posts with one Graph API batch call"""
+        batch = [
+            {
+                'method': 'GET',
+                'relative_url': f"{post_id}/insights?metric={self.POST_INSIGHT_METRICS}"
+            }
+            for post_id in post_ids
+        ]
+        
+        response = self.http.post(
+            f"{self.base_url}/",
+            idempotent=True,
+            data={
+                'batch': json.dumps(batch),
+                'include_headers': 'false',
+                'access_token': self.access_token
+            }
+        )
+        response.raise_for_status()
+        
+        insights = {}
+        for post_id, result in zip(post_ids, response.json()):
+            # Each sub-response carries its own status code and a JSON-encoded body
+            if not result or result.get('code') != 200:
+                logger.warning(f"Failed to get post insights for {post_id}: {result}")
+                insights[post_id] = {}
+                continue
+            insights[post_id] = self._parse_post_insights(json.loads(result['body']))
+        
+        return insights
+    
+    @staticmethod
+    def _parse_post_insights(data):
+        """Flatten a /insights payload into {metric_name: value}"""
+        insights = {}
+        for metric_data in data.get('data', []):
+            metric_name = metric_data['name']
+            values = metric_data.get('values', [])
+            if values:
+                insights[metric_name] = values[0].get('value', 0)
+        return insights
+    
     def _calculate_engagement_rate(self):
         """Calculate overall engagement rate from recent posts"""
         try:
-            recent_posts = PostMetrics.objects.filter(
-                account=self.account,
-                posted_at__gte=timezone.now() - timedelta(days=30)
-            )[:10]  # Last 10 posts
-            
-            if not recent_posts:
-                return 0
-            
-            total_engagement = sum(
-                post.likes + post.comments for post in recent_posts
-            )
-            total_reach = sum(post.reach for post in recent_posts)
-            
-            if total_reach > 0:
-                return (total_engagement / total_reach) * 100
-            else:
-                return 0
-                
+            # Last 10 posts of the past 30 days
+            return EngagementAnalyticsService.recent_engagement_rate(self.account, days=30, limit=10)
         except Exception as e:
             logger.warning(f"Failed to calculate engagement rate: {str(e)}")
             return 0
@@ -281,7 +462,7 @@ class InstagramService:
                 'fb_exchange_token': short_lived_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -310,7 +491,7 @@ class InstagramService:
                 'fb_exchange_token': self.access_token
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -9,16 +9,17 @@ USAGE:
 3. Syncs YouTube videos to content posts
 """
 
+import calendar
 import logging
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.db.models import Avg, Sum, Max, Min, Count, F
+from django.db.models import Avg, Sum, Max, Min, Count, F, OuterRef, Subquery
 from decimal import Decimal
 
 from ..models import (
-    RealTimeMetrics, PerformanceData, SocialMediaAccount, 
-    Client, PostMetrics
+    RealTimeMetrics, AccountMetricsSnapshot, PerformanceData, SocialMediaAccount, PostMetrics
 )
+from .dashboard_cache import DashboardStatsCache
 
 logger = logging.getLogger(__name__)
 
@@ -45,12 +46,7 @@ class MetricsAggregationService:
         if isinstance(month_date, datetime):
             month_date = month_date.date()
         
-        start_date = month_date.replace(day=1)
-        
-        # Calculate last day of month
-        import calendar
-        last_day = calendar.monthrange(month_date.year, month_date.month)[1]
-        end_date = month_date.replace(day=last_day)
+        start_date, end_date = MetricsAggregationService._month_bounds(month_date)
         
         logger.info(f"Aggregating metrics for {client.name} from {start_date} to {end_date}")
         
@@ -141,23 +137,130 @@ class MetricsAggregationService:
         return performance_data
     
     @staticmethod
-    def aggregate_all_clients_current_month():
-        """Aggregate current month data for all clients"""
-        clients = Client.objects.filter(status='active')
-        current_month = timezone.now().date().replace(day=1)
+    def _month_bounds(month_date):
+        """Return (first_day, last_day) for the month containing month_date"""
+        start_date = month_date.replace(day=1)
+        last_day = calendar.monthrange(month_date.year, month_date.month)[1]
+        return start_date, month_date.replace(day=last_day)
+    
+    @staticmethod
+    def aggregate_all_clients_month(month_date=None):
+        """
+        Aggregate one month of metrics for every active client in a single pass
         
-        results = []
-        for client in clients:
-            try:
-                perf_data = MetricsAggregationService.aggregate_monthly_performance(
-                    client, current_month
+        Reads the latest RealTimeMetrics row per active account in the month
+        (DISTINCT ON account) together with the previous month's follower
+        count, totals them per client in memory and writes every
+        PerformanceData row with one bulk upsert.
+        
+        Args:
+            month_date: Date object for the month (defaults to current month)
+        
+        Returns:
+            List of PerformanceData instances that were written
+        """
+        if month_date is None:
+            month_date = timezone.now().date().replace(day=1)
+        
+        if isinstance(month_date, datetime):
+            month_date = month_date.date()
+        
+        start_date, end_date = MetricsAggregationService._month_bounds(month_date)
+        previous_month = (start_date - timedelta(days=1)).replace(day=1)
+        
+        logger.info(f"Bulk aggregating metrics for all active clients from {start_date} to {end_date}")
+        
+        previous_followers = PerformanceData.objects.filter(
+            client_id=OuterRef('account__client_id'),
+            month=previous_month
+        ).values('followers')[:1]
+        
+        latest_rows = RealTimeMetrics.objects.filter(
+            account__is_active=True,
+            account__client__status='active',
+            date__gte=start_date,
+            date__lte=end_date
+        ).order_by('account_id', '-date').distinct('account_id').annotate(
+            previous_followers=Subquery(previous_followers)
+        ).values(
+            'account__client_id',
+            'followers_count',
+            'reach',
+            'impressions',
+            'website_clicks',
+            'engagement_rate',
+            'previous_followers',
+        )
+        
+        totals = {}
+        for row in latest_rows:
+            client_totals = totals.setdefault(row['account__client_id'], {
+                'followers': 0,
+                'reach': 0,
+                'impressions': 0,
+                'clicks': 0,
+                'engagement_rates': [],
+                'previous_followers': row['previous_followers'],
+            })
+            client_totals['followers'] += row['followers_count']
+            client_totals['reach'] += row['reach']
+            client_totals['impressions'] += row['impressions']
+            client_totals['clicks'] += row['website_clicks']
+            client_totals['engagement_rates'].append(float(row['engagement_rate']))
+        
+        if not totals:
+            logger.warning(f"No metrics found for any active client in {start_date.strftime('%Y-%m')}")
+            return []
+        
+        now = timezone.now()
+        performance_rows = []
+        for client_id, client_totals in totals.items():
+            engagement_rates = client_totals['engagement_rates']
+            avg_engagement = Decimal(sum(engagement_rates) / len(engagement_rates))
+            
+            growth_rate = Decimal('0.00')
+            previous = client_totals['previous_followers']
+            if previous and previous > 0:
+                growth_rate = Decimal(
+                    ((client_totals['followers'] - previous) / previous) * 100
                 )
-                if perf_data:
-                    results.append(perf_data)
-            except Exception as e:
-                logger.error(f"Failed to aggregate for client {client.name}: {e}")
+            
+            performance_rows.append(PerformanceData(
+                client_id=client_id,
+                month=start_date,
+                followers=client_totals['followers'],
+                engagement=round(avg_engagement, 2),
+                reach=client_totals['reach'],
+                clicks=client_totals['clicks'],
+                impressions=client_totals['impressions'],
+                growth_rate=round(growth_rate, 2),
+                updated_at=now,
+            ))
+        
+        PerformanceData.objects.bulk_create(
+            performance_rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['client', 'month'],
+            update_fields=[
+                'followers', 'engagement', 'reach', 'clicks',
+                'impressions', 'growth_rate', 'updated_at'
+            ]
+        )
+        DashboardStatsCache.invalidate(admin=True)
         
-        return results
+        logger.info(
+            f"Upserted PerformanceData for {len(performance_rows)} clients - "
+            f"{start_date.strftime('%Y-%m')}"
+        )
+        
+        return performance_rows
+    
+    @staticmethod
+    def aggregate_all_clients_current_month():
+        """Aggregate current month data for all clients"""
+        current_month = timezone.now().date().replace(day=1)
+        return MetricsAggregationService.aggregate_all_clients_month(current_month)
     
     @staticmethod
     def get_client_real_time_stats(client):
@@ -179,25 +282,18 @@ class MetricsAggregationService:
                 'growth_rate': 0
             }
         
-        # Get latest metrics for each account
-        total_followers = 0
-        total_reach = 0
-        engagement_rates = []
-        daily_growths = []
+        # Latest metrics per account come from the denormalized snapshot table
+        latest = AccountMetricsSnapshot.objects.filter(
+            account__in=social_accounts
+        ).aggregate(
+            total_followers=Sum('followers_count'),
+            total_reach=Sum('reach'),
+            avg_engagement=Avg('engagement_rate')
+        )
         
-        for account in social_accounts:
-            latest = RealTimeMetrics.objects.filter(
-                account=account
-            ).order_by('-date').first()
-            
-            if latest:
-                total_followers += latest.followers_count
-                total_reach += latest.reach
-                engagement_rates.append(float(latest.engagement_rate))
-                daily_growths.append(latest.daily_growth)
-        
-        avg_engagement = sum(engagement_rates) / len(engagement_rates) if engagement_rates else 0
-        total_daily_growth = sum(daily_growths)
+        total_followers = latest['total_followers'] or 0
+        total_reach = latest['total_reach'] or 0
+        avg_engagement = float(latest['avg_engagement'] or 0)
         
         # Calculate growth rate from last 30 days
         thirty_days_ago = timezone.now().date() - timedelta(days=30)
@@ -0,0 +1,303 @@
+# server/api/services/metrics_rollup_service.py
+"""
+Tiered retention for RealTimeMetrics and SyncLog
+
+- Completed weeks and months of daily RealTimeMetrics are downsampled into MetricsRollup
+- Daily rows, weekly rollups and sync logs older than their configured
+  retention (settings.METRICS_RETENTION) are deleted in bounded batches
+- get_history() reads daily rows for short ranges and rollups for long ones
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Sum, Avg, Count
+from django.db.models.functions import TruncWeek, TruncMonth
+from django.utils import timezone
+
+from ..models import RealTimeMetrics, MetricsRollup, SyncLog
+from ..utils.time_series import bucket_start, next_bucket
+from .partition_service import PartitionManager
+
+logger = logging.getLogger(__name__)
+
+TRUNCATORS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# Values copied from the last day of a period rather than aggregated
+POINT_IN_TIME_FIELDS = ['followers_count', 'following_count', 'posts_count']
+ROLLUP_UPDATE_FIELDS = POINT_IN_TIME_FIELDS + [
+    'engagement_rate', 'reach', 'impressions', 'profile_views',
+    'website_clicks', 'follower_growth', 'days_covered', 'updated_at',
+]
+
+
+class MetricsRollupService:
+    """Downsampling, retention and long-range reads for account metrics"""
+
+    # ---------- rollups ----------
+
+    @staticmethod
+    def _aggregate(queryset, period):
+        """
+        Aggregate daily rows into one dict per (account_id, period_start)
+        Two grouped queries: sums/averages, and DISTINCT ON for the last day's counts
+        """
+        trunc = TRUNCATORS[period]('date')
+
+        totals = queryset.annotate(period_start=trunc).values(
+            'account_id', 'period_start'
+        ).annotate(
+            engagement_rate=Avg('engagement_rate'),
+            reach=Sum('reach'),
+            impressions=Sum('impressions'),
+            profile_views=Sum('profile_views'),
+            website_clicks=Sum('website_clicks'),
+            follower_growth=Sum('daily_growth'),
+            days_covered=Count('id'),
+        ).order_by()
+
+        last_days = queryset.annotate(period_start=trunc).order_by(
+            'account_id', 'period_start', '-date'
+        ).distinct('account_id', 'period_start').values(
+            'account_id', 'period_start', *POINT_IN_TIME_FIELDS
+        )
+
+        rows = {}
+        for row in totals:
+            row['period_start'] = MetricsRollupService._as_date(row['period_start'])
+            row['engagement_rate'] = Decimal(row['engagement_rate'] or 0).quantize(Decimal('0.01'))
+            rows[(row['account_id'], row['period_start'])] = row
+        for row in last_days:
+            key = (row['account_id'], MetricsRollupService._as_date(row['period_start']))
+            if key in rows:
+                rows[key].update({field: row[field] for field in POINT_IN_TIME_FIELDS})
+        return rows
+
+    @staticmethod
+    def _as_date(value):
+        return value.date() if hasattr(value, 'date') else value
+
+    @staticmethod
+    def build_rollups(period, batch_days=None):
+        """
+        Upsert rollups for every completed period not yet rolled up
+
+        Resumes from the newest existing rollup (recomputing it, in case late
+        rows arrived) and walks forward in bounded date windows.
+        """
+        config = settings.METRICS_RETENTION['realtime_metrics']
+        batch_days = batch_days or config['rollup_window_days']
+        current_start = bucket_start(timezone.now().date(), period)
+
+        latest = MetricsRollup.objects.filter(period=period).order_by('-period_start').values_list(
+            'period_start', flat=True
+        ).first()
+        if latest is None:
+            first_day = RealTimeMetrics.objects.order_by('date').values_list('date', flat=True).first()
+            if first_day is None:
+                return 0
+            latest = bucket_start(first_day, period)
+
+        written = 0
+        window_start = latest
+        while window_start < current_start:
+            # Windows always end on a period boundary so no period is split
+            window_end = window_start
+            while window_end < current_start and (window_end - window_start).days < batch_days:
+                window_end = next_bucket(window_end, period)
+            window_end = min(window_end, current_start)
+
+            rows = MetricsRollupService._aggregate(
+                RealTimeMetrics.objects.filter(date__gte=window_start, date__lt=window_end),
+                period
+            )
+            now = timezone.now()
+            rollups = [
+                MetricsRollup(period=period, updated_at=now, **row)
+                for row in rows.values()
+            ]
+            MetricsRollup.objects.bulk_create(
+                rollups,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['account', 'period', 'period_start'],
+                update_fields=ROLLUP_UPDATE_FIELDS
+            )
+            written += len(rollups)
+            window_start = window_end
+
+        logger.info(f"Wrote {written} {period}ly metrics rollups")
+        return written
+
+    # ---------- retention ----------
+
+    @staticmethod
+    def delete_in_batches(queryset, batch_size, max_batches):
+        """Delete matching rows a batch of primary keys at a time; returns rows deleted"""
+        model = queryset.model
+        deleted = 0
+        for _ in range(max_batches):
+            ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = model.objects.filter(pk__in=ids).delete()
+            deleted += count
+        return deleted
+
+    @staticmethod
+    def apply_retention():
+        """Roll up completed periods, then expire rows past their tier's retention"""
+        retention = settings.METRICS_RETENTION
+        max_batches = retention['max_batches_per_run']
+        metrics_config = retention['realtime_metrics']
+        today = timezone.now().date()
+        results = {}
+
+        # Roll up first so nothing is deleted before it has been downsampled
+        results['weekly_rollups'] = MetricsRollupService.build_rollups('week')
+        results['monthly_rollups'] = MetricsRollupService.build_rollups('month')
+
+        # Daily rows are only dropped once their week and month have been rolled up
+        daily_cutoff = min(
+            today - timedelta(days=metrics_config['daily_days']),
+            bucket_start(today, 'week'),
+            bucket_start(today, 'month')
+        )
+        # Whole expired months go with a partition drop; the batch delete handles the remainder
+        partitions = PartitionManager('api.RealTimeMetrics')
+        if partitions.is_partitioned():
+            results['partitions_dropped'] = partitions.expire_partitions(daily_cutoff)
+        results['daily_deleted'] = MetricsRollupService.delete_in_batches(
+            RealTimeMetrics.objects.filter(date__lt=daily_cutoff),
+            metrics_config['batch_size'],
+            max_batches
+        )
+
+        if metrics_config['weekly_days'] is not None:
+            results['weekly_deleted'] = MetricsRollupService.delete_in_batches(
+                MetricsRollup.objects.filter(
+                    period='week',
+                    period_start__lt=today - timedelta(days=metrics_config['weekly_days'])
+                ),
+                metrics_config['batch_size'],
+                max_batches
+            )
+
+        if metrics_config['monthly_days'] is not None:
+            results['monthly_deleted'] = MetricsRollupService.delete_in_batches(
+                MetricsRollup.objects.filter(
+                    period='month',
+                    period_start__lt=today - timedelta(days=metrics_config['monthly_days'])
+                ),
+                metrics_config['batch_size'],
+                max_batches
+            )
+
+        sync_log_config = retention['sync_logs']
+        results['sync_logs_deleted'] = MetricsRollupService.delete_in_batches(
+            SyncLog.objects.filter(
+                started_at__lt=timezone.now() - timedelta(days=sync_log_config['days'])
+            ).exclude(status='in_progress'),
+            sync_log_config['batch_size'],
+            max_batches
+        )
+
+        logger.info(f"Metrics retention run: {results}")
+        return results
+
+    # ---------- reads ----------
+
+    @staticmethod
+    def resolution_for(start_date, end_date):
+        """Daily for short ranges, weekly up to two years, monthly beyond"""
+        span = (end_date - start_date).days
+        if span <= settings.METRICS_RETENTION['daily_query_max_days']:
+            return 'day'
+        if span <= 730:
+            return 'week'
+        return 'month'
+
+    @staticmethod
+    def get_history(accounts, start_date, end_date, resolution=None):
+        """
+        Follower/engagement series for the given accounts between two dates
+
+        Long ranges read MetricsRollup; the current, not-yet-rolled-up period
+        is aggregated from daily rows so the series always reaches end_date.
+        Points are summed across accounts (engagement is averaged).
+        """
+        resolution = resolution or MetricsRollupService.resolution_for(start_date, end_date)
+        daily = RealTimeMetrics.objects.filter(account__in=accounts)
+
+        if resolution == 'day':
+            rows = daily.filter(date__gte=start_date, date__lte=end_date).values('date').annotate(
+                followers=Sum('followers_count'),
+                engagement_rate=Avg('engagement_rate'),
+                reach=Sum('reach'),
+                impressions=Sum('impressions'),
+                growth=Sum('daily_growth'),
+            ).order_by('date')
+            return {
+                'resolution': 'day',
+                'points': [MetricsRollupService._point(row['date'], row) for row in rows]
+            }
+
+        first_period = bucket_start(start_date, resolution)
+
+        # Periods after the newest rollup (the current one, or any the job has not reached yet)
+        latest = MetricsRollup.objects.filter(period=resolution).order_by('-period_start').values_list(
+            'period_start', flat=True
+        ).first()
+        daily_from = next_bucket(latest, resolution) if latest else first_period
+        daily_from = max(daily_from, first_period)
+
+        rows = MetricsRollup.objects.filter(
+            account__in=accounts,
+            period=resolution,
+            period_start__gte=first_period,
+            period_start__lt=daily_from,
+            period_start__lte=end_date
+        ).values('period_start').annotate(
+            followers=Sum('followers_count'),
+            engagement_rate=Avg('engagement_rate'),
+            reach=Sum('reach'),
+            impressions=Sum('impressions'),
+            growth=Sum('follower_growth'),
+        ).order_by('period_start')
+        points = [MetricsRollupService._point(row['period_start'], row) for row in rows]
+
+        if end_date >= daily_from:
+            partial = MetricsRollupService._aggregate(
+                daily.filter(date__gte=daily_from, date__lte=end_date),
+                resolution
+            )
+            by_period = {}
+            for (_, period_start), row in partial.items():
+                by_period.setdefault(period_start, []).append(row)
+            for period_start in sorted(by_period):
+                values = by_period[period_start]
+                points.append(MetricsRollupService._point(period_start, {
+                    'followers': sum(row['followers_count'] for row in values),
+                    'engagement_rate': sum(row['engagement_rate'] for row in values) / len(values),
+                    'reach': sum(row['reach'] for row in values),
+                    'impressions': sum(row['impressions'] for row in values),
+                    'growth': sum(row['follower_growth'] for row in values),
+                }))
+
+        return {'resolution': resolution, 'points': points}
+
+    @staticmethod
+    def _point(day, row):
+        return {
+            'date': day.isoformat(),
+            'followers': row['followers'] or 0,
+            'engagement_rate': round(float(row['engagement_rate'] or 0), 2),
+            'reach': row['reach'] or 0,
+            'impressions': row['impressions'] or 0,
+            'growth': row['growth'] or 0,
+        }
@@ -0,0 +1,123 @@
+# server/api/services/notification_digest.py
+"""
+Email digests for bursty notification types
+
+Instead of one email per event, events for the same (recipient, type, source)
+are collected in a NotificationDigest row. The row is created by the first
+event and emailed NOTIFICATION_COALESCING['digest_seconds'][type] later, as
+one email covering every event in between. If the user has already read the
+matching in-app notification by then, the email is dropped. Types without a
+cadence are emailed immediately.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Notification, NotificationDigest
+from .email_templates import EmailTemplates
+
+logger = logging.getLogger(__name__)
+
+
+def _display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.email
+
+
+def _message_email(user, source_name, count, previews):
+    if count == 1:
+        return EmailTemplates.send_message_notification(
+            email=user.email,
+            name=_display_name(user),
+            sender_name=source_name,
+            message_preview=previews[-1] if previews else ''
+        )
+    return EmailTemplates.send_message_digest(
+        email=user.email,
+        name=_display_name(user),
+        sender_name=source_name,
+        count=count,
+        previews=previews
+    )
+
+
+# notification_type -> sender(user, source_name, event_count, previews)
+DIGEST_EMAILS = {
+    'message_received': _message_email,
+}
+
+
+class NotificationDigestService:
+    """Collect events per (user, type, source) and email them on a cadence"""
+
+    @staticmethod
+    def add(user, notification_type, source, source_name, preview=''):
+        """Record an event for the user's digest, or email it now if the type has no cadence"""
+        config = settings.NOTIFICATION_COALESCING
+        cadence = config['digest_seconds'].get(notification_type, 0)
+        if not cadence:
+            return DIGEST_EMAILS[notification_type](user, source_name, 1, [preview])
+
+        group_key = f"{notification_type}:{source}"
+        with transaction.atomic():
+            digest, created = NotificationDigest.objects.select_for_update().get_or_create(
+                user=user,
+                group_key=group_key,
+                defaults={
+                    'notification_type': notification_type,
+                    'source_name': source_name,
+                    'previews': [preview],
+                    'send_after': timezone.now() + timedelta(seconds=cadence),
+                }
+            )
+            if not created:
+                digest.event_count = F('event_count') + 1
+                digest.source_name = source_name
+                digest.previews = (digest.previews + [preview])[-config['max_digest_previews']:]
+                digest.save(update_fields=['event_count', 'source_name', 'previews'])
+        return True
+
+    @staticmethod
+    def flush():
+        """Email every due digest; returns counts"""
+        config = settings.NOTIFICATION_COALESCING
+        totals = {'sent': 0, 'skipped': 0}
+        while True:
+            with transaction.atomic():
+                digests = list(
+                    NotificationDigest.objects.select_for_update(skip_locked=True, of=('self',))
+                    .select_related('user')
+                    .filter(send_after__lte=timezone.now())[:config['batch_size']]
+                )
+                if not digests:
+                    break
+
+                # Skip events the user has already seen in the app
+                unread = set(Notification.objects.filter(
+                    user_id__in={digest.user_id for digest in digests},
+                    group_key__in={digest.group_key for digest in digests},
+                    read=False
+                ).values_list('user_id', 'group_key'))
+
+                for digest in digests:
+                    if (digest.user_id, digest.group_key) in unread and digest.user.is_active:
+                        DIGEST_EMAILS[digest.notification_type](
+                            digest.user, digest.source_name, digest.event_count, digest.previews
+                        )
+                        totals['sent'] += 1
+                    else:
+                        totals['skipped'] += 1
+
+                # Queued emails and the deletes commit together
+                NotificationDigest.objects.filter(id__in=[digest.id for digest in digests]).delete()
+
+            if len(digests) < config['batch_size']:
+                break
+
+        if totals['sent'] or totals['skipped']:
+            logger.info(f"Notification digests: {totals}")
+        return totals
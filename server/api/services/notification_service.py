@@ -2,11 +2,18 @@
 """
 Notification service for sending various types of notifications
 """
-from django.contrib.auth import get_user_model
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from ..models import Notification
+from .realtime import RealtimePublisher
+from .recipient_index import RecipientIndex
+from .unread_counter import UnreadCounter
 import logging
 
-User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
@@ -29,41 +36,164 @@ class NotificationService:
             logger.error(f"Error creating notification: {e}")
             return None
     
+    @staticmethod
+    def create_notifications(entries, batch_size=1000):
+        """
+        Create many notifications with bulk_create
+        entries: iterable of (user_id, title, message, notification_type)
+        """
+        now = timezone.now()
+        notifications = [
+            Notification(
+                user_id=user_id,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                created_at=now
+            )
+            for user_id, title, message, notification_type in entries
+        ]
+        if not notifications:
+            return []
+        try:
+            created = Notification.objects.bulk_create(notifications, batch_size=batch_size)
+            UnreadCounter.adjust(Counter(notification.user_id for notification in created))
+            RealtimePublisher.notifications_created(created)
+            logger.info(f"Created {len(created)} notifications")
+            return created
+        except Exception as e:
+            logger.error(f"Error creating notifications: {e}")
+            return []
+    
+    @staticmethod
+    def coalesce_notifications(user_ids, notification_type, source, render):
+        """
+        Merge an event into each user's open notification for (notification_type, source)
+
+        A notification stays open while it is unread and its last event is
+        within NOTIFICATION_COALESCING['window_seconds']; otherwise a new one is
+        created. render(event_count) returns (title, message). Merged rows move
+        to the top of the list and are pushed again with their new count.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+        group_key = f"{notification_type}:{source}"
+        now = timezone.now()
+        since = now - timedelta(seconds=settings.NOTIFICATION_COALESCING['window_seconds'])
+        try:
+            with transaction.atomic():
+                open_notifications = {
+                    notification.user_id: notification
+                    for notification in Notification.objects.select_for_update().filter(
+                        user_id__in=user_ids, group_key=group_key, read=False, created_at__gte=since
+                    ).order_by('created_at')
+                }
+                merged = list(open_notifications.values())
+                for notification in merged:
+                    notification.event_count += 1
+                    notification.title, notification.message = render(notification.event_count)
+                    notification.created_at = now
+                Notification.objects.bulk_update(merged, ['event_count', 'title', 'message', 'created_at'])
+
+                title, message = render(1)
+                created = Notification.objects.bulk_create([
+                    Notification(
+                        user_id=user_id,
+                        title=title,
+                        message=message,
+                        notification_type=notification_type,
+                        group_key=group_key,
+                        created_at=now
+                    )
+                    for user_id in user_ids if user_id not in open_notifications
+                ])
+
+            # Merged rows were already unread, so only new rows change the counters
+            UnreadCounter.adjust(Counter(notification.user_id for notification in created))
+            RealtimePublisher.notifications_created(merged + created)
+            return merged + created
+        except Exception as e:
+            logger.error(f"Error coalescing {group_key} notifications: {e}")
+            return []
+    
+    @staticmethod
+    def notify_users(user_ids, title, message, notification_type='general'):
+        """Send the same notification to every user id in user_ids"""
+        return NotificationService.create_notifications(
+            (user_id, title, message, notification_type) for user_id in dict.fromkeys(user_ids)
+        )
+    
+    @staticmethod
+    def notify_audience(audience, title, message, notification_type='general', client_id=None):
+        """Send a notification to a role-based audience ('admins', 'client_agents', 'staff')"""
+        return NotificationService.notify_users(
+            RecipientIndex.resolve(audience, client_id=client_id), title, message, notification_type
+        )
+    
     # Content-related notifications
     @staticmethod
     def notify_content_submitted(content_post):
-        """Notify admins when client submits content"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="New Content Submitted 📝",
-                message=f"Client {content_post.client.name} submitted content: '{content_post.caption[:50]}...' for review.",
-                notification_type='content_submitted'
-            )
+        """Notify admins and the client's agents when client submits content"""
+        NotificationService.notify_audience(
+            'staff',
+            title="New Content Submitted 📝",
+            message=f"Client {content_post.client.name} submitted content: '{content_post.caption[:50]}...' for review.",
+            notification_type='content_submitted',
+            client_id=content_post.client_id
+        )
+    
+    @staticmethod
+    def _content_approved(content_post):
+        """(title, message, notification_type) for an approved post"""
+        return (
+            "Content Approved ✅",
+            f"Your content '{content_post.caption[:50]}...' has been approved and is ready for posting!",
+            'content_approved'
+        )
+    
+    @staticmethod
+    def _content_rejected(content_post, feedback=""):
+        """(title, message, notification_type) for a post sent back for revision"""
+        message = f"Your content '{content_post.caption[:50]}...' needs revision."
+        if feedback:
+            message += f" Feedback: {feedback}"
+        return "Content Needs Revision 📝", message, 'content_rejected'
     
     @staticmethod
     def notify_content_approved(client_user, content_post):
         """Notify client when content is approved"""
+        title, message, notification_type = NotificationService._content_approved(content_post)
         NotificationService.create_notification(
             user=client_user,
-            title="Content Approved ✅",
-            message=f"Your content '{content_post.caption[:50]}...' has been approved and is ready for posting!",
-            notification_type='content_approved'
+            title=title,
+            message=message,
+            notification_type=notification_type
         )
     
     @staticmethod
     def notify_content_rejected(client_user, content_post, feedback=""):
         """Notify client when content needs revision"""
-        message = f"Your content '{content_post.caption[:50]}...' needs revision."
-        if feedback:
-            message += f" Feedback: {feedback}"
-        
+        title, message, notification_type = NotificationService._content_rejected(content_post, feedback)
         NotificationService.create_notification(
             user=client_user,
-            title="Content Needs Revision 📝",
+            title=title,
             message=message,
-            notification_type='content_rejected'
+            notification_type=notification_type
+        )
+    
+    @staticmethod
+    def notify_content_approved_bulk(content_posts):
+        """Notify each post's client of approval in one insert (posts need client loaded)"""
+        return NotificationService.create_notifications(
+            (post.client.user_id, *NotificationService._content_approved(post)) for post in content_posts
+        )
+    
+    @staticmethod
+    def notify_content_rejected_bulk(content_posts, feedback=""):
+        """Notify each post's client that it needs revision in one insert"""
+        return NotificationService.create_notifications(
+            (post.client.user_id, *NotificationService._content_rejected(post, feedback)) for post in content_posts
         )
     
     @staticmethod
@@ -78,24 +208,43 @@ class NotificationService:
     
     # Message notifications
     @staticmethod
-    def notify_message_to_admin(sender_name):
-        """Notify admins of new message"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="New Message 💬",
-                message=f"You have a new message from {sender_name}",
-                notification_type='message_received'
+    def _message_received(sender_name):
+        """render(event_count) for message notifications from one sender"""
+        def render(count):
+            if count == 1:
+                return "New Message 💬", f"You have a new message from {sender_name}"
+            return "New Messages 💬", f"You have {count} new messages from {sender_name}"
+        return render
+    
+    @staticmethod
+    def notify_message_to_admin(sender_name, sender_id=None):
+        """Notify admins of new message; messages from the same sender_id are coalesced"""
+        render = NotificationService._message_received(sender_name)
+        if sender_id is not None:
+            return NotificationService.coalesce_notifications(
+                RecipientIndex.admins(), 'message_received', sender_id, render
             )
+        title, message = render(1)
+        return NotificationService.notify_audience(
+            'admins',
+            title=title,
+            message=message,
+            notification_type='message_received'
+        )
     
     @staticmethod
-    def notify_message_received(recipient_user, sender_name):
-        """Notify user of new message"""
-        NotificationService.create_notification(
+    def notify_message_received(recipient_user, sender_name, sender_id=None):
+        """Notify user of new message; messages from the same sender_id are coalesced"""
+        render = NotificationService._message_received(sender_name)
+        if sender_id is not None:
+            return NotificationService.coalesce_notifications(
+                [recipient_user.id], 'message_received', sender_id, render
+            )
+        title, message = render(1)
+        return NotificationService.create_notification(
             user=recipient_user,
-            title="New Message 💬",
-            message=f"You have a new message from {sender_name}",
+            title=title,
+            message=message,
             notification_type='message_received'
         )
     
@@ -103,14 +252,12 @@ class NotificationService:
     @staticmethod
     def notify_new_user_registered(user):
         """Notify admins of new user registration"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="New User Registered 👋",
-                message=f"New user {user.first_name or user.email} has registered with role: {user.role}",
-                notification_type='user_registered'
-            )
+        NotificationService.notify_audience(
+            'admins',
+            title="New User Registered 👋",
+            message=f"New user {user.first_name or user.email} has registered with role: {user.role}",
+            notification_type='user_registered'
+        )
     
     # Invoice notifications
     @staticmethod
@@ -167,14 +314,12 @@ class NotificationService:
     @staticmethod
     def notify_subscription_created(client, plan_name):
         """Notify admins of new subscription"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="New Subscription Created 💼",
-                message=f"Client {client.name} has subscribed to {plan_name}",
-                notification_type='subscription_created'
-            )
+        NotificationService.notify_audience(
+            'admins',
+            title="New Subscription Created 💼",
+            message=f"Client {client.name} has subscribed to {plan_name}",
+            notification_type='subscription_created'
+        )
     
     @staticmethod
     def notify_subscription_cancelled(client_user):
@@ -189,14 +334,12 @@ class NotificationService:
     @staticmethod
     def notify_client_cancelled_subscription(client):
         """Notify admins when client cancels subscription"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="Client Cancelled Subscription",
-                message=f"Client {client.name} has cancelled their subscription.",
-                notification_type='subscription_cancelled'
-            )
+        NotificationService.notify_audience(
+            'admins',
+            title="Client Cancelled Subscription",
+            message=f"Client {client.name} has cancelled their subscription.",
+            notification_type='subscription_cancelled'
+        )
     
     @staticmethod
     def notify_subscription_renewal_reminder(client_user, renewal_date):
@@ -212,14 +355,12 @@ class NotificationService:
     @staticmethod
     def notify_payment_verification_submitted(client, amount, plan):
         """Notify admins of payment verification submission"""
-        admin_users = User.objects.filter(role='admin')
-        for admin in admin_users:
-            NotificationService.create_notification(
-                user=admin,
-                title="Payment Verification Submitted 💳",
-                message=f"Client {client.name} submitted payment verification for {plan} plan (${amount})",
-                notification_type='payment_verification'
-            )
+        NotificationService.notify_audience(
+            'admins',
+            title="Payment Verification Submitted 💳",
+            message=f"Client {client.name} submitted payment verification for {plan} plan (${amount})",
+            notification_type='payment_verification'
+        )
     
     # Task notifications
     @staticmethod
@@ -234,14 +375,26 @@ class NotificationService:
     
     # Performance notifications
     @staticmethod
-    def notify_monthly_performance_report(client_user, metrics):
-        """Send monthly performance report"""
+    def _monthly_performance_report(metrics):
+        """(title, message, notification_type) for a monthly report"""
         growth_message = f"Your account grew by {metrics.daily_growth} followers this month! "
         growth_message += f"Current total: {metrics.followers_count} followers with {metrics.engagement_rate}% engagement."
-        
+        return "Monthly Performance Report 📊", growth_message, 'performance_update'
+    
+    @staticmethod
+    def notify_monthly_performance_report(client_user, metrics):
+        """Send monthly performance report"""
+        title, message, notification_type = NotificationService._monthly_performance_report(metrics)
         NotificationService.create_notification(
             user=client_user,
-            title="Monthly Performance Report 📊",
-            message=growth_message,
-            notification_type='performance_update'
+            title=title,
+            message=message,
+            notification_type=notification_type
+        )
+    
+    @staticmethod
+    def notify_monthly_performance_reports(reports):
+        """Send monthly reports in one insert; reports: iterable of (client_user_id, metrics)"""
+        return NotificationService.create_notifications(
+            (user_id, *NotificationService._monthly_performance_report(metrics)) for user_id, metrics in reports
         )
\ No newline at end of file
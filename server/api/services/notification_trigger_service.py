@@ -5,6 +5,7 @@ This service should be called from views/signals when events occur
 """
 from .notification_service import NotificationService
 from .email_templates import EmailTemplates
+from .notification_digest import NotificationDigestService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -100,19 +101,20 @@ class NotificationTriggerService:
     # ============ MESSAGE TRIGGERS ============
 
     @staticmethod
-    def trigger_message_notification(recipient_user, sender_name, message_preview):
-        """Trigger notification + email for new message"""
+    def trigger_message_notification(recipient_user, sender_name, message_preview, sender_id):
+        """Trigger notification + email for new message, coalesced per sender"""
         try:
-            # Create in-app notification
-            NotificationService.notify_message_received(recipient_user, sender_name)
-
-            # Send email
-            name = f"{recipient_user.first_name} {recipient_user.last_name}".strip() or recipient_user.email
-            EmailTemplates.send_message_notification(
-                email=recipient_user.email,
-                name=name,
-                sender_name=sender_name,
-                message_preview=message_preview
+            # Create or update the in-app notification
+            NotificationService.notify_message_received(recipient_user, sender_name, sender_id=sender_id)
+
+            # Email now, or add to the sender's digest; flush only sends it while the
+            # notification above (same message_received:<sender_id> group) is still unread
+            NotificationDigestService.add(
+                recipient_user,
+                'message_received',
+                source=sender_id,
+                source_name=sender_name,
+                preview=message_preview
             )
 
             logger.info(f"Message notification triggered for {recipient_user.email}")
@@ -214,6 +216,45 @@ class NotificationTriggerService:
         except Exception as e:
             logger.error(f"Error triggering content rejected notification: {e}")
 
+    @staticmethod
+    def trigger_content_approved_bulk(content_posts):
+        """In-app notifications for many approved posts in one insert, then one email per post"""
+        content_posts = list(content_posts)
+        NotificationService.notify_content_approved_bulk(content_posts)
+        for content_post in content_posts:
+            client_user = content_post.client.user
+            try:
+                name = f"{client_user.first_name} {client_user.last_name}".strip() or client_user.email
+                content_title = content_post.caption[:50] + '...' if len(content_post.caption) > 50 else content_post.caption
+                EmailTemplates.send_content_approved(
+                    email=client_user.email,
+                    name=name,
+                    content_title=content_title
+                )
+            except Exception as e:
+                logger.error(f"Error sending content approved email to {client_user.email}: {e}")
+        logger.info(f"Content approved notifications triggered for {len(content_posts)} posts")
+
+    @staticmethod
+    def trigger_content_rejected_bulk(content_posts, feedback=""):
+        """In-app notifications for many rejected posts in one insert, then one email per post"""
+        content_posts = list(content_posts)
+        NotificationService.notify_content_rejected_bulk(content_posts, feedback)
+        for content_post in content_posts:
+            client_user = content_post.client.user
+            try:
+                name = f"{client_user.first_name} {client_user.last_name}".strip() or client_user.email
+                content_title = content_post.caption[:50] + '...' if len(content_post.caption) > 50 else content_post.caption
+                EmailTemplates.send_content_rejected(
+                    email=client_user.email,
+                    name=name,
+                    content_title=content_title,
+                    feedback=feedback or "Please review and make necessary changes."
+                )
+            except Exception as e:
+                logger.error(f"Error sending content rejected email to {client_user.email}: {e}")
+        logger.info(f"Content rejected notifications triggered for {len(content_posts)} posts")
+
     @staticmethod
     def trigger_content_posted(client_user, content_post):
         """Trigger notification + email for content posting"""
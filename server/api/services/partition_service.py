@@ -0,0 +1,133 @@
+# server/api/services/partition_service.py
+"""
+Monthly range partitions for the metrics tables (Postgres only)
+
+Partitions are named <table>_pYYYY_MM, plus a <table>_default catch-all.
+Migration 0022 converts the tables; this manager keeps partitions ahead of
+time and expires old ones with a cheap DROP/DETACH instead of a large DELETE.
+"""
+
+import logging
+from datetime import date
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionManager:
+    """Create and expire monthly partitions for one model"""
+
+    def __init__(self, model_label):
+        self.model = apps.get_model(model_label)
+        self.config = settings.METRICS_PARTITIONS[model_label]
+        self.table = self.model._meta.db_table
+        self.column = self.config['column']
+        self.is_timestamp = self.model._meta.get_field(self.column).get_internal_type() == 'DateTimeField'
+
+    @staticmethod
+    def all():
+        return [PartitionManager(label) for label in settings.METRICS_PARTITIONS]
+
+    def partition_name(self, month_start):
+        return f"{self.table}_p{month_start.year}_{month_start.month:02d}"
+
+    def _bound(self, month_start):
+        return f"{month_start.isoformat()} 00:00:00+00" if self.is_timestamp else month_start.isoformat()
+
+    def is_partitioned(self):
+        if connection.vendor != 'postgresql':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+                [self.table]
+            )
+            return cursor.fetchone() is not None
+
+    def existing_months(self):
+        """Month starts of the attached monthly partitions"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+                [self.table]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        prefix = f"{self.table}_p"
+        months = []
+        for name in names:
+            if name.startswith(prefix):
+                year, month = name[len(prefix):].split('_')
+                months.append(date(int(year), int(month), 1))
+        return sorted(months)
+
+    def create_partition(self, month_start):
+        """
+        Attach a partition for one month
+
+        Rows that already landed in the default partition for that month are
+        moved across first, otherwise ATTACH would reject the range.
+        """
+        qn = connection.ops.quote_name
+        name = qn(self.partition_name(month_start))
+        table, default, column = qn(self.table), qn(f"{self.table}_default"), qn(self.column)
+        lower, upper = self._bound(month_start), self._bound(add_months(month_start, 1))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {default} WHERE {column} >= %s AND {column} < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                [lower, upper]
+            )
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                [lower, upper]
+            )
+        logger.info(f"Created partition {self.partition_name(month_start)}")
+
+    def ensure_partitions(self, months_ahead=None):
+        """Create any missing partitions from the current month up to months_ahead"""
+        months_ahead = self.config['months_ahead'] if months_ahead is None else months_ahead
+        existing = set(self.existing_months())
+        current = date.today().replace(day=1)
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month_start = add_months(current, offset)
+            if month_start not in existing:
+                self.create_partition(month_start)
+                created.append(self.partition_name(month_start))
+        return created
+
+    def expire_partitions(self, before, detach=False):
+        """
+        Drop (or detach) monthly partitions that end on or before the given date
+
+        Detached partitions stay as standalone tables for archiving.
+        """
+        qn = connection.ops.quote_name
+        expired = []
+        for month_start in self.existing_months():
+            if add_months(month_start, 1) > before:
+                continue
+            name = self.partition_name(month_start)
+            with connection.cursor() as cursor:
+                if detach:
+                    cursor.execute(f"ALTER TABLE {qn(self.table)} DETACH PARTITION {qn(name)}")
+                else:
+                    cursor.execute(f"DROP TABLE {qn(name)}")
+            expired.append(name)
+            logger.info(f"{'Detached' if detach else 'Dropped'} partition {name}")
+        return expired
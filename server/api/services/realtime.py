@@ -0,0 +1,98 @@
+# server/api/services/realtime.py
+"""
+Real-time push to connected users
+
+Every WebSocket connection served by api.consumers.EventsConsumer joins its
+user's group (user.<user_id>). Events are fanned out through the channel
+layer (Redis in production, in-memory when CHANNEL_LAYER=memory) in one
+async_to_sync call, so WSGI workers can publish too. Events about rows are
+sent after the transaction commits. Publishing never raises: clients that
+miss an event can still load the data over the REST endpoints.
+
+Event payloads:
+- {'type': 'notification', 'notification': {...}}
+- {'type': 'message', 'message': {...}}
+- {'type': 'unread_count', 'count': n}
+"""
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimePublisher:
+    """Publish events to the WebSocket groups of users"""
+
+    @staticmethod
+    def user_group(user_id):
+        return f"user.{user_id}"
+
+    @staticmethod
+    def _jsonable(payload):
+        # The Redis layer serializes with msgpack, which has no UUID, datetime or Decimal
+        return json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+
+    @staticmethod
+    def send(events):
+        """Deliver [(user_id, payload), ...] now"""
+        events = list(events)
+        if not events:
+            return
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+
+        async def fan_out():
+            await asyncio.gather(*(
+                channel_layer.group_send(
+                    RealtimePublisher.user_group(user_id),
+                    {'type': 'push', 'payload': RealtimePublisher._jsonable(payload)}
+                )
+                for user_id, payload in events
+            ))
+
+        try:
+            async_to_sync(fan_out)()
+        except Exception as e:
+            logger.warning(f"Could not publish {len(events)} real-time events: {e}")
+
+    @staticmethod
+    def publish(events):
+        """Deliver [(user_id, payload), ...] once the current transaction commits"""
+        events = list(events)
+        transaction.on_commit(lambda: RealtimePublisher.send(events))
+
+    # ---------- events ----------
+
+    @staticmethod
+    def notifications_created(notifications):
+        from ..serializers import NotificationSerializer
+
+        RealtimePublisher.publish(
+            (notification.user_id, {'type': 'notification', 'notification': NotificationSerializer(notification).data})
+            for notification in notifications
+        )
+
+    @staticmethod
+    def message_created(message):
+        from ..serializers import MessageSerializer
+
+        payload = {'type': 'message', 'message': MessageSerializer(message).data}
+        # The sender's other tabs and devices see the message too
+        RealtimePublisher.publish(
+            (user_id, payload) for user_id in dict.fromkeys([message.receiver_id, message.sender_id])
+        )
+
+    @staticmethod
+    def unread_counts(counts):
+        """Push {user_id: count}; callers run after commit"""
+        RealtimePublisher.send(
+            (user_id, {'type': 'unread_count', 'count': count}) for user_id, count in counts.items()
+        )
@@ -0,0 +1,86 @@
+# server/api/services/recipient_index.py
+"""
+Cached recipient sets for role-based notification audiences
+
+- admins(): ids of active admin users
+- client_agents(client_id): user ids of the active agents managing a client
+  (Client.assigned_agent plus per-service ClientServiceSettings.assigned_agent)
+
+Sets are cached for settings.CACHE_TIMEOUTS['recipients'] and dropped by the
+signal receivers in api/signals.py when users, agents or assignments change.
+Agent and user changes can touch any client's set, so the per-client keys
+carry a generation number that is bumped instead of deleting every key.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+ADMINS_KEY = 'recipients:admins'
+CLIENT_AGENTS_GENERATION_KEY = 'recipients:client_agents:generation'
+
+
+class RecipientIndex:
+    """Resolve notification audiences to user ids"""
+
+    @staticmethod
+    def admins():
+        user_ids = cache.get(ADMINS_KEY)
+        if user_ids is None:
+            from ..models import User
+
+            user_ids = list(User.objects.filter(role='admin', is_active=True).values_list('id', flat=True))
+            cache.set(ADMINS_KEY, user_ids, timeout=settings.CACHE_TIMEOUTS['recipients'])
+        return user_ids
+
+    @staticmethod
+    def _client_agents_key(client_id):
+        generation = cache.get_or_set(CLIENT_AGENTS_GENERATION_KEY, 1, timeout=None)
+        return f"recipients:client_agents:{generation}:{client_id}"
+
+    @staticmethod
+    def client_agents(client_id):
+        key = RecipientIndex._client_agents_key(client_id)
+        user_ids = cache.get(key)
+        if user_ids is None:
+            from ..models import Agent
+
+            user_ids = list(Agent.objects.filter(
+                Q(assigned_clients__id=client_id) |
+                Q(service_clients__client_id=client_id, service_clients__is_active=True),
+                is_active=True,
+                user__is_active=True
+            ).values_list('user_id', flat=True).distinct())
+            cache.set(key, user_ids, timeout=settings.CACHE_TIMEOUTS['recipients'])
+        return user_ids
+
+    @staticmethod
+    def resolve(audience, client_id=None):
+        """User ids for 'admins', 'client_agents' or 'staff' (both)"""
+        if audience == 'admins':
+            return RecipientIndex.admins()
+        if audience == 'client_agents':
+            return RecipientIndex.client_agents(client_id)
+        if audience == 'staff':
+            return list(dict.fromkeys(RecipientIndex.admins() + RecipientIndex.client_agents(client_id)))
+        raise ValueError(f"Unknown audience: {audience}")
+
+    # ---------- invalidation ----------
+
+    @staticmethod
+    def invalidate_admins():
+        transaction.on_commit(lambda: cache.delete(ADMINS_KEY))
+
+    @staticmethod
+    def invalidate_client(client_id):
+        transaction.on_commit(lambda: cache.delete(RecipientIndex._client_agents_key(client_id)))
+
+    @staticmethod
+    def invalidate_all_clients():
+        def bump():
+            try:
+                cache.incr(CLIENT_AGENTS_GENERATION_KEY)
+            except ValueError:
+                cache.set(CLIENT_AGENTS_GENERATION_KEY, 2, timeout=None)
+        transaction.on_commit(bump)
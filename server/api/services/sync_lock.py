@@ -0,0 +1,124 @@
+# server/api/services/sync_lock.py
+"""
+Single-flight lock for social account syncs
+
+The scheduler, manual triggers, OAuth callbacks and Celery retries can all ask
+for the same account to be synced. The first caller claims the account with its
+Celery task id; everyone else attaches to that task id instead of starting new
+work. The lock is held from dispatch until the task finishes (including while it
+waits to retry) and expires on its own if a worker dies.
+"""
+
+import logging
+import time
+import uuid
+
+from django.conf import settings
+
+from ..utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Claim the lock for ARGV[1], or keep it if ARGV[1] already owns it. Returns 1 when owned.
+ACQUIRE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current == false then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+if current == ARGV[1] then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Delete the lock only if ARGV[1] still owns it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1], KEYS[2])
+end
+return 0
+"""
+
+
+class SyncLock:
+    """Redis single-flight lock keyed by social account id"""
+
+    def __init__(self, account_id):
+        self.account_id = str(account_id)
+        self.redis = get_redis()
+        self.key = f"sync:inflight:{self.account_id}"
+        self.meta_key = f"{self.key}:meta"
+        self.timeout = settings.SYNC_SCHEDULER['lock_timeout_seconds']
+
+    def current(self):
+        """In-flight sync details, or None when the account is idle"""
+        pipe = self.redis.pipeline()
+        pipe.get(self.key)
+        pipe.hgetall(self.meta_key)
+        task_id, meta = pipe.execute()
+        if not task_id:
+            return None
+
+        return {
+            'task_id': task_id,
+            'state': meta.get('state', 'queued'),
+            'source': meta.get('source'),
+            'queued_at': float(meta['queued_at']) if meta.get('queued_at') else None,
+            'started_at': float(meta['started_at']) if meta.get('started_at') else None,
+            'retries': int(meta.get('retries', 0)),
+        }
+
+    def dispatch(self, task, source):
+        """
+        Start a sync task unless one is already in flight
+
+        Returns (task_id, started) where started is False when the caller was
+        attached to an existing task.
+        """
+        task_id = str(uuid.uuid4())
+        if not self.redis.set(self.key, task_id, nx=True, ex=self.timeout):
+            existing = self.redis.get(self.key)
+            if existing:
+                logger.info(f"Sync for account {self.account_id} already in flight ({existing}), attaching {source}")
+                return existing, False
+            # Released between the two calls; claim it again
+            if not self.redis.set(self.key, task_id, nx=True, ex=self.timeout):
+                return self.redis.get(self.key), False
+
+        self._set_meta(task_id, state='queued', source=source, queued_at=time.time())
+        try:
+            task.apply_async(args=[self.account_id], task_id=task_id)
+        except Exception:
+            self.release(task_id)
+            raise
+        return task_id, True
+
+    def acquire(self, task_id, retries=0):
+        """
+        Called by the sync task itself before doing any work
+
+        Succeeds when the lock is free (task dispatched outside dispatch() or
+        the lock expired) or already owned by this task.
+        """
+        owned = self.redis.eval(ACQUIRE_SCRIPT, 2, self.key, self.meta_key, task_id, self.timeout)
+        if owned:
+            self._set_meta(task_id, state='running', started_at=time.time(), retries=retries)
+        return bool(owned)
+
+    def mark_retrying(self, task_id, countdown, retries):
+        """Keep the lock across a Celery retry so nothing else starts meanwhile"""
+        timeout = self.timeout + int(countdown)
+        if self.redis.eval(ACQUIRE_SCRIPT, 2, self.key, self.meta_key, task_id, timeout):
+            self._set_meta(task_id, timeout=timeout, state='retrying', retries=retries)
+
+    def release(self, task_id):
+        self.redis.eval(RELEASE_SCRIPT, 2, self.key, self.meta_key, task_id)
+
+    def _set_meta(self, task_id, timeout=None, **fields):
+        pipe = self.redis.pipeline()
+        pipe.hset(self.meta_key, mapping={'task_id': task_id, **fields})
+        pipe.expire(self.meta_key, timeout or self.timeout)
+        pipe.execute()
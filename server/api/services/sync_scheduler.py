@@ -0,0 +1,286 @@
+# server/api/services/sync_scheduler.py
+"""
+Rate-limit-aware scheduler for social media syncs
+
+Instead of enqueueing one Celery task per account at the top of the hour,
+the periodic "sync all" tasks only plan work into a per-platform Redis
+priority queue. A drain task runs every tick and dispatches a slice of the
+queue sized so a full round is spread over the platform's sync interval:
+each tick takes the queue depth divided by the ticks left until the next
+round, counted from when plan() last ran.
+
+- Queue: sorted set scored by last_sync timestamp, so the stalest accounts
+  go first. Manual requests get a negative score and jump the queue.
+- Limits: every dispatch takes one token from a per-platform bucket and one
+  from a per-token (per connected account) bucket, atomically in Lua.
+- Metrics: queue depth, pending manual requests, dispatch/throttle totals
+  and the dispatch rate over the last 15 minutes.
+"""
+
+import logging
+import math
+import time
+
+from django.conf import settings
+
+from ..models import SocialMediaAccount
+from ..utils.redis_client import get_redis
+from .sync_lock import SyncLock
+
+logger = logging.getLogger(__name__)
+
+# Consume one token from both buckets only when both have one available.
+# Returns 0 on success, 1 when the platform bucket is empty, 2 when the token bucket is empty.
+TAKE_TOKENS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local function refill(key, capacity, rate)
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    return math.min(capacity, tokens + math.max(0, now - updated) * rate)
+end
+local platform_tokens = refill(KEYS[1], tonumber(ARGV[2]), tonumber(ARGV[3]))
+local account_tokens = refill(KEYS[2], tonumber(ARGV[4]), tonumber(ARGV[5]))
+local result = 0
+if platform_tokens < 1 then
+    result = 1
+elseif account_tokens < 1 then
+    result = 2
+else
+    platform_tokens = platform_tokens - 1
+    account_tokens = account_tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', platform_tokens, 'updated', now)
+redis.call('HSET', KEYS[2], 'tokens', account_tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], 86400)
+redis.call('EXPIRE', KEYS[2], 86400)
+return result
+"""
+
+PLATFORM_EMPTY = 1
+TOKEN_EMPTY = 2
+
+# Window used for the drain-rate metric
+RATE_WINDOW_MINUTES = 15
+
+
+class SyncScheduler:
+    """Per-platform sync queue with token-bucket rate limiting"""
+
+    def __init__(self, platform):
+        self.platform = platform
+        self.config = settings.SYNC_SCHEDULER['platforms'][platform]
+        self.tick_seconds = settings.SYNC_SCHEDULER['tick_seconds']
+        self.redis = get_redis()
+        self.queue_key = f"sync:queue:{platform}"
+        self.stats_key = f"sync:stats:{platform}"
+        self.platform_bucket_key = f"sync:bucket:{platform}"
+        self.round_key = f"sync:round:{platform}"
+
+    @staticmethod
+    def platforms():
+        return list(settings.SYNC_SCHEDULER['platforms'].keys())
+
+    # ---------- bucket parameters (in syncs, not raw API calls) ----------
+
+    @property
+    def platform_rate(self):
+        """Syncs per second the platform-wide quota can sustain"""
+        return self.config['platform_calls_per_day'] / self.config['calls_per_sync'] / 86400
+
+    @property
+    def token_rate(self):
+        """Syncs per second a single account token can sustain"""
+        return self.config['token_calls_per_hour'] / self.config['calls_per_sync'] / 3600
+
+    @property
+    def token_capacity(self):
+        return max(1, math.floor(self.config['token_calls_per_hour'] / self.config['calls_per_sync']))
+
+    def _task(self):
+        from ..tasks import sync_instagram_data, sync_youtube_data
+        return {'instagram': sync_instagram_data, 'youtube': sync_youtube_data}[self.platform]
+
+    # ---------- planning ----------
+
+    def plan(self):
+        """Queue every active account for this platform, stalest first"""
+        accounts = SocialMediaAccount.objects.filter(
+            platform=self.platform,
+            is_active=True
+        ).values_list('id', 'last_sync')
+
+        entries = {
+            str(account_id): last_sync.timestamp() if last_sync else 0
+            for account_id, last_sync in accounts
+        }
+        if not entries:
+            return 0
+
+        # nx: accounts still waiting from an earlier round (or manual requests) keep their place
+        pipe = self.redis.pipeline()
+        for start in range(0, len(entries), 1000):
+            chunk = dict(list(entries.items())[start:start + 1000])
+            pipe.zadd(self.queue_key, chunk, nx=True)
+        pipe.hincrby(self.stats_key, 'planned_total', len(entries))
+        # Start of the round drain() spreads the queue over; gone once the interval has passed
+        pipe.set(self.round_key, time.time(), ex=self.config['interval_seconds'])
+        pipe.execute()
+
+        logger.info(f"Planned {len(entries)} {self.platform} accounts for sync")
+        return len(entries)
+
+    def request_sync(self, account, source='manual'):
+        """
+        Queue a manual sync ahead of scheduled work and try to dispatch it now
+
+        Returns the Celery task id when it was dispatched immediately (or was
+        already in flight), or None when the rate limits deferred it to a
+        later drain tick.
+        """
+        self.redis.zadd(self.queue_key, {str(account.id): -time.time()}, lt=True)
+        self.redis.hincrby(self.stats_key, 'manual_total', 1)
+
+        dispatched = self._dispatch_ids([str(account.id)], source=source)
+        if dispatched:
+            self.redis.zrem(self.queue_key, str(account.id))
+            return dispatched[0][1]
+        return None
+
+    # ---------- draining ----------
+
+    def drain(self):
+        """Dispatch this tick's share of the queue within the rate limits"""
+        depth = self.redis.zcard(self.queue_key)
+        if not depth:
+            self._record_drain(0)
+            return []
+
+        manual_pending = self.redis.zcount(self.queue_key, '-inf', '(0')
+        spread = math.ceil(depth / self._ticks_remaining())
+        batch_size = min(max(spread, manual_pending, 1), self.config['max_dispatch_per_tick'])
+
+        popped = self.redis.zpopmin(self.queue_key, batch_size)
+        scores = dict(popped)
+
+        dispatched = self._dispatch_ids([account_id for account_id, _ in popped])
+        dispatched_ids = {account_id for account_id, _ in dispatched}
+
+        # Anything not dispatched goes back with its original priority
+        requeue = {
+            account_id: score for account_id, score in scores.items()
+            if account_id not in dispatched_ids
+        }
+        if requeue:
+            self.redis.zadd(self.queue_key, requeue)
+
+        self._record_drain(len(dispatched))
+        logger.info(
+            f"Drained {len(dispatched)} of {depth} queued {self.platform} syncs "
+            f"({len(requeue)} deferred by rate limits)"
+        )
+        return dispatched
+
+    def _ticks_remaining(self):
+        """Drain ticks left in the current round, at least one"""
+        started = self.redis.get(self.round_key)
+        if started is None:
+            # The round is over (or was never planned): whatever is left is overdue
+            return 1
+        remaining = float(started) + self.config['interval_seconds'] - time.time()
+        return max(1, math.floor(remaining / self.tick_seconds))
+
+    def _dispatch_ids(self, account_ids, source='scheduler'):
+        """
+        Dispatch sync tasks for the given ids until the platform bucket runs dry
+        Accounts with a sync already in flight are attached to it without spending tokens
+        """
+        dispatched = []
+        active_ids = set(
+            str(account_id) for account_id in SocialMediaAccount.objects.filter(
+                id__in=account_ids,
+                platform=self.platform,
+                is_active=True
+            ).values_list('id', flat=True)
+        )
+        task = self._task()
+
+        for account_id in account_ids:
+            if account_id not in active_ids:
+                # Disconnected since it was queued
+                dispatched.append((account_id, None))
+                continue
+
+            lock = SyncLock(account_id)
+            in_flight = lock.current()
+            if in_flight:
+                dispatched.append((account_id, in_flight['task_id']))
+                continue
+
+            result = self._take_tokens(account_id)
+            if result == PLATFORM_EMPTY:
+                self.redis.hincrby(self.stats_key, 'throttled_total', 1)
+                break
+            if result == TOKEN_EMPTY:
+                self.redis.hincrby(self.stats_key, 'throttled_total', 1)
+                continue
+
+            task_id, _ = lock.dispatch(task, source)
+            dispatched.append((account_id, task_id))
+
+        return dispatched
+
+    def _take_tokens(self, account_id):
+        return self.redis.eval(
+            TAKE_TOKENS_SCRIPT,
+            2,
+            self.platform_bucket_key,
+            f"sync:bucket:{self.platform}:token:{account_id}",
+            time.time(),
+            self.config['burst'],
+            self.platform_rate,
+            self.token_capacity,
+            self.token_rate,
+        )
+
+    def _record_drain(self, count):
+        minute_key = f"sync:drained:{self.platform}:{int(time.time() // 60)}"
+        pipe = self.redis.pipeline()
+        pipe.incrby(minute_key, count)
+        pipe.expire(minute_key, RATE_WINDOW_MINUTES * 60 * 2)
+        pipe.hincrby(self.stats_key, 'dispatched_total', count)
+        pipe.hset(self.stats_key, 'last_drain_at', time.time())
+        pipe.execute()
+
+    # ---------- metrics ----------
+
+    def stats(self):
+        """Queue depth and drain-rate metrics for monitoring"""
+        current_minute = int(time.time() // 60)
+        minute_keys = [
+            f"sync:drained:{self.platform}:{minute}"
+            for minute in range(current_minute - RATE_WINDOW_MINUTES + 1, current_minute + 1)
+        ]
+
+        pipe = self.redis.pipeline()
+        pipe.zcard(self.queue_key)
+        pipe.zcount(self.queue_key, '-inf', '(0')
+        pipe.hgetall(self.stats_key)
+        pipe.mget(minute_keys)
+        depth, manual_pending, counters, drained = pipe.execute()
+
+        drained_recently = sum(int(value) for value in drained if value)
+        drain_rate = drained_recently / RATE_WINDOW_MINUTES
+
+        return {
+            'platform': self.platform,
+            'queue_depth': depth,
+            'manual_pending': manual_pending,
+            'drain_rate_per_minute': round(drain_rate, 2),
+            'estimated_minutes_to_empty': round(depth / drain_rate, 1) if drain_rate else None,
+            'planned_total': int(counters.get('planned_total', 0)),
+            'manual_total': int(counters.get('manual_total', 0)),
+            'dispatched_total': int(counters.get('dispatched_total', 0)),
+            'throttled_total': int(counters.get('throttled_total', 0)),
+            'last_drain_at': float(counters['last_drain_at']) if counters.get('last_drain_at') else None,
+        }
@@ -0,0 +1,158 @@
+# server/api/services/unread_counter.py
+"""
+Per-user unread notification counters
+
+Badge polling reads notifications:unread:<user_id> with a single Redis GET.
+A missing key is filled from the database on first read. After that the
+counter is only adjusted when it exists, so it is never created with a partial
+value. Creation (post_save and create_notifications), mark_read, mark_all_read
+and deletes adjust it on commit, and the new value is pushed to the user's
+WebSocket connections. Every key expires, and the
+reconcile_unread_notification_counts task rewrites live keys from the database
+to repair drift from failed updates or raw SQL.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from ..utils.redis_client import get_redis
+from .realtime import RealtimePublisher
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'notifications:unread:'
+
+# Add ARGV[1] to each existing key in KEYS, never going below zero.
+# Returns the new values, -1 for keys that don't exist.
+ADJUST_SCRIPT = """
+local values = {}
+for i, key in ipairs(KEYS) do
+    values[i] = -1
+    if redis.call('EXISTS', key) == 1 then
+        values[i] = redis.call('INCRBY', key, ARGV[1])
+        if values[i] < 0 then
+            redis.call('SET', key, 0, 'KEEPTTL')
+            values[i] = 0
+        end
+    end
+end
+return values
+"""
+
+
+class UnreadCounter:
+    """Redis-backed unread notification counts"""
+
+    @staticmethod
+    def key(user_id):
+        return f"{KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _count(user_id):
+        from ..models import Notification
+
+        return Notification.objects.filter(user_id=user_id, read=False).count()
+
+    @staticmethod
+    def get(user_id):
+        """Unread count for a user; one GET when the counter is warm"""
+        key = UnreadCounter.key(user_id)
+        try:
+            redis = get_redis()
+            value = redis.get(key)
+            if value is not None:
+                return int(value)
+            count = UnreadCounter._count(user_id)
+            # NX: an adjustment that landed meanwhile already started from a warm value
+            redis.set(key, count, ex=settings.CACHE_TIMEOUTS['unread_counts'], nx=True)
+            return count
+        except Exception as e:
+            logger.warning(f"Unread counter unavailable for user {user_id}: {e}")
+            return UnreadCounter._count(user_id)
+
+    @staticmethod
+    def _adjust(counts):
+        """Apply {user_id: delta} to existing counters"""
+        by_delta = {}
+        for user_id, delta in counts.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(user_id)
+        if not by_delta:
+            return
+        try:
+            redis = get_redis()
+            script = redis.register_script(ADJUST_SCRIPT)
+            pipe = redis.pipeline(transaction=False)
+            for delta, user_ids in by_delta.items():
+                script(keys=[UnreadCounter.key(user_id) for user_id in user_ids], args=[delta], client=pipe)
+            results = pipe.execute()
+        except Exception as e:
+            # Keys expire and the reconciliation job repairs them
+            logger.warning(f"Could not update unread counters: {e}")
+            return
+
+        # Connected users always have a warm counter (the consumer reads it on connect)
+        RealtimePublisher.unread_counts({
+            user_id: value
+            for user_ids, values in zip(by_delta.values(), results)
+            for user_id, value in zip(user_ids, values)
+            if value >= 0
+        })
+
+    @staticmethod
+    def adjust(counts):
+        """Apply {user_id: delta} once the current transaction commits"""
+        counts = dict(counts)
+        transaction.on_commit(lambda: UnreadCounter._adjust(counts))
+
+    @staticmethod
+    def increment(user_id, amount=1):
+        UnreadCounter.adjust({user_id: amount})
+
+    @staticmethod
+    def decrement(user_id, amount=1):
+        UnreadCounter.adjust({user_id: -amount})
+
+    @staticmethod
+    def reconcile(batch_size=500):
+        """Rewrite every live counter from the database; returns how many were corrected"""
+        from ..models import Notification
+
+        redis = get_redis()
+        timeout = settings.CACHE_TIMEOUTS['unread_counts']
+        corrected = 0
+
+        def repair(keys):
+            user_ids = [key[len(KEY_PREFIX):] for key in keys]
+            actual = {
+                str(user_id): unread
+                for user_id, unread in Notification.objects.filter(user_id__in=user_ids, read=False)
+                .values('user_id').annotate(unread=Count('id')).values_list('user_id', 'unread')
+            }
+            cached = redis.mget(keys)
+            pipe = redis.pipeline(transaction=False)
+            fixed = {}
+            for key, user_id, value in zip(keys, user_ids, cached):
+                count = actual.get(user_id, 0)
+                if value is not None and int(value) != count:
+                    pipe.set(key, count, ex=timeout, xx=True)
+                    fixed[user_id] = count
+            pipe.execute()
+            RealtimePublisher.unread_counts(fixed)
+            return len(fixed)
+
+        batch = []
+        for key in redis.scan_iter(match=f"{KEY_PREFIX}*", count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                corrected += repair(batch)
+                batch = []
+        if batch:
+            corrected += repair(batch)
+
+        if corrected:
+            logger.info(f"Reconciled {corrected} unread notification counters")
+        return corrected
@@ -3,23 +3,35 @@ import logging
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 import json
-import requests
 
-from ..models import SocialMediaAccount, RealTimeMetrics, PostMetrics, SyncLog
+from ..models import (
+    SocialMediaAccount, RealTimeMetrics, AccountMetricsSnapshot, PostMetrics, SyncLog,
+    SocialSyncState
+)
+from ..utils.google_api import build_service, auth_request
+from .incremental_sync import (
+    payload_hash, has_metrics_for_today, changed_post_rows, finish_unchanged_sync
+)
+from .dashboard_cache import DashboardStatsCache
+from .engagement_analytics import EngagementAnalyticsService
 
 logger = logging.getLogger(__name__)
 
 class YouTubeService:
     """YouTube Data API service for fetching real data"""
     
+    # Maximum page size for playlistItems().list and ids per videos().list
+    PAGE_SIZE = 50
+    # Fields compared against stored rows to skip unchanged videos
+    VIDEO_COMPARE_FIELDS = ['caption', 'posted_at', 'likes', 'comments', 'reach', 'engagement_rate']
+    
     def __init__(self, social_account):
         self.account = social_account
-        self.access_token = self.account.decrypt_token(social_account.access_token)
-        self.refresh_token = self.account.decrypt_token(social_account.refresh_token) if social_account.refresh_token else None
+        self.access_token = self.account.get_access_token()
+        self.refresh_token = self.account.get_refresh_token()
         self.service = self._build_service()
     
     def _build_service(self):
@@ -37,16 +49,16 @@ class YouTubeService:
             
             # Refresh token if needed
             if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+                creds.refresh(auth_request())
                 
                 # Update stored tokens
                 self.account.access_token = self.account.encrypt_token(creds.token)
                 if creds.refresh_token:
                     self.account.refresh_token = self.account.encrypt_token(creds.refresh_token)
                 self.account.token_expires_at = creds.expiry
-                self.account.save()
+                self.account.save(update_fields=['access_token', 'refresh_token', 'token_expires_at', 'updated_at'])
             
-            return build('youtube', 'v3', credentials=creds)
+            return build_service('youtube', 'v3', creds)
             
         except Exception as e:
             logger.error(f"Failed to build YouTube service for {self.account.username}: {str(e)}")
@@ -62,13 +74,26 @@ class YouTubeService:
             status='in_progress'
         )
         
+        state = SocialSyncState.for_account(self.account)
+        # A 304 can only be trusted once today's row exists
+        up_to_date = has_metrics_for_today(self.account)
+        
         try:
             # Get channel statistics
             request = self.service.channels().list(
                 part='statistics,snippet,brandingSettings',
                 mine=True
             )
-            response = request.execute()
+            response = self._execute_conditional(
+                request, state.profile_etag if up_to_date else None
+            )
+            
+            if response is None:
+                logger.info(f"YouTube channel unchanged for {self.account.username}, skipping write")
+                finish_unchanged_sync(sync_log)
+                return RealTimeMetrics.objects.filter(
+                    account=self.account, date=timezone.now().date()
+                ).first()
             
             if not response['items']:
                 raise ValueError("No channel found for authenticated user")
@@ -83,18 +108,31 @@ class YouTubeService:
             # Calculate engagement rate from recent videos
             engagement_rate = self._calculate_channel_engagement_rate()
             
+            metric_values = {
+                'followers_count': int(stats.get('subscriberCount', 0)),
+                'posts_count': int(stats.get('videoCount', 0)),
+                'reach': int(stats.get('viewCount', 0)),  # Total views as reach
+                'impressions': analytics_data.get('impressions', 0),
+                'engagement_rate': engagement_rate,
+                'profile_views': analytics_data.get('channel_views', 0),
+                'website_clicks': analytics_data.get('annotation_clicks', 0),
+            }
+            
+            state.profile_etag = response.get('etag', '')
+            content_hash = payload_hash({'metrics': metric_values, 'title': snippet.get('title')})
+            
+            if up_to_date and content_hash == state.profile_hash:
+                logger.info(f"YouTube channel payload unchanged for {self.account.username}, skipping write")
+                state.save()
+                finish_unchanged_sync(sync_log)
+                return RealTimeMetrics.objects.filter(
+                    account=self.account, date=timezone.now().date()
+                ).first()
+            
             metrics, created = RealTimeMetrics.objects.update_or_create(
                 account=self.account,
                 date=timezone.now().date(),
-                defaults={
-                    'followers_count': int(stats.get('subscriberCount', 0)),
-                    'posts_count': int(stats.get('videoCount', 0)),
-                    'reach': int(stats.get('viewCount', 0)),  # Total views as reach
-                    'impressions': analytics_data.get('impressions', 0),
-                    'engagement_rate': engagement_rate,
-                    'profile_views': analytics_data.get('channel_views', 0),
-                    'website_clicks': analytics_data.get('annotation_clicks', 0),
-                }
+                defaults=metric_values
             )
             
             # Calculate daily growth
@@ -109,10 +147,16 @@ class YouTubeService:
                     metrics.daily_growth = daily_growth
                     metrics.save()
             
+            # Keep the dashboard snapshot in step with today's row
+            AccountMetricsSnapshot.update_from_metrics(metrics)
+            
             # Update account info
             self.account.username = snippet.get('title', self.account.username)
             self.account.last_sync = timezone.now()
-            self.account.save()
+            self.account.save(update_fields=['username', 'last_sync', 'updated_at'])
+            
+            state.profile_hash = content_hash
+            state.save()
             
             sync_log.status = 'success'
             sync_log.records_processed = 1
@@ -134,94 +178,106 @@ class YouTubeService:
             raise e
     
     def sync_recent_videos(self, limit=25):
-        """Sync recent video performance"""
+        """
+        Sync recent video performance
+        
+        Walks the channel's uploads playlist (1 quota unit per 50 videos)
+        instead of search().list (100 units per call), so `limit` can reach
+        arbitrarily deep into the upload history. Pass limit=None to sync
+        every upload.
+        
+        Syncs are incremental: the first listing page and its statistics are
+        requested with the ETags from the previous run, paging stops once it
+        reaches videos published before the stored cursor, and only rows whose
+        values changed are written.
+        """
         sync_log = SyncLog.objects.create(
             account=self.account,
             sync_type='posts',
             status='in_progress'
         )
         
+        state = SocialSyncState.for_account(self.account)
+        previous_cursor = state.last_post_at
+        
         try:
-            # Get recent videos
-            search_request = self.service.search().list(
-                part='id,snippet',
-                forMine=True,
-                type='video',
-                order='date',
-                maxResults=limit
-            )
-            search_response = search_request.execute()
-            
-            if not search_response.get('items'):
-                logger.info(f"No videos found for {self.account.username}")
-                sync_log.status = 'success'
-                sync_log.records_processed = 0
-                sync_log.completed_at = timezone.now()
-                sync_log.save()
-                return
-            
-            video_ids = [item['id']['videoId'] for item in search_response['items']]
-            
-            # Get detailed stats for videos
-            stats_request = self.service.videos().list(
-                part='statistics,snippet',
-                id=','.join(video_ids)
-            )
-            stats_response = stats_request.execute()
+            uploads_playlist_id = self._get_uploads_playlist_id()
             
+            videos_seen = 0
             videos_processed = 0
+            page_token = None
+            first_page = True
             
-            for i, video in enumerate(search_response['items']):
-                video_id = video['id']['videoId']
-                snippet = video['snippet']
+            while limit is None or videos_seen < limit:
+                page_size = self.PAGE_SIZE if limit is None else min(self.PAGE_SIZE, limit - videos_seen)
                 
-                # Find corresponding stats
-                stats_data = None
-                for stats_video in stats_response['items']:
-                    if stats_video['id'] == video_id:
-                        stats_data = stats_video['statistics']
-                        break
-                
-                if not stats_data:
-                    continue
-                
-                # Parse publish date
-                published_at = datetime.fromisoformat(
-                    snippet['publishedAt'].replace('Z', '+00:00')
+                playlist_request = self.service.playlistItems().list(
+                    part='contentDetails',
+                    playlistId=uploads_playlist_id,
+                    maxResults=page_size,
+                    pageToken=page_token
+                )
+                playlist_response = self._execute_conditional(
+                    playlist_request, state.posts_etag if first_page else None
                 )
                 
-                # Calculate engagement rate
-                likes = int(stats_data.get('likeCount', 0))
-                comments = int(stats_data.get('commentCount', 0))
-                views = int(stats_data.get('viewCount', 0))
+                if playlist_response is None:
+                    # No new uploads since the last run; refresh stats for the same videos
+                    video_ids = state.recent_post_ids[:page_size]
+                    published_times = []
+                    page_token = None
+                else:
+                    items = playlist_response.get('items', [])
+                    video_ids = [item['contentDetails']['videoId'] for item in items]
+                    published_times = [
+                        datetime.fromisoformat(item['contentDetails']['videoPublishedAt'].replace('Z', '+00:00'))
+                        for item in items
+                        if item['contentDetails'].get('videoPublishedAt')
+                    ]
+                    page_token = playlist_response.get('nextPageToken')
+                    
+                    if first_page:
+                        state.posts_etag = playlist_response.get('etag', '')
+                        state.recent_post_ids = video_ids
                 
-                engagement_rate = 0
-                if views > 0:
-                    engagement_rate = ((likes + comments) / views) * 100
+                if not video_ids:
+                    break
                 
-                post_metrics, created = PostMetrics.objects.update_or_create(
-                    account=self.account,
-                    post_id=video_id,
-                    defaults={
-                        'caption': snippet['title'],
-                        'media_type': 'video',
-                        'posted_at': published_at,
-                        'likes': likes,
-                        'comments': comments,
-                        'reach': views,
-                        'impressions': views,  # For YouTube, views = impressions
-                        'engagement_rate': engagement_rate,
-                    }
+                written, stats_etag = self._upsert_videos(
+                    video_ids, etag=state.stats_etag if first_page else None
                 )
+                if first_page:
+                    state.stats_etag = stats_etag
+                
+                videos_seen += len(video_ids)
+                videos_processed += written
+                first_page = False
+                
+                if published_times:
+                    newest = max(published_times)
+                    if not state.last_post_at or newest > state.last_post_at:
+                        state.last_post_at = newest
+                    # Everything older than the previous cursor was synced on an earlier run
+                    if previous_cursor and min(published_times) <= previous_cursor:
+                        break
                 
-                videos_processed += 1
+                if not page_token:
+                    break
+            
+            state.save()
+            
+            if not videos_seen:
+                logger.info(f"No videos found for {self.account.username}")
             
             sync_log.status = 'success'
             sync_log.records_processed = videos_processed
             sync_log.completed_at = timezone.now()
             sync_log.save()
             
-            logger.info(f"Successfully synced {videos_processed} YouTube videos for {self.account.username}")
+            logger.info(
+                f"Successfully synced {videos_processed} changed of {videos_seen} YouTube videos "
+                f"for {self.account.username}"
+            )
             
         except Exception as e:
             error_msg = f"YouTube videos sync error: {str(e)}"
@@ -234,11 +290,112 @@ class YouTubeService:
             
             raise e
     
+    @staticmethod
+    def _execute_conditional(request, etag=None):
+        """Execute an API request with If-None-Match; returns None on 304 Not Modified"""
+        if etag:
+            request.headers['If-None-Match'] = etag
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status == 304:
+                return None
+            raise
+    
+    def _get_uploads_playlist_id(self):
+        """Look up the playlist that holds every upload of the authenticated channel"""
+        # Channel ids "UC..." map directly onto their uploads playlist "UU..."
+        if self.account.account_id and self.account.account_id.startswith('UC'):
+            return 'UU' + self.account.account_id[2:]
+        
+        response = self.service.channels().list(
+            part='contentDetails',
+            mine=True
+        ).execute()
+        
+        if not response.get('items'):
+            raise ValueError("No channel found for authenticated user")
+        
+        return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+    
+    def _upsert_videos(self, video_ids, etag=None):
+        """
+        Fetch stats for up to 50 videos in one call and bulk-upsert the changed PostMetrics
+        
+        Returns (rows written, ETag of the statistics response)
+        """
+        stats_request = self.service.videos().list(
+            part='statistics,snippet',
+            id=','.join(video_ids)
+        )
+        stats_response = self._execute_conditional(stats_request, etag)
+        
+        if stats_response is None:
+            return 0, etag
+        
+        videos_by_id = {video['id']: video for video in stats_response.get('items', [])}
+        
+        now = timezone.now()
+        post_rows = []
+        
+        for video_id in video_ids:
+            video = videos_by_id.get(video_id)
+            if not video:
+                # Private or deleted videos are listed in the playlist but have no stats
+                continue
+            
+            snippet = video['snippet']
+            stats_data = video.get('statistics', {})
+            
+            # Parse publish date
+            published_at = datetime.fromisoformat(
+                snippet['publishedAt'].replace('Z', '+00:00')
+            )
+            
+            # Calculate engagement rate
+            likes = int(stats_data.get('likeCount', 0))
+            comments = int(stats_data.get('commentCount', 0))
+            views = int(stats_data.get('viewCount', 0))
+            
+            engagement_rate = 0
+            if views > 0:
+                engagement_rate = ((likes + comments) / views) * 100
+            
+            post_rows.append(PostMetrics(
+                account=self.account,
+                post_id=video_id,
+                caption=snippet['title'],
+                media_type='video',
+                posted_at=published_at,
+                likes=likes,
+                comments=comments,
+                reach=views,
+                impressions=views,  # For YouTube, views = impressions
+                engagement_rate=round(engagement_rate, 2),
+                updated_at=now,
+            ))
+        
+        post_rows = changed_post_rows(self.account, post_rows, self.VIDEO_COMPARE_FIELDS)
+        
+        PostMetrics.objects.bulk_create(
+            post_rows,
+            update_conflicts=True,
+            unique_fields=['account', 'post_id'],
+            update_fields=[
+                'caption', 'media_type', 'posted_at', 'likes', 'comments',
+                'reach', 'impressions', 'engagement_rate', 'updated_at'
+            ]
+        )
+        if post_rows:
+            DashboardStatsCache.invalidate(client_ids=[self.account.client_id])
+        
+        return len(post_rows), stats_response.get('etag', '')
+    
     def _get_channel_analytics(self):
         """Get YouTube Analytics data"""
         try:
             # Build YouTube Analytics service
-            analytics_service = build('youtubeAnalytics', 'v2', credentials=self.service._http.credentials)
+            analytics_service = build_service('youtubeAnalytics', 'v2', self.service._http.credentials)
             
             # Get analytics for last 28 days
             end_date = timezone.now().date()
@@ -290,24 +447,8 @@ class YouTubeService:
     def _calculate_channel_engagement_rate(self):
         """Calculate overall engagement rate from recent videos"""
         try:
-            recent_videos = PostMetrics.objects.filter(
-                account=self.account,
-                posted_at__gte=timezone.now() - timedelta(days=30)
-            )[:10]  # Last 10 videos
-            
-            if not recent_videos:
-                return 0
-            
-            total_engagement = sum(
-                video.likes + video.comments for video in recent_videos
-            )
-            total_views = sum(video.reach for video in recent_videos)
-            
-            if total_views > 0:
-                return (total_engagement / total_views) * 100
-            else:
-                return 0
-                
+            # Last 10 videos of the past 30 days; reach holds views
+            return EngagementAnalyticsService.recent_engagement_rate(self.account, days=30, limit=10)
         except Exception as e:
             logger.warning(f"Failed to calculate YouTube engagement rate: {str(e)}")
             return 0
\ No newline at end of file
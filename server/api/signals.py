@@ -0,0 +1,213 @@
+# server/api/signals.py
+# Model signal receivers, connected in ApiConfig.ready()
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    User, Agent, Client, ClientServiceSettings, Invoice, Task, PerformanceData,
+    ContentPost, SocialMediaAccount, RealTimeMetrics, PostMetrics,
+    AccountMetricsSnapshot, WebsiteProject, WebsiteVersion, Campaign, Notification, Message
+)
+from .services.client_directory import ClientDirectory
+from .services.conversation_service import ConversationService
+from .services.dashboard_cache import DashboardStatsCache
+from .services.realtime import RealtimePublisher
+from .services.recipient_index import RecipientIndex
+from .services.unread_counter import UnreadCounter
+
+
+# ---------- dashboard stats cache ----------
+
+@receiver(pre_save, sender=Client)
+def remember_previous_agent(sender, instance, **kwargs):
+    """Keep the agent a client is being moved away from, so both dashboards are refreshed"""
+    instance._previous_agent_id = None
+    if instance.pk and not kwargs.get('raw'):
+        instance._previous_agent_id = Client.objects.filter(
+            pk=instance.pk
+        ).values_list('assigned_agent_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_client_dashboards(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate(
+        admin=True,
+        client_ids=[instance.pk],
+        agent_ids=[instance.assigned_agent_id, getattr(instance, '_previous_agent_id', None)]
+    )
+
+
+@receiver([post_save, post_delete], sender=Invoice)
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=PerformanceData)
+def invalidate_admin_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate(admin=True)
+
+
+@receiver([post_save, post_delete], sender=ContentPost)
+@receiver([post_save, post_delete], sender=WebsiteProject)
+def invalidate_assigned_agent_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate_clients([instance.client_id])
+
+
+@receiver([post_save, post_delete], sender=Campaign)
+@receiver([post_save, post_delete], sender=WebsiteVersion)
+def invalidate_agent_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate(agent_ids=[instance.agent_id])
+
+
+@receiver([post_save, post_delete], sender=Agent)
+def invalidate_own_agent_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate(agent_ids=[instance.pk])
+
+
+@receiver([post_save, post_delete], sender=SocialMediaAccount)
+def invalidate_account_owner_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate(client_ids=[instance.client_id])
+
+
+@receiver([post_save, post_delete], sender=RealTimeMetrics)
+@receiver([post_save, post_delete], sender=PostMetrics)
+@receiver([post_save, post_delete], sender=AccountMetricsSnapshot)
+def invalidate_metrics_owner_dashboard(sender, instance, **kwargs):
+    DashboardStatsCache.invalidate_accounts([instance.account_id])
+
+
+# ---------- notification recipient index ----------
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_recipients(sender, instance, **kwargs):
+    # Logins only touch last_login
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    # Without the previous role a demotion can't be told apart, so the admin set is always rebuilt
+    RecipientIndex.invalidate_admins()
+    if instance.role == 'agent':
+        RecipientIndex.invalidate_all_clients()
+
+
+@receiver([post_save, post_delete], sender=Agent)
+def invalidate_agent_recipients(sender, instance, **kwargs):
+    RecipientIndex.invalidate_all_clients()
+
+
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_client_recipients(sender, instance, **kwargs):
+    RecipientIndex.invalidate_client(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ClientServiceSettings)
+def invalidate_service_recipients(sender, instance, **kwargs):
+    RecipientIndex.invalidate_client(instance.client_id)
+
+
+# ---------- agent client directory ----------
+# Assignments, client details and eligibility (active social accounts, website projects) all show up in it
+
+@receiver([post_save, post_delete], sender=ClientServiceSettings)
+@receiver([post_save, post_delete], sender=Client)
+@receiver([post_save, post_delete], sender=Agent)
+def invalidate_client_directory(sender, instance, **kwargs):
+    ClientDirectory.invalidate()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_client_directory_names(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if instance.role in ('agent', 'client'):
+        ClientDirectory.invalidate()
+
+
+@receiver(pre_save, sender=SocialMediaAccount)
+def remember_previous_active(sender, instance, **kwargs):
+    """Syncs save accounts constantly; only activation changes affect the directory"""
+    instance._previous_is_active = None
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'is_active' not in update_fields:
+        # Can't change is_active; matching the current value keeps the post_save receiver quiet
+        instance._previous_is_active = instance.is_active
+        return
+    if instance.pk and not kwargs.get('raw'):
+        instance._previous_is_active = SocialMediaAccount.objects.filter(
+            pk=instance.pk
+        ).values_list('is_active', flat=True).first()
+
+
+@receiver(post_save, sender=SocialMediaAccount)
+def invalidate_directory_on_activation(sender, instance, **kwargs):
+    if instance.is_active != getattr(instance, '_previous_is_active', None):
+        ClientDirectory.invalidate()
+
+
+@receiver(post_save, sender=WebsiteProject)
+def invalidate_directory_on_new_project(sender, instance, created, **kwargs):
+    if created:
+        ClientDirectory.invalidate()
+
+
+@receiver(post_delete, sender=SocialMediaAccount)
+@receiver(post_delete, sender=WebsiteProject)
+def invalidate_directory_on_removal(sender, instance, **kwargs):
+    ClientDirectory.invalidate()
+
+
+# ---------- unread notification counters ----------
+# bulk_create and queryset updates bypass these; their callers adjust the counters directly
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.read and not kwargs.get('raw'):
+        UnreadCounter.increment(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.read:
+        UnreadCounter.decrement(instance.user_id)
+
+
+# ---------- conversation threads ----------
+
+@receiver(post_save, sender=Message)
+def record_conversation_message(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        ConversationService.record_message(instance)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_conversations(sender, instance, **kwargs):
+    ConversationService.forget_user(instance)
+
+
+@receiver(post_delete, sender=Message)
+def refresh_conversation(sender, instance, origin=None, **kwargs):
+    # A user delete cascades over all their messages; forget_user_conversations already removed the threads
+    if isinstance(origin, User):
+        return
+    # post_delete fires per message after the whole batch is gone, so one refresh per pair and delete() call is enough
+    refreshed = origin.__dict__.setdefault('_refreshed_conversations', set()) if origin is not None else set()
+    key = ConversationService.key(instance.sender_id, instance.receiver_id)
+    if key in refreshed:
+        return
+    refreshed.add(key)
+    # Never creates: a deleted thread shouldn't come back
+    ConversationService.refresh(instance.sender_id, instance.receiver_id, create=False)
+
+
+# ---------- real-time push ----------
+# Notifications from create_notifications' bulk_create are published there
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        RealtimePublisher.notifications_created([instance])
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        RealtimePublisher.message_created(instance)
@@ -6,6 +6,7 @@ Handles YouTube sync, metrics aggregation, and scheduled tasks
 
 from celery import shared_task
 from django.utils import timezone
+from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,8 +18,15 @@ def sync_youtube_data(self, account_id):
     Sync YouTube channel data and videos
     Runs after OAuth connection and on schedule
     """
+    from .models import SocialMediaAccount
+    from .services.sync_lock import SyncLock
+
+    task_id = self.request.id or str(account_id)
+    lock = SyncLock(account_id)
+    if not lock.acquire(task_id, retries=self.request.retries):
+        return _attached_result(lock, account_id)
+
     try:
-        from .models import SocialMediaAccount
         from .services.youtube_service import YouTubeService
         from .services.metrics_aggregation_service import MetricsAggregationService
         
@@ -43,9 +51,10 @@ def sync_youtube_data(self, account_id):
         
         # Update last sync time
         account.last_sync = timezone.now()
-        account.save()
+        account.save(update_fields=['last_sync', 'updated_at'])
         
         logger.info(f"✓ YouTube sync completed successfully for {account.username}")
+        lock.release(task_id)
         
         return {
             'success': True,
@@ -56,18 +65,26 @@ def sync_youtube_data(self, account_id):
         
     except SocialMediaAccount.DoesNotExist:
         logger.error(f"Account {account_id} not found")
+        lock.release(task_id)
         return {'success': False, 'error': 'Account not found'}
         
     except Exception as e:
         logger.error(f"YouTube sync failed for {account_id}: {str(e)}", exc_info=True)
         
         # Retry with exponential backoff
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+        _retry_holding_lock(self, lock, task_id, e)
 
 
 @shared_task(bind=True, max_retries=3)
 def sync_instagram_data(self, account_id):
     """Sync Instagram account data"""
+    from .services.sync_lock import SyncLock
+
+    task_id = self.request.id or str(account_id)
+    lock = SyncLock(account_id)
+    if not lock.acquire(task_id, retries=self.request.retries):
+        return _attached_result(lock, account_id)
+
     try:
         from .models import SocialMediaAccount
         from .services.instagram_service import InstagramService
@@ -87,15 +104,39 @@ def sync_instagram_data(self, account_id):
         
         # Update last sync
         account.last_sync = timezone.now()
-        account.save()
+        account.save(update_fields=['last_sync', 'updated_at'])
         
         logger.info(f"✓ Instagram sync completed for {account.username}")
+        lock.release(task_id)
         
         return {'success': True, 'account_id': str(account_id)}
         
     except Exception as e:
         logger.error(f"Instagram sync failed: {str(e)}")
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+        _retry_holding_lock(self, lock, task_id, e)
+
+
+def _attached_result(lock, account_id):
+    """Result for a sync task that found another sync already running for its account"""
+    in_flight = lock.current()
+    logger.info(f"Skipping duplicate sync for account {account_id}; already in flight")
+    return {
+        'success': True,
+        'skipped': True,
+        'account_id': str(account_id),
+        'in_flight_task_id': in_flight['task_id'] if in_flight else None
+    }
+
+
+def _retry_holding_lock(task, lock, task_id, exc):
+    """Retry with exponential backoff, keeping the account's sync lock until the last attempt"""
+    if task.request.retries >= task.max_retries:
+        lock.release(task_id)
+        raise exc
+
+    countdown = 60 * (2 ** task.request.retries)
+    lock.mark_retrying(task_id, countdown, task.request.retries + 1)
+    raise task.retry(exc=exc, countdown=countdown)
 
 
 @shared_task
@@ -128,39 +169,20 @@ def aggregate_monthly_performance():
 @shared_task
 def sync_all_youtube_accounts():
     """
-    Sync all active YouTube accounts
-    Run this on a schedule (e.g., every 6 hours)
+    Queue all active YouTube accounts for sync
+    Run this on a schedule (e.g., every 6 hours); drain_sync_queues dispatches them
     """
     try:
-        from .models import SocialMediaAccount
-        
-        youtube_accounts = SocialMediaAccount.objects.filter(
-            platform='youtube',
-            is_active=True
-        )
-        
-        logger.info(f"Syncing {youtube_accounts.count()} YouTube accounts")
-        
-        results = []
-        for account in youtube_accounts:
-            try:
-                task = sync_youtube_data.delay(str(account.id))
-                results.append({
-                    'account_id': str(account.id),
-                    'username': account.username,
-                    'task_id': task.id
-                })
-            except Exception as e:
-                logger.error(f"Failed to queue sync for {account.username}: {e}")
-        
-        logger.info(f"✓ Queued {len(results)} YouTube sync tasks")
-        
+        from .services.sync_scheduler import SyncScheduler
+
+        queued = SyncScheduler('youtube').plan()
+        logger.info(f"✓ Queued {queued} YouTube accounts for sync")
+
         return {
             'success': True,
-            'accounts_queued': len(results),
-            'results': results
+            'accounts_queued': queued
         }
-        
+
     except Exception as e:
         logger.error(f"Batch YouTube sync failed: {str(e)}")
         return {'success': False, 'error': str(e)}
@@ -168,36 +190,314 @@ def sync_all_youtube_accounts():
 
 @shared_task
 def sync_all_instagram_accounts():
-    """Sync all active Instagram accounts"""
+    """Queue all active Instagram accounts for sync"""
     try:
-        from .models import SocialMediaAccount
+        from .services.sync_scheduler import SyncScheduler
+
+        queued = SyncScheduler('instagram').plan()
+        logger.info(f"✓ Queued {queued} Instagram accounts for sync")
+
+        return {
+            'success': True,
+            'accounts_queued': queued
+        }
+
+    except Exception as e:
+        logger.error(f"Batch Instagram sync failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def sync_all_client_data():
+    """Queue every active social account on every scheduled platform"""
+    try:
+        from .services.sync_scheduler import SyncScheduler
+
+        queued = {
+            platform: SyncScheduler(platform).plan()
+            for platform in SyncScheduler.platforms()
+        }
+
+        return {
+            'success': True,
+            'accounts_queued': queued
+        }
+
+    except Exception as e:
+        logger.error(f"Batch sync planning failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def drain_sync_queues():
+    """
+    Dispatch this tick's share of queued syncs for each platform
+    Runs every minute; the scheduler enforces the per-platform and per-token limits
+    """
+    from .services.sync_scheduler import SyncScheduler
+
+    dispatched = {}
+    for platform in SyncScheduler.platforms():
+        try:
+            dispatched[platform] = len(SyncScheduler(platform).drain())
+        except Exception as e:
+            logger.error(f"Draining {platform} sync queue failed: {str(e)}")
+            dispatched[platform] = 0
+
+    return {
+        'success': True,
+        'dispatched': dispatched
+    }
+
+
+@shared_task
+def cleanup_old_metrics():
+    """
+    Downsample and expire old metrics per settings.METRICS_RETENTION
+    Daily rows roll into weekly/monthly MetricsRollup before they are deleted
+    """
+    try:
+        from .services.metrics_rollup_service import MetricsRollupService
+
+        results = MetricsRollupService.apply_retention()
+
+        return {
+            'success': True,
+            **results,
+            'timestamp': timezone.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Metrics cleanup failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def maintain_metric_partitions():
+    """Create upcoming monthly partitions and expire old ones (Postgres only)"""
+    try:
+        from .services.partition_service import PartitionManager
+        from datetime import timedelta
+
+        results = {}
+        for manager in PartitionManager.all():
+            if not manager.is_partitioned():
+                continue
+            created = manager.ensure_partitions()
+            expired = []
+            if manager.config['retention_days'] is not None:
+                cutoff = timezone.now().date() - timedelta(days=manager.config['retention_days'])
+                expired = manager.expire_partitions(cutoff)
+            results[manager.table] = {'created': created, 'expired': expired}
+
+        return {'success': True, 'tables': results}
+
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def send_email_outbox():
+    """Send queued transactional email in provider batches"""
+    try:
+        from .services.email_outbox import EmailOutboxService
+        return {'success': True, **EmailOutboxService.drain()}
+
+    except Exception as e:
+        logger.error(f"Email outbox drain failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def send_notification_digests():
+    """Email notification digests that are due"""
+    try:
+        from .services.notification_digest import NotificationDigestService
+        return {'success': True, **NotificationDigestService.flush()}
+
+    except Exception as e:
+        logger.error(f"Notification digest run failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+@shared_task
+def reconcile_unread_notification_counts():
+    """Rewrite cached unread notification counts that drifted from the database"""
+    try:
+        from .services.unread_counter import UnreadCounter
+        return {'success': True, 'corrected': UnreadCounter.reconcile()}
+
+    except Exception as e:
+        logger.error(f"Unread counter reconciliation failed: {str(e)}")
+        return {'success': False, 'error': str(e)}
+
+
+# ============ SCHEDULED NOTIFICATIONS ============
+
+@shared_task
+def check_overdue_invoices():
+    """
+    Check for overdue invoices and send notifications
+    Run this daily
+    """
+    try:
+        from .models import Invoice
+        from .services.notification_service import NotificationService
+
+        today = timezone.now().date()
+        
+        # Find invoices that just became overdue (due yesterday)
+        overdue_invoices = Invoice.objects.filter(
+            status='pending',
+            due_date=today - timedelta(days=1)
+        ).select_related('client__user')
+        
+        for invoice in overdue_invoices:
+            # Update invoice status
+            invoice.status = 'overdue'
+            invoice.save()
+            
+            # Update client payment status
+            invoice.client.payment_status = 'overdue'
+            invoice.client.save()
+            
+            # Send notification
+            NotificationService.notify_invoice_overdue(
+                client_user=invoice.client.user,
+                invoice=invoice
+            )
+        
+        logger.info(f"Checked overdue invoices: {overdue_invoices.count()} invoices now overdue")
+        return f"Processed {overdue_invoices.count()} overdue invoices"
+        
+    except Exception as e:
+        logger.error(f"Error checking overdue invoices: {e}")
+        return f"Error: {str(e)}"
+
+
+@shared_task
+def check_upcoming_invoice_due_dates():
+    """
+    Check for invoices due in 3 days and send reminders
+    Run this daily
+    """
+    try:
+        from .models import Invoice
+        from .services.notification_service import NotificationService
+
+        three_days_from_now = timezone.now().date() + timedelta(days=3)
+        
+        upcoming_invoices = Invoice.objects.filter(
+            status='pending',
+            due_date=three_days_from_now
+        ).select_related('client__user')
         
-        instagram_accounts = SocialMediaAccount.objects.filter(
-            platform='instagram',
-            is_active=True
+        for invoice in upcoming_invoices:
+            NotificationService.notify_invoice_due_soon(
+                client_user=invoice.client.user,
+                invoice=invoice
+            )
+        
+        logger.info(f"Sent reminders for {upcoming_invoices.count()} upcoming invoices")
+        return f"Sent {upcoming_invoices.count()} invoice reminders"
+        
+    except Exception as e:
+        logger.error(f"Error checking upcoming invoices: {e}")
+        return f"Error: {str(e)}"
+
+
+@shared_task
+def check_overdue_tasks():
+    """
+    Check for overdue tasks and send notifications
+    Run this daily
+    """
+    try:
+        from .models import Task
+        from .services.notification_service import NotificationService
+
+        today = timezone.now().date()
+        
+        # Find tasks that just became overdue (due yesterday)
+        overdue_tasks = Task.objects.filter(
+            status__in=['pending', 'in-progress'],
+            due_date__date=today - timedelta(days=1)
+        ).select_related('client__user')
+        
+        for task in overdue_tasks:
+            NotificationService.notify_task_overdue(
+                client_user=task.client.user,
+                task=task
+            )
+        
+        logger.info(f"Checked overdue tasks: {overdue_tasks.count()} tasks overdue")
+        return f"Processed {overdue_tasks.count()} overdue tasks"
+        
+    except Exception as e:
+        logger.error(f"Error checking overdue tasks: {e}")
+        return f"Error: {str(e)}"
+
+
+@shared_task
+def send_performance_reports():
+    """
+    Send monthly performance report notifications
+    Run this on the 1st of each month
+    """
+    try:
+        from .services.notification_service import NotificationService
+        from django.db.models import F
+        from .models import RealTimeMetrics
+        
+        # Latest metrics row per active client in one DISTINCT ON query
+        latest_metrics = RealTimeMetrics.objects.filter(
+            account__client__status='active'
+        ).annotate(
+            client_user_id=F('account__client__user_id')
+        ).order_by('account__client_id', '-date').distinct('account__client_id')
+        
+        created = NotificationService.notify_monthly_performance_reports(
+            (metrics.client_user_id, metrics) for metrics in latest_metrics.iterator(chunk_size=2000)
         )
         
-        logger.info(f"Syncing {instagram_accounts.count()} Instagram accounts")
+        logger.info(f"Sent performance reports to {len(created)} clients")
+        return f"Sent {len(created)} performance reports"
+        
+    except Exception as e:
+        logger.error(f"Error sending performance reports: {e}")
+        return f"Error: {str(e)}"
+
+
+@shared_task
+def send_subscription_renewal_reminders():
+    """
+    Send subscription renewal reminders 7 days before expiry
+    Run this daily
+    """
+    try:
+        from .models import Client
+        from .services.notification_service import NotificationService
+
+        seven_days_from_now = timezone.now().date() + timedelta(days=7)
+        
+        expiring_clients = Client.objects.filter(
+            status='active',
+            next_payment=seven_days_from_now
+        ).select_related('user')
         
-        results = []
-        for account in instagram_accounts:
-            try:
-                task = sync_instagram_data.delay(str(account.id))
-                results.append({
-                    'account_id': str(account.id),
-                    'task_id': task.id
-                })
-            except Exception as e:
-                logger.error(f"Failed to queue Instagram sync: {e}")
+        for client in expiring_clients:
+            NotificationService.notify_subscription_renewal_reminder(
+                client_user=client.user,
+                renewal_date=client.next_payment
+            )
         
-        return {
-            'success': True,
-            'accounts_queued': len(results)
-        }
+        logger.info(f"Sent renewal reminders to {expiring_clients.count()} clients")
+        return f"Sent {expiring_clients.count()} renewal reminders"
         
     except Exception as e:
-        logger.error(f"Batch Instagram sync failed: {str(e)}")
-        return {'success': False, 'error': str(e)}
+        logger.error(f"Error sending renewal reminders: {e}")
+        return f"Error: {str(e)}"
 
 
 # ============ PERIODIC TASK SCHEDULE ============
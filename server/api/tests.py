@@ -1,3 +1,78 @@
-from django.test import TestCase
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+from .models import Notification, User
+from .routing import websocket_urlpatterns
+from .services.unread_counter import UnreadCounter
+from .utils.redis_client import get_redis
+from .utils.ws_auth import TokenAuthMiddlewareStack
+
+
+# Same layer as running with CHANNEL_LAYER=memory
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class EventsConsumerTests(TransactionTestCase):
+    """WebSocket push over the in-memory channel layer"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='client', email='client@example.com', password='pass')
+        self.token = Token.objects.create(user=self.user)
+        self.application = TokenAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+        # The counter lives outside the test database; make sure it is rebuilt from the rows created here
+        try:
+            get_redis().delete(UnreadCounter.key(self.user.id))
+        except Exception:
+            pass
+
+    def communicator(self, token=None):
+        path = f'/ws/events/?token={token}' if token else '/ws/events/'
+        return WebsocketCommunicator(self.application, path)
+
+    async def test_anonymous_connection_is_rejected(self):
+        communicator = self.communicator()
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_invalid_token_is_rejected(self):
+        communicator = self.communicator('not-a-token')
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_connect_sends_unread_count(self):
+        await database_sync_to_async(Notification.objects.create)(user=self.user, title='One', message='First')
+        await database_sync_to_async(Notification.objects.create)(user=self.user, title='Two', message='Second')
+
+        communicator = self.communicator(self.token.key)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'count': 2})
+        await communicator.disconnect()
+
+    async def test_new_notification_is_pushed(self):
+        communicator = self.communicator(self.token.key)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'count': 0})
+
+        await database_sync_to_async(Notification.objects.create)(user=self.user, title='Hello', message='Pushed')
+
+        # A warm Redis counter also pushes the new unread count; skip past it
+        event = await communicator.receive_json_from(timeout=2)
+        if event['type'] == 'unread_count':
+            self.assertEqual(event['count'], 1)
+            event = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['notification']['title'], 'Hello')
+        await communicator.disconnect()
+
+    async def test_ping_gets_pong(self):
+        communicator = self.communicator(self.token.key)
+        await communicator.connect()
+        await communicator.receive_json_from()
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+        await communicator.disconnect()
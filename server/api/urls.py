@@ -19,7 +19,7 @@ from .views import (
     get_agent_dashboard_stats, get_my_clients,
 
     # Real-time metrics
-    get_realtime_metrics,
+    get_realtime_metrics, get_metrics_history, get_post_metrics, get_engagement_analytics,
 
     # Analytics views
     analytics_overview, client_performance_report,
@@ -34,6 +34,8 @@ from .views.admin.bank_settings_views import (
     get_pending_verifications,
     approve_payment_verification
 )
+from .views.admin.sync_scheduler_views import sync_scheduler_stats
+from .views.admin.http_metrics_views import http_client_metrics
 
 
 from .views.auth_views import (
@@ -225,6 +227,8 @@ urlpatterns = [
     path('social-accounts/<uuid:account_id>/disconnect/', disconnect_account, name='disconnect_account'),
     path('social-accounts/<uuid:account_id>/sync/', trigger_manual_sync, name='trigger_sync'),
     path('social-accounts/<uuid:account_id>/status/', get_sync_status, name='sync_status'),
+    path('admin/sync-scheduler/', sync_scheduler_stats, name='sync_scheduler_stats'),
+    path('admin/http-metrics/', http_client_metrics, name='http_client_metrics'),
     
     # Dashboard statistics
     path('dashboard/stats/', dashboard_stats_view, name='dashboard_stats'),
@@ -236,6 +240,9 @@ urlpatterns = [
 
     # Real-time metrics endpoints
     path('metrics/realtime/', get_realtime_metrics, name='realtime_metrics'),
+    path('metrics/history/', get_metrics_history, name='metrics_history'),
+    path('metrics/posts/', get_post_metrics, name='post_metrics'),
+    path('metrics/engagement/', get_engagement_analytics, name='engagement_analytics'),
     
     # PAYPAL BILLING ENDPOINTS - Updated for PayPal
     # Subscription management
@@ -0,0 +1,65 @@
+# server/api/utils/crypto.py
+"""
+Cached token encryption for stored OAuth credentials
+
+- One MultiFernet per process: ENCRYPTION_KEY encrypts, ENCRYPTION_KEY_FALLBACKS
+  still decrypt, so keys can be rotated without a flag day.
+- Decrypted credentials are kept in process memory for a short TTL, keyed by
+  account, field and a digest of the ciphertext (the token version). A token
+  refresh changes the ciphertext, so stale plaintext is never served.
+"""
+
+import hashlib
+import threading
+import time
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, MultiFernet
+from django.conf import settings
+
+_credentials = {}
+_credentials_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_cipher():
+    """Process-wide MultiFernet; call get_cipher.cache_clear() after changing keys"""
+    keys = [settings.ENCRYPTION_KEY] + list(settings.ENCRYPTION_KEY_FALLBACKS)
+    return MultiFernet([Fernet(key.encode()) for key in keys if key])
+
+
+def encrypt(value):
+    return get_cipher().encrypt(value.encode()).decode()
+
+
+def decrypt(token):
+    return get_cipher().decrypt(token.encode()).decode()
+
+
+def rotate(token):
+    """Re-encrypt a token under the current primary key"""
+    return get_cipher().rotate(token.encode()).decode()
+
+
+def token_version(token):
+    """Short digest identifying one encrypted value"""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def decrypt_cached(owner_id, field, token):
+    """Decrypt through the short-TTL credential cache"""
+    key = (str(owner_id), field, token_version(token))
+    now = time.monotonic()
+
+    entry = _credentials.get(key)
+    if entry and entry[1] > now:
+        return entry[0]
+
+    value = decrypt(token)
+    with _credentials_lock:
+        # Drop expired entries while we hold the lock so the cache stays small
+        for stale in [k for k, (_, expires) in _credentials.items() if expires <= now]:
+            del _credentials[stale]
+        _credentials[key] = (value, now + settings.CREDENTIAL_CACHE_TTL)
+    return value
+
@@ -0,0 +1,189 @@
+# server/api/utils/export.py
+"""
+Streaming CSV/XLSX exports
+
+Rows are read with queryset.iterator(chunk_size=...) (a server-side cursor on
+Postgres) and encoded as they arrive, so memory stays flat whatever the size
+of the export and the first bytes go out before the query has finished.
+
+    columns = [('Date', 'date'), ('Followers', 'followers_count')]
+    return export_response(queryset.values(...), columns, 'metrics', 'csv')
+
+XLSX is written as a minimal workbook (one sheet, inline strings) through
+zipfile on a non-seekable stream, so no spreadsheet library is needed.
+"""
+
+import csv
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _rows(rows, columns):
+    """Yield one list of cell values per row; rows may be a queryset of .values() dicts"""
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield [_cell(row[key] if isinstance(key, str) else key(row)) for _, key in columns]
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if timezone.is_aware(value) \
+            else value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None:
+        return ''
+    return value
+
+
+# ---------- CSV ----------
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow([header for header, _ in columns])  # BOM so Excel reads UTF-8
+    for values in _rows(rows, columns):
+        yield writer.writerow(values)
+
+
+# ---------- XLSX ----------
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable sink; the generator drains it after every write"""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, bool):
+            cells.append(f'<c t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def stream_xlsx(rows, columns, sheet_name='Export'):
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        workbook.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_START + _xlsx_row([header for header, _ in columns])).encode())
+            pending = []
+            for values in _rows(rows, columns):
+                pending.append(_xlsx_row(values))
+                if len(pending) >= 500:
+                    sheet.write(''.join(pending).encode())
+                    pending = []
+                    yield buffer.drain()
+            sheet.write((''.join(pending) + XLSX_SHEET_END).encode())
+    yield buffer.drain()
+
+
+# ---------- response ----------
+
+def export_response(rows, columns, filename, export_format, sheet_name='Export'):
+    """
+    StreamingHttpResponse for rows in 'csv' or 'xlsx'
+
+    columns is a list of (header, key) where key is a row key or a callable taking the row.
+    """
+    if export_format == 'xlsx':
+        content = stream_xlsx(rows, columns, sheet_name)
+    else:
+        export_format = 'csv'
+        content = stream_csv(rows, columns)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    # Keep proxies from buffering the whole body before the first byte
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,41 @@
+# server/api/utils/google_api.py
+"""
+Google API client helpers
+
+build() re-reads and parses the discovery document on every call. The parsed
+document is cached per process here and services are built from it, and
+credential refreshes go through the shared pooled HTTP client.
+"""
+
+import json
+from functools import lru_cache
+
+from google.auth.transport.requests import Request
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+from .http_client import get_http_client
+
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest'
+
+
+@lru_cache(maxsize=None)
+def get_discovery_document(api, version):
+    """Parsed discovery document, from the client's bundled copy when available"""
+    document = discovery_cache.get_static_doc(api, version)
+    if document is None:
+        response = get_http_client('google').get(DISCOVERY_URL.format(api=api, version=version))
+        response.raise_for_status()
+        document = response.text
+    return json.loads(document)
+
+
+def build_service(api, version, credentials):
+    """Equivalent of googleapiclient.discovery.build using the cached document"""
+    # build_from_document normalises the dict in place on first use; later builds leave it unchanged
+    return build_from_document(get_discovery_document(api, version), credentials=credentials)
+
+
+def auth_request():
+    """google.auth transport for token refreshes, on the shared keep-alive session"""
+    return Request(session=get_http_client('google').session)
@@ -0,0 +1,155 @@
+# server/api/utils/http_client.py
+"""
+Shared HTTP client for outbound integrations (Instagram, PayPal, OAuth providers, Resend)
+
+One keep-alive session per integration, reused for the life of the process, with
+per-host connection pools, default timeouts, retries with jittered exponential
+backoff and per-call latency metrics. Get a client with get_http_client(name);
+settings.HTTP_CLIENTS holds the per-integration overrides.
+"""
+
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+# Upper bound on a single backoff sleep, including a server-provided Retry-After
+MAX_BACKOFF_SECONDS = 30
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class HttpClient:
+    """Pooled, instrumented wrapper around a requests.Session"""
+
+    def __init__(self, name, connect_timeout=5, read_timeout=20, max_retries=2,
+                 backoff_factor=0.5, pool_connections=10, pool_maxsize=10):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session = requests.Session()
+        # pool_connections = number of hosts kept, pool_maxsize = keep-alive sockets per host
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        """
+        Send a request, retrying connection errors and retryable statuses
+
+        POST/PATCH are only retried when the caller marks them idempotent
+        (e.g. PayPal calls carrying a PayPal-Request-Id). Returns the final
+        response; callers keep their own raise_for_status() handling.
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = self.max_retries + 1 if idempotent else 1
+        host = urlsplit(url).netloc
+
+        for attempt in range(1, attempts + 1):
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(host, time.monotonic() - started, error=True)
+                if attempt == attempts:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{self.name} {method} {host} failed ({e}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            elapsed = time.monotonic() - started
+            self._record(host, elapsed, error=response.status_code >= 500)
+            self._log_call(method, host, response.status_code, elapsed)
+
+            if response.status_code in RETRY_STATUSES and attempt < attempts:
+                delay = self._backoff(attempt, response.headers.get('Retry-After'))
+                logger.warning(
+                    f"{self.name} {method} {host} returned {response.status_code}; "
+                    f"retry {attempt} in {delay:.2f}s"
+                )
+                response.close()
+                time.sleep(delay)
+                continue
+
+            return response
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring Retry-After when given in seconds"""
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF_SECONDS)
+        ceiling = min(self.backoff_factor * (2 ** attempt), MAX_BACKOFF_SECONDS)
+        return random.uniform(0, ceiling)
+
+    def _log_call(self, method, host, status_code, elapsed):
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= settings.HTTP_SLOW_CALL_MS:
+            logger.warning(f"Slow {self.name} call: {method} {host} -> {status_code} in {elapsed_ms:.0f}ms")
+        else:
+            logger.debug(f"{self.name} {method} {host} -> {status_code} in {elapsed_ms:.0f}ms")
+
+    def _record(self, host, elapsed, error=False):
+        with self._metrics_lock:
+            stats = self._metrics.setdefault(host, {
+                'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            elapsed_ms = elapsed * 1000
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def metrics(self):
+        """Per-host call counts and latency for this process"""
+        with self._metrics_lock:
+            return {
+                host: {
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['calls'], 1),
+                    'max_ms': round(stats['max_ms'], 1),
+                }
+                for host, stats in self._metrics.items()
+            }
+
+
+def get_http_client(name):
+    """Return the process-wide client for an integration, creating it on first use"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                options = {
+                    **settings.HTTP_CLIENTS.get('default', {}),
+                    **settings.HTTP_CLIENTS.get(name, {}),
+                }
+                client = _clients[name] = HttpClient(name, **options)
+    return client
+
+
+def http_metrics():
+    """Latency metrics for every client created in this process"""
+    return {name: client.metrics() for name, client in list(_clients.items())}
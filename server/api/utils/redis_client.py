@@ -0,0 +1,24 @@
+# server/api/utils/redis_client.py
+"""
+Shared Redis connection for cross-worker coordination (rate limits, locks, queues)
+Uses its own database so it never collides with Celery (db 0) or the Django cache (db 1)
+"""
+
+import redis
+from django.conf import settings
+
+_connection = None
+
+
+def get_redis():
+    """Return the process-wide Redis client, creating its connection pool on first use"""
+    global _connection
+    if _connection is None:
+        _connection = redis.Redis.from_url(
+            settings.COORDINATION_REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True,
+        )
+    return _connection
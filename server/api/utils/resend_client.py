@@ -0,0 +1,52 @@
+# server/api/utils/resend_client.py
+"""
+Minimal Resend API client routed through the shared HTTP client
+Replaces resend.Emails.send, which opens a fresh connection for every email
+"""
+
+import uuid
+
+from django.conf import settings
+
+from .http_client import get_http_client
+
+RESEND_API_URL = 'https://api.resend.com'
+
+
+class ResendError(Exception):
+    """Raised when Resend rejects a send"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _post(path, payload, idempotency_key=None):
+    response = get_http_client('resend').post(
+        f"{RESEND_API_URL}{path}",
+        json=payload,
+        headers={
+            'Authorization': f'Bearer {settings.RESEND_API_KEY}',
+            # Resend drops duplicate sends with the same key. Without a caller key
+            # only the HTTP client's own retries of this call are covered.
+            'Idempotency-Key': idempotency_key or str(uuid.uuid4()),
+        },
+        idempotent=True
+    )
+    if response.status_code != 200:
+        try:
+            message = response.json().get('message', response.text)
+        except ValueError:
+            message = response.text
+        raise ResendError(f"Resend returned {response.status_code}: {message}", response.status_code)
+    return response.json()
+
+
+def send_email(params, idempotency_key=None):
+    """Send one email; params use the Resend API shape (from, to, subject, html)"""
+    return _post('/emails', params, idempotency_key)
+
+
+def send_batch(params_list, idempotency_key=None):
+    """Send up to 100 emails in a single request"""
+    return _post('/emails/batch', params_list, idempotency_key)
@@ -0,0 +1,128 @@
+# server/api/utils/time_series.py
+"""
+Bucketed and cumulative time series for any queryset and date field
+
+On Postgres a single statement joins generate_series() buckets to the grouped
+rows and computes the running total with a window function, so the cost does
+not grow with the number of buckets. Other backends run the same grouped
+query and fill the buckets in Python.
+
+    series = time_series(
+        Invoice.objects.filter(status='paid'), 'paid_at',
+        start, end, granularity='month', value=Sum('amount')
+    )
+    # [{'bucket': date(2026, 8, 1), 'value': Decimal('300'), 'cumulative': Decimal('4100')}, ...]
+
+'cumulative' includes every row before start, e.g. total clients to date.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Trunc
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def bucket_start(day, granularity):
+    """Start of the day/week (Monday)/month bucket containing day"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    if granularity == 'day':
+        return day + timedelta(days=1)
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _grouped(queryset, date_field, end, granularity, value):
+    """Rows up to end grouped into buckets: (bucket, value) pairs"""
+    end_field = f"{date_field}__date__lt" if _is_datetime(queryset, date_field) else f"{date_field}__lt"
+    return queryset.filter(**{
+        end_field: next_bucket(bucket_start(end, granularity), granularity)
+    }).annotate(
+        _bucket=Trunc(date_field, granularity)
+    ).values('_bucket').annotate(
+        _value=value if value is not None else Count('pk')
+    ).values_list('_bucket', '_value').order_by()
+
+
+def _is_datetime(queryset, date_field):
+    return queryset.model._meta.get_field(date_field).get_internal_type() == 'DateTimeField'
+
+
+def time_series(queryset, date_field, start, end, granularity='day', value=None):
+    """
+    Series of {'bucket', 'value', 'cumulative'} dicts covering start..end
+
+    value is an aggregate expression (defaults to Count('pk')); empty buckets are zero.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    start = bucket_start(_as_date(start), granularity)
+    end = bucket_start(_as_date(end), granularity)
+    grouped = _grouped(queryset, date_field, end, granularity, value)
+
+    if connection.vendor == 'postgresql':
+        return _series_sql(grouped, start, end, granularity)
+    return _series_python(grouped, start, end, granularity)
+
+
+def _series_sql(grouped, start, end, granularity):
+    inner_sql, inner_params = grouped.query.sql_with_params()
+    sql = f"""
+        WITH buckets AS (
+            SELECT generate_series(%s::date, %s::date, %s::interval)::date AS bucket
+        ),
+        grouped AS (
+            SELECT bucket_value._bucket::date AS bucket, bucket_value._value AS value
+            FROM ({inner_sql}) AS bucket_value (_bucket, _value)
+        ),
+        baseline AS (
+            SELECT COALESCE(SUM(value), 0) AS total FROM grouped WHERE bucket < %s::date
+        )
+        SELECT
+            buckets.bucket,
+            COALESCE(grouped.value, 0),
+            baseline.total + SUM(COALESCE(grouped.value, 0)) OVER (ORDER BY buckets.bucket)
+        FROM buckets
+        CROSS JOIN baseline
+        LEFT JOIN grouped ON grouped.bucket = buckets.bucket
+        ORDER BY buckets.bucket
+    """
+    params = [start, end, f"1 {granularity}", *inner_params, start]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            {'bucket': bucket, 'value': bucket_value, 'cumulative': cumulative}
+            for bucket, bucket_value, cumulative in cursor.fetchall()
+        ]
+
+
+def _series_python(grouped, start, end, granularity):
+    values = {}
+    for bucket, bucket_value in grouped:
+        values[_as_date(bucket)] = bucket_value or 0
+
+    cumulative = sum(v for bucket, v in values.items() if bucket < start)
+    series = []
+    bucket = start
+    while bucket <= end:
+        bucket_value = values.get(bucket, 0)
+        cumulative += bucket_value
+        series.append({'bucket': bucket, 'value': bucket_value, 'cumulative': cumulative})
+        bucket = next_bucket(bucket, granularity)
+    return series
@@ -0,0 +1,40 @@
+# server/api/utils/ws_auth.py
+"""
+WebSocket authentication with DRF tokens
+
+Browsers can't set an Authorization header on a WebSocket handshake, so the
+token is read from the ?token= query parameter. Connections without a token
+keep the session user resolved by AuthMiddlewareStack.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+
+
+@database_sync_to_async
+def get_token_user(key):
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework.authtoken.models import Token
+
+    token = Token.objects.select_related('user').filter(key=key).first()
+    if token is None or not token.user.is_active:
+        return AnonymousUser()
+    return token.user
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    """Set scope['user'] from a ?token= DRF auth token"""
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        key = query.get('token', [None])[0]
+        if key:
+            scope = dict(scope, user=await get_token_user(key))
+        return await super().__call__(scope, receive, send)
+
+
+def TokenAuthMiddlewareStack(inner):
+    return AuthMiddlewareStack(TokenAuthMiddleware(inner))
@@ -18,7 +18,10 @@ from .client.task_views import TaskViewSet
 from .client.content_views import ContentPostViewSet, ContentRequestViewSet
 from .client.performance_views import PerformanceDataViewSet
 from .admin.invoice_views import InvoiceViewSet
-from .client.social_views import SocialMediaAccountViewSet, get_realtime_metrics
+from .client.social_views import (
+    SocialMediaAccountViewSet, get_realtime_metrics, get_metrics_history, get_post_metrics,
+    get_engagement_analytics
+)
 from .message_views import MessageViewSet
 from .notification_views import NotificationViewSet
 from .file_views import FileViewSet
@@ -171,7 +174,7 @@ __all__ = [
     'get_agent_dashboard_stats', 'get_my_clients',
 
     # Analytics and metrics
-    'get_realtime_metrics', 'analytics_overview', 'client_performance_report',
+    'get_realtime_metrics', 'get_metrics_history', 'get_post_metrics', 'get_engagement_analytics', 'analytics_overview', 'client_performance_report',
 
     # Message functionality
     'send_message_to_admin', 'send_message_to_client',
@@ -0,0 +1,25 @@
+# server/api/views/admin/http_metrics_views.py
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.utils import timezone
+import os
+
+from ...utils.http_client import http_metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def http_client_metrics(request):
+    """Outbound HTTP latency per integration and host for the serving process (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Only admins can view HTTP client metrics'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'pid': os.getpid(),
+        'clients': http_metrics(),
+        'generated_at': timezone.now().isoformat()
+    })
@@ -0,0 +1,34 @@
+# server/api/views/admin/sync_scheduler_views.py
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.utils import timezone
+import logging
+
+from ...services.sync_scheduler import SyncScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_scheduler_stats(request):
+    """Queue depth and drain-rate metrics for the social sync scheduler (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Only admins can view sync scheduler stats'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        platforms = [SyncScheduler(platform).stats() for platform in SyncScheduler.platforms()]
+    except Exception as e:
+        logger.error(f"Failed to read sync scheduler stats: {str(e)}")
+        return Response({'error': 'Sync scheduler unavailable'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return Response({
+        'platforms': platforms,
+        'total_queue_depth': sum(p['queue_depth'] for p in platforms),
+        'generated_at': timezone.now().isoformat()
+    })
@@ -8,8 +8,11 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from ...models import Client, ClientAccessRequest, Agent, User, Notification, ClientServiceSettings
+from ...models import Client, ClientAccessRequest, Agent, Notification, ClientServiceSettings
+from ...pagination import DirectoryPagination
 from ...serializers import ClientAccessRequestSerializer, ClientAccessRequestCreateSerializer, ClientSerializer, AgentSerializer
+from ...services.client_directory import ClientDirectory
+from ...services.notification_service import NotificationService
 
 
 class ClientAccessRequestViewSet(viewsets.ModelViewSet):
@@ -111,14 +114,12 @@ class ClientAccessRequestViewSet(viewsets.ModelViewSet):
         access_request = serializer.save()
 
         # Notify all admins
-        admins = User.objects.filter(role='admin')
-        for admin in admins:
-            Notification.objects.create(
-                user=admin,
-                title='New Client Access Request',
-                message=f'{agent.user.get_full_name()} ({agent.get_department_display()}) has requested access to {client.name} for {service_type} services',
-                notification_type='general'
-            )
+        NotificationService.notify_audience(
+            'admins',
+            title='New Client Access Request',
+            message=f'{agent.user.get_full_name()} ({agent.get_department_display()}) has requested access to {client.name} for {service_type} services',
+            notification_type='general'
+        )
 
         return Response(
             ClientAccessRequestSerializer(access_request).data,
@@ -140,24 +141,18 @@ class ClientAccessRequestViewSet(viewsets.ModelViewSet):
                 'error': 'Agent profile not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Get all clients
-        all_clients = Client.objects.filter(status='active')
-        available_clients = []
+        # Cached per department; assignment changes bump the directory generation (api/signals.py)
+        params = {
+            name: request.query_params[name]
+            for name in ('page', 'page_size') if request.query_params.get(name)
+        }
 
-        for client in all_clients:
-            # Check if client has an agent for this service type
-            service_setting = ClientServiceSettings.objects.filter(
-                client=client,
-                service_type=agent.department,
-                assigned_agent__isnull=False
-            ).first()
+        def compute():
+            paginator = DirectoryPagination()
+            page = paginator.paginate_queryset(ClientDirectory.available(agent.department), request)
+            return paginator.get_paginated_response(ClientSerializer(page, many=True).data).data
 
-            # Client is available if no agent assigned for this service
-            if not service_setting:
-                available_clients.append(client)
-
-        serializer = ClientSerializer(available_clients, many=True)
-        return Response(serializer.data)
+        return Response(ClientDirectory.get_or_compute(f'available:{agent.department}', params, compute))
 
     @action(detail=False, methods=['get'])
     def pending_requests(self, request):
@@ -7,8 +7,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 
-from ..models import Agent, Client, User, ClientServiceSettings
+from ..models import Agent, Client, User
+from ..pagination import DirectoryPagination
 from ..serializers import AgentSerializer, ClientSerializer
+from ..services.client_directory import ClientDirectory
+from ..services.dashboard_cache import DashboardStatsCache
 
 
 class AgentViewSet(viewsets.ModelViewSet):
@@ -71,7 +74,7 @@ class AgentViewSet(viewsets.ModelViewSet):
     def assigned_clients(self, request, pk=None):
         """Get all clients assigned to this agent"""
         agent = self.get_object()
-        clients = Client.objects.filter(assigned_agent=agent)
+        clients = Client.objects.with_classification().filter(assigned_agent=agent)
         serializer = ClientSerializer(clients, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -193,6 +196,56 @@ class AgentViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
+def _agent_dashboard_stats(agent):
+    """Aggregates behind the agent dashboard (cached by get_agent_dashboard_stats)"""
+    # Get assigned clients
+    assigned_clients = Client.objects.filter(assigned_agent=agent)
+    active_clients = assigned_clients.filter(status='active')
+
+    stats = {
+        'total_clients': assigned_clients.count(),
+        'active_clients': active_clients.count(),
+        'pending_clients': assigned_clients.filter(status='pending').count(),
+        'capacity_used': (assigned_clients.count() / agent.max_clients * 100) if agent.max_clients > 0 else 0,
+        'max_clients': agent.max_clients,
+        'department': agent.department,
+        'specialization': agent.specialization,
+    }
+
+    # Add service-specific metrics (Phase 6)
+    if agent.department == 'website':
+        from ..models import WebsiteProject, WebsiteVersion
+        # Website agent metrics
+        website_projects = WebsiteProject.objects.filter(client__in=assigned_clients)
+        stats['website_projects'] = {
+            'total': website_projects.count(),
+            'in_development': website_projects.filter(status='in_development').count(),
+            'review': website_projects.filter(status='review').count(),
+            'completed': website_projects.filter(status='completed').count(),
+        }
+        stats['versions_uploaded'] = WebsiteVersion.objects.filter(agent=agent).count()
+
+    elif agent.department == 'marketing':
+        from ..models import ContentPost, Campaign
+        # Marketing agent metrics
+        content_posts = ContentPost.objects.filter(client__in=assigned_clients)
+        campaigns = Campaign.objects.filter(agent=agent)
+        stats['content_posts'] = {
+            'total': content_posts.count(),
+            'draft': content_posts.filter(status='draft').count(),
+            'pending': content_posts.filter(status='pending').count(),
+            'approved': content_posts.filter(status='approved').count(),
+            'posted': content_posts.filter(status='posted').count(),
+        }
+        stats['campaigns'] = {
+            'total': campaigns.count(),
+            'active': campaigns.filter(status='active').count(),
+            'completed': campaigns.filter(status='completed').count(),
+        }
+
+    return stats
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_agent_dashboard_stats(request):
@@ -207,52 +260,10 @@ def get_agent_dashboard_stats(request):
 
     try:
         agent = Agent.objects.get(user=user)
-
-        # Get assigned clients
-        assigned_clients = Client.objects.filter(assigned_agent=agent)
-        active_clients = assigned_clients.filter(status='active')
-
-        stats = {
-            'total_clients': assigned_clients.count(),
-            'active_clients': active_clients.count(),
-            'pending_clients': assigned_clients.filter(status='pending').count(),
-            'capacity_used': (assigned_clients.count() / agent.max_clients * 100) if agent.max_clients > 0 else 0,
-            'max_clients': agent.max_clients,
-            'department': agent.department,
-            'specialization': agent.specialization,
-        }
-
-        # Add service-specific metrics (Phase 6)
-        if agent.department == 'website':
-            from ..models import WebsiteProject, WebsiteVersion
-            # Website agent metrics
-            website_projects = WebsiteProject.objects.filter(client__in=assigned_clients)
-            stats['website_projects'] = {
-                'total': website_projects.count(),
-                'in_development': website_projects.filter(status='in_development').count(),
-                'review': website_projects.filter(status='review').count(),
-                'completed': website_projects.filter(status='completed').count(),
-            }
-            stats['versions_uploaded'] = WebsiteVersion.objects.filter(agent=agent).count()
-
-        elif agent.department == 'marketing':
-            from ..models import ContentPost, Campaign
-            # Marketing agent metrics
-            content_posts = ContentPost.objects.filter(client__in=assigned_clients)
-            campaigns = Campaign.objects.filter(agent=agent)
-            stats['content_posts'] = {
-                'total': content_posts.count(),
-                'draft': content_posts.filter(status='draft').count(),
-                'pending': content_posts.filter(status='pending').count(),
-                'approved': content_posts.filter(status='approved').count(),
-                'posted': content_posts.filter(status='posted').count(),
-            }
-            stats['campaigns'] = {
-                'total': campaigns.count(),
-                'active': campaigns.filter(status='active').count(),
-                'completed': campaigns.filter(status='completed').count(),
-            }
-
+        stats = DashboardStatsCache.get_or_compute(
+            DashboardStatsCache.key('agent', agent.id),
+            lambda: _agent_dashboard_stats(agent)
+        )
         return Response(stats)
 
     except Agent.DoesNotExist:
@@ -265,7 +276,12 @@ def get_agent_dashboard_stats(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_my_clients(request):
-    """Get clients visible to the logged-in agent based on their department"""
+    """
+    Get clients visible to the logged-in agent based on their department
+
+    Supports ?search=. Sending ?page= or ?page_size= returns a paginated
+    response; without them the whole directory is returned as a list.
+    """
     user = request.user
 
     if user.role != 'agent':
@@ -276,88 +292,40 @@ def get_my_clients(request):
 
     try:
         agent = Agent.objects.get(user=user)
-
-        # Get ALL clients, then filter based on agent's department and client classification
-        all_clients = Client.objects.all().select_related('user', 'assigned_agent__user').prefetch_related(
-            'social_accounts', 'website_projects', 'service_settings__assigned_agent__user'
+    except Agent.DoesNotExist:
+        return Response(
+            {'error': 'Agent profile not found'},
+            status=status.HTTP_404_NOT_FOUND
         )
 
-        # Filter clients based on agent department and client type
-        eligible_clients = []
-        for client in all_clients:
-            client_type = client.client_type
-
-            # Marketing agents should only see clients who need marketing services
-            if agent.department == 'marketing':
-                if client_type in ['marketing', 'full']:
-                    eligible_clients.append(client)
-
-            # Website agents should only see clients who need website services
-            elif agent.department == 'website':
-                if client_type in ['website', 'full']:
-                    eligible_clients.append(client)
-
-            # For other departments or 'none' type clients, include them (fallback)
-            else:
-                eligible_clients.append(client)
-
-        serializer = ClientSerializer(eligible_clients, many=True, context={'request': request})
-        clients_data = serializer.data
-
-        # Add flags to indicate service-specific assignment status
-        for client_data in clients_data:
-            client = Client.objects.get(id=client_data['id'])
-
-            # Check service-specific assignment for agent's department
-            my_service_setting = ClientServiceSettings.objects.filter(
-                client=client,
-                service_type=agent.department,
-                assigned_agent=agent
-            ).first()
-
-            # Check if client has any agent for this service type
-            service_setting = ClientServiceSettings.objects.filter(
-                client=client,
-                service_type=agent.department,
-                assigned_agent__isnull=False
-            ).first()
-
-            # Get service settings for both marketing and website
-            marketing_setting = ClientServiceSettings.objects.filter(
-                client=client,
-                service_type='marketing',
-                assigned_agent__isnull=False
-            ).select_related('assigned_agent__user').first()
-
-            website_setting = ClientServiceSettings.objects.filter(
-                client=client,
-                service_type='website',
-                assigned_agent__isnull=False
-            ).select_related('assigned_agent__user').first()
-
-            # Set flags
-            client_data['is_assigned_to_me'] = my_service_setting is not None
-            client_data['is_available'] = service_setting is None  # Available for my service type
+    params = {
+        name: request.query_params[name]
+        for name in ('search', 'page', 'page_size') if request.query_params.get(name)
+    }
+
+    def compute():
+        clients = ClientDirectory.directory(agent, search=params.get('search'))
+        paginator = None
+        if 'page' in params or 'page_size' in params:
+            paginator = DirectoryPagination()
+            clients = paginator.paginate_queryset(clients, request)
+
+        clients_data = ClientSerializer(clients, many=True, context={'request': request}).data
+        for client, client_data in zip(clients, clients_data):
+            client_data['is_assigned_to_me'] = client.is_assigned_to_me
+            client_data['is_available'] = client.is_available  # Available for my service type
 
             # Service-specific agent info
-            client_data['has_marketing_agent'] = marketing_setting is not None
-            client_data['has_website_agent'] = website_setting is not None
-            client_data['marketing_agent_name'] = marketing_setting.assigned_agent.user.get_full_name() if marketing_setting else None
-            client_data['website_agent_name'] = website_setting.assigned_agent.user.get_full_name() if website_setting else None
+            client_data['has_marketing_agent'] = client._marketing_agent_id is not None
+            client_data['has_website_agent'] = client._website_agent_id is not None
+            client_data['marketing_agent_name'] = client._marketing_agent_name.strip() if client._marketing_agent_id else None
+            client_data['website_agent_name'] = client._website_agent_name.strip() if client._website_agent_id else None
 
             # Backwards compatibility
-            if client.assigned_agent:
-                client_data['assigned_agent_name'] = client.assigned_agent.user.get_full_name()
-            else:
-                client_data['assigned_agent_name'] = None
-
-            # Add active services
-            client_data['active_services'] = client.active_services if hasattr(client, 'active_services') else []
+            client_data['assigned_agent_name'] = client.assigned_agent.user.get_full_name() if client.assigned_agent else None
 
-        return Response(clients_data)
+        if paginator is not None:
+            return paginator.get_paginated_response(clients_data).data
+        return clients_data
 
-    except Agent.DoesNotExist:
-        return Response(
-            {'error': 'Agent profile not found'},
-            status=status.HTTP_404_NOT_FOUND
-        )
+    return Response(ClientDirectory.get_or_compute(agent.id, params, compute))
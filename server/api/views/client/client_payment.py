@@ -42,11 +42,12 @@ class ClientViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
+        clients = Client.objects.with_classification()
         if self.request.user.role == 'admin':
-            return Client.objects.all()
+            return clients
         else:
             # Clients can only see their own profile
-            return Client.objects.filter(user=self.request.user)
+            return clients.filter(user=self.request.user)
     
     def perform_create(self, serializer):
         # Only admins can create clients
@@ -15,9 +15,11 @@ import zipfile
 import io
 
 from ...models import ContentPost, ContentImage, Client, SocialMediaAccount
+from ...pagination import FeedPagination
 from ...serializers import ContentPostSerializer, ContentImageSerializer
 from ...services.notification_service import NotificationService  # For admin-only notifications
 from ...services.notification_trigger_service import NotificationTriggerService  # For client notifications (in-app + email)
+from ...services.dashboard_cache import DashboardStatsCache
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,9 @@ class ContentPostViewSet(ModelViewSet):
     serializer_class = ContentPostSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = FeedPagination
+    # The content list is ordered by schedule, not creation
+    keyset_field = 'scheduled_date'
     
     def get_queryset(self):
         queryset = ContentPost.objects.all()
@@ -526,6 +531,7 @@ class ContentPostViewSet(ModelViewSet):
                 status='posted',
                 posted_at=timezone.now()
             )
+            DashboardStatsCache.invalidate_clients(content_posts.values_list('client_id', flat=True))
             
             return Response({
                 'message': f'{content_posts.count()} posts marked as posted',
@@ -557,12 +563,8 @@ class ContentPostViewSet(ModelViewSet):
                 approved_at=timezone.now()
             )
             
-            # 🔔 NEW: Notify each client their content was approved (in-app + email)
-            for content in content_posts:
-                NotificationTriggerService.trigger_content_approved(
-                    client_user=content.client.user,
-                    content_post=content
-                )
+            # 🔔 NEW: Notify each client their content was approved (in-app in one insert + email)
+            NotificationTriggerService.trigger_content_approved_bulk(content_posts)
             
             message = f'{content_posts.count()} posts approved'
         else:  # reject
@@ -571,16 +573,12 @@ class ContentPostViewSet(ModelViewSet):
                 update_data['admin_message'] = feedback
             content_posts.update(**update_data)
             
-            # 🔔 NEW: Notify each client their content needs revision (in-app + email)
-            for content in content_posts:
-                NotificationTriggerService.trigger_content_rejected(
-                    client_user=content.client.user,
-                    content_post=content,
-                    feedback=feedback
-                )
+            # 🔔 NEW: Notify each client their content needs revision (in-app in one insert + email)
+            NotificationTriggerService.trigger_content_rejected_bulk(content_posts, feedback)
             
             message = f'{content_posts.count()} posts rejected'
         
+        DashboardStatsCache.invalidate_clients(content_posts.values_list('client_id', flat=True))
         return Response({'message': message, 'count': content_posts.count()})
     
     @action(detail=False, methods=['post'])
@@ -6,11 +6,12 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from django.contrib.auth import authenticate, login, logout
-from django.db.models import Sum, Count, Q, Avg
+from django.db.models import Sum, Count, Q, Avg, F
 from django.utils import timezone
 from datetime import datetime, timedelta
 import calendar
 import logging
+import uuid
 from django.urls import path
 from celery import shared_task
 
@@ -23,7 +24,7 @@ from ...serializers import (
     NotificationSerializer, DashboardStatsSerializer,
     ClientDashboardStatsSerializer, BulkTaskUpdateSerializer,
     BulkContentApprovalSerializer, FileUploadSerializer,
-    SocialMediaAccountSerializer, RealTimeMetricsSerializer
+    SocialMediaAccountSerializer, RealTimeMetricsSerializer, SyncLogSerializer
 )
 
 logger = logging.getLogger(__name__)
@@ -31,8 +32,10 @@ logger = logging.getLogger(__name__)
 from ...models import (
     User, Client, Task, ContentPost, PerformanceData,
     Message, Invoice, TeamMember, Project, File, Notification,
-    SocialMediaAccount, RealTimeMetrics
+    SocialMediaAccount, RealTimeMetrics, PostMetrics, AccountMetricsSnapshot
 )
+from ...pagination import KeysetPagination
+from ...utils.export import EXPORT_FORMATS, export_response
 
 # Custom Permission for Social Media Accounts
 class SocialAccountPermission(permissions.BasePermission):
@@ -87,7 +90,7 @@ class SocialMediaAccountViewSet(ModelViewSet):
         logger.info(f"SocialMediaAccountViewSet.get_queryset called for user: {user.email}, role: {user.role}")
 
         if user.role == 'admin':
-            return SocialMediaAccount.objects.all()
+            return SocialMediaAccount.objects.select_related('client', 'metrics_snapshot')
 
         elif user.role == 'agent':
             # Agents can see accounts of their assigned clients
@@ -155,22 +158,29 @@ class SocialMediaAccountViewSet(ModelViewSet):
             except Client.DoesNotExist:
                 return Response({'error': 'Client profile not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Trigger sync task (import here to avoid circular imports)
-        if account.platform == 'instagram':
-            from api.tasks import sync_instagram_data
-            task = sync_instagram_data.delay(str(account.id))
-        elif account.platform == 'youtube':
-            from api.tasks import sync_youtube_data
-            task = sync_youtube_data.delay(str(account.id))
-        else:
+        # Queue through the scheduler (import here to avoid circular imports)
+        from api.services.sync_scheduler import SyncScheduler
+        if account.platform not in SyncScheduler.platforms():
             return Response({'error': f'Sync not supported for {account.platform}'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
+        task_id = SyncScheduler(account.platform).request_sync(account)
+        
         return Response({
-            'message': f'Sync triggered for {account.platform} account',
-            'task_id': task.id
+            'message': f'Sync {"triggered" if task_id else "queued"} for {account.platform} account',
+            'task_id': task_id,
+            'queued': task_id is None
         })
     
+    @action(detail=True, methods=['get'])
+    def sync_logs(self, request, pk=None):
+        """Sync history for an account, newest first (cursor paginated)"""
+        account = self.get_object()
+        paginator = KeysetPagination()
+        paginator.keyset_field = 'started_at'
+        page = paginator.paginate_queryset(account.sync_logs.all(), request, view=self)
+        return paginator.get_paginated_response(SyncLogSerializer(page, many=True).data)
+    
     @action(detail=True, methods=['post'])
     def disconnect(self, request, pk=None):
         """Disconnect social media account"""
@@ -191,11 +201,93 @@ class SocialMediaAccountViewSet(ModelViewSet):
         
         return Response({'message': f'{account.platform} account disconnected'})
 
+
+def _metrics_accounts(request):
+    """Active accounts the user may read metrics for, narrowed by ?client_id (admin) and ?account_id"""
+    if request.user.role == 'client':
+        try:
+            client = request.user.client_profile
+            accounts = SocialMediaAccount.objects.filter(client=client, is_active=True)
+        except Client.DoesNotExist:
+            return None, Response({'error': 'Client profile not found'}, status=status.HTTP_404_NOT_FOUND)
+    elif request.user.role == 'admin':
+        accounts = SocialMediaAccount.objects.filter(is_active=True)
+        client_id = request.query_params.get('client_id')
+        if client_id:
+            try:
+                accounts = accounts.filter(client_id=uuid.UUID(client_id))
+            except ValueError:
+                return None, Response({'error': 'client_id must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return None, Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    account_id = request.query_params.get('account_id')
+    if account_id:
+        try:
+            accounts = accounts.filter(id=uuid.UUID(account_id))
+        except ValueError:
+            return None, Response({'error': 'account_id must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
+    return accounts, None
+
+
+def _query_days(request, default):
+    return min(max(int(request.query_params.get('days', default)), 1), 3650)
+
+
+# Account fields exported alongside metrics rows
+ACCOUNT_COLUMNS = {
+    'client': F('account__client__name'),
+    'platform': F('account__platform'),
+    'username': F('account__username'),
+}
+
+METRICS_EXPORT_COLUMNS = [
+    ('Client', 'client'),
+    ('Platform', 'platform'),
+    ('Account', 'username'),
+    ('Date', 'date'),
+    ('Followers', 'followers_count'),
+    ('Following', 'following_count'),
+    ('Posts', 'posts_count'),
+    ('Engagement rate', 'engagement_rate'),
+    ('Reach', 'reach'),
+    ('Impressions', 'impressions'),
+    ('Profile views', 'profile_views'),
+    ('Website clicks', 'website_clicks'),
+    ('Daily growth', 'daily_growth'),
+]
+
+POST_METRICS_COLUMNS = [
+    ('Client', 'client'),
+    ('Platform', 'platform'),
+    ('Account', 'username'),
+    ('Post ID', 'post_id'),
+    ('Posted at', 'posted_at'),
+    ('Media type', 'media_type'),
+    ('Caption', 'caption'),
+    ('Likes', 'likes'),
+    ('Comments', 'comments'),
+    ('Shares', 'shares'),
+    ('Saves', 'saves'),
+    ('Reach', 'reach'),
+    ('Impressions', 'impressions'),
+    ('Engagement rate', 'engagement_rate'),
+]
+
+
 # Real-time metrics endpoint
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_realtime_metrics(request):
-    """Get real-time metrics for connected accounts"""
+    """
+    Get real-time metrics for connected accounts
+    ?export=csv|xlsx streams the latest snapshot of every account as a spreadsheet
+    """
+    export_format = request.query_params.get('export')
+    if export_format and export_format not in EXPORT_FORMATS:
+        return Response({'error': f"export must be one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
     if request.user.role == 'client':
         try:
             client = request.user.client_profile
@@ -206,25 +298,151 @@ def get_realtime_metrics(request):
         # Admin can see all accounts
         accounts = SocialMediaAccount.objects.filter(is_active=True)
     
+    # Latest metrics for every account in a single join against the snapshot table
+    accounts = accounts.filter(metrics_snapshot__isnull=False).select_related('metrics_snapshot')
+    
+    if export_format:
+        rows = AccountMetricsSnapshot.objects.filter(account__in=accounts).annotate(
+            **ACCOUNT_COLUMNS
+        ).order_by('account_id').values(*[key for _, key in METRICS_EXPORT_COLUMNS], 'updated_at')
+        return export_response(
+            rows, METRICS_EXPORT_COLUMNS + [('Last updated', 'updated_at')],
+            f"realtime_metrics_{timezone.now().date()}", export_format, 'Metrics'
+        )
+    
     metrics_data = []
     for account in accounts:
-        # Get latest metrics for each account
-        latest_metrics = RealTimeMetrics.objects.filter(
-            account=account
-        ).order_by('-date').first()
-        
-        if latest_metrics:
-            metrics_data.append({
-                'account': {
-                    'id': str(account.id),
-                    'platform': account.platform,
-                    'username': account.username
-                },
-                'followers_count': latest_metrics.followers_count,
-                'engagement_rate': float(latest_metrics.engagement_rate),
-                'reach': latest_metrics.reach,
-                'daily_growth': latest_metrics.daily_growth,
-                'last_updated': latest_metrics.created_at
-            })
+        latest_metrics = account.metrics_snapshot
+        metrics_data.append({
+            'account': {
+                'id': str(account.id),
+                'platform': account.platform,
+                'username': account.username
+            },
+            'followers_count': latest_metrics.followers_count,
+            'engagement_rate': float(latest_metrics.engagement_rate),
+            'reach': latest_metrics.reach,
+            'daily_growth': latest_metrics.daily_growth,
+            'last_updated': latest_metrics.updated_at
+        })
     
     return Response({'data': metrics_data})
+
+
+# Metrics history endpoint (daily rows for short ranges, rollups for long ones)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_metrics_history(request):
+    """
+    Follower/engagement history for connected accounts over ?days= (default 30)
+    ?export=csv|xlsx streams the stored daily rows per account instead
+    """
+    from ...services.metrics_rollup_service import MetricsRollupService
+
+    export_format = request.query_params.get('export')
+    if export_format and export_format not in EXPORT_FORMATS:
+        return Response({'error': f"export must be one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        days = _query_days(request, 30)
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    accounts, error = _metrics_accounts(request)
+    if error:
+        return error
+    
+    end_date = timezone.now().date()
+    start_date = end_date - timedelta(days=days)
+    
+    if export_format:
+        rows = RealTimeMetrics.objects.filter(
+            account__in=accounts, date__gte=start_date, date__lte=end_date
+        ).annotate(**ACCOUNT_COLUMNS).order_by('account_id', 'date').values(
+            *[key for _, key in METRICS_EXPORT_COLUMNS]
+        )
+        return export_response(
+            rows, METRICS_EXPORT_COLUMNS, f"metrics_{start_date}_{end_date}", export_format, 'Metrics'
+        )
+    
+    history = MetricsRollupService.get_history(accounts, start_date, end_date)
+    
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        **history
+    })
+
+
+# Post metrics endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_post_metrics(request):
+    """
+    Per-post metrics for connected accounts posted in the last ?days= (default 30)
+    Returns the newest ?limit= posts (default 100); ?export=csv|xlsx streams all of them
+    """
+    export_format = request.query_params.get('export')
+    if export_format and export_format not in EXPORT_FORMATS:
+        return Response({'error': f"export must be one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        days = _query_days(request, 30)
+        limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+    except ValueError:
+        return Response({'error': 'days and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    accounts, error = _metrics_accounts(request)
+    if error:
+        return error
+    
+    since = timezone.now() - timedelta(days=days)
+    rows = PostMetrics.objects.filter(
+        account__in=accounts, posted_at__gte=since
+    ).annotate(**ACCOUNT_COLUMNS).order_by('-posted_at').values(*[key for _, key in POST_METRICS_COLUMNS])
+    
+    if export_format:
+        return export_response(
+            rows, POST_METRICS_COLUMNS, f"post_metrics_{since.date()}_{timezone.now().date()}",
+            export_format, 'Post metrics'
+        )
+    
+    return Response({'data': list(rows[:limit])})
+
+
+# Engagement analytics endpoint
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_engagement_analytics(request):
+    """
+    Engagement distribution for connected accounts over ?days= (default 90)
+    Summary percentiles, weekday/hour breakdowns, per-account totals and a
+    daily series with a trailing ?window= day average (default 7).
+    Admins see every client unless ?client_id is given; ?platform narrows further.
+    """
+    from ...services.engagement_analytics import EngagementAnalyticsService
+
+    try:
+        days = min(_query_days(request, 90), 730)
+        window = min(max(int(request.query_params.get('window', 7)), 1), 90)
+    except ValueError:
+        return Response({'error': 'days and window must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    accounts, error = _metrics_accounts(request)
+    if error:
+        return error
+    
+    platform = request.query_params.get('platform')
+    if platform:
+        accounts = accounts.filter(platform=platform)
+    
+    if request.user.role == 'client':
+        scope = f"client:{request.user.client_profile.id}"
+    else:
+        scope = f"client:{request.query_params['client_id']}" if request.query_params.get('client_id') else 'all'
+    cache_key = (
+        f"engagement_analytics:{scope}:{request.query_params.get('account_id', '')}:"
+        f"{platform or ''}:{days}:{window}"
+    )
+    
+    return Response(EngagementAnalyticsService.get_analytics(accounts, days, window, cache_key=cache_key))
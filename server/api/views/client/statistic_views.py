@@ -33,15 +33,12 @@ from ...models import (
     Message, Invoice, TeamMember, Project, File, Notification,
     SocialMediaAccount, RealTimeMetrics
 )
+from ...services.dashboard_cache import DashboardStatsCache
+from ...utils.export import EXPORT_FORMATS, export_response
 
 # Dashboard Statistics Views
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_stats_view(request):
-    """Get dashboard statistics for admin users"""
-    if request.user.role != 'admin':
-        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-    
+def _admin_dashboard_stats():
+    """Aggregates behind the admin dashboard (cached by dashboard_stats_view)"""
     # Calculate stats
     current_month = timezone.now().replace(day=1)
     
@@ -83,6 +80,18 @@ def dashboard_stats_view(request):
         'total_followers_delivered': total_followers,
         'monthly_growth_rate': monthly_growth_rate
     }
+    return stats_data
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_stats_view(request):
+    """Get dashboard statistics for admin users"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+    
+    stats_data = DashboardStatsCache.get_or_compute(
+        DashboardStatsCache.key('admin'), _admin_dashboard_stats
+    )
     
     serializer = DashboardStatsSerializer(stats_data)
     return Response(serializer.data)
@@ -102,8 +111,11 @@ def client_dashboard_stats_view(request):
     # Import the aggregation service
     from ...services.metrics_aggregation_service import MetricsAggregationService
     
-    # Get REAL-TIME stats (not monthly aggregation)
-    stats = MetricsAggregationService.get_client_real_time_stats(client)
+    # Get REAL-TIME stats (not monthly aggregation), cached until the client's metrics change
+    stats = dict(DashboardStatsCache.get_or_compute(
+        DashboardStatsCache.key('client', client.id),
+        lambda: MetricsAggregationService.get_client_real_time_stats(client)
+    ))
     
     # Add payment info
     stats['next_payment_amount'] = float(client.monthly_fee)
@@ -118,48 +130,47 @@ def client_dashboard_stats_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def analytics_overview(request):
-    """Get analytics overview"""
+    """
+    Get analytics overview
+    Optional ?days= (default 90) and ?granularity=day|week|month for client growth
+    """
     if request.user.role != 'admin':
         return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
     
+    from ...utils.time_series import time_series, next_bucket, GRANULARITIES
+    
+    granularity = request.query_params.get('granularity', 'week')
+    if granularity not in GRANULARITIES:
+        return Response({'error': f"granularity must be one of {', '.join(GRANULARITIES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        days = min(max(int(request.query_params.get('days', 90)), 1), 3650)
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
     # Date range
     end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=90)  # Last 3 months
-    
-    # Client growth
-    client_growth = []
-    current_date = start_date
-    while current_date <= end_date:
-        count = Client.objects.filter(created_at__date__lte=current_date).count()
-        client_growth.append({
-            'date': current_date,
-            'count': count
-        })
-        current_date += timedelta(days=7)  # Weekly data points
-    
-    # Revenue trends (SQLite/Postgres compatible)
-    from django.db import connection
-    if connection.vendor == 'sqlite':
-        revenue_data = Invoice.objects.filter(
-            status='paid',
-            paid_at__date__gte=start_date
-        ).extra(
-            select={'month': 
-                "date(paid_at, 'start of month')"  # SQLite-compatible date formatting
-            }
-        ).values('month').annotate(
-            total=Sum('amount')
-        ).order_by('month')
-    else:
-        from django.db.models.functions import TruncMonth
-        revenue_data = Invoice.objects.filter(
-            status='paid',
-            paid_at__date__gte=start_date
-        ).annotate(
-            month=TruncMonth('paid_at')
-        ).values('month').annotate(
-            total=Sum('amount')
-        ).order_by('month')
+    start_date = end_date - timedelta(days=days)
+    
+    # Client growth: clients created on or before each date, one point per bucket
+    # labelled with its last day (today for the current one), which the running total covers
+    client_growth = [
+        {
+            'date': min(next_bucket(point['bucket'], granularity) - timedelta(days=1), end_date),
+            'count': point['cumulative'],
+        }
+        for point in time_series(Client.objects.all(), 'created_at', start_date, end_date, granularity)
+    ]
+    
+    # Revenue trends: paid invoice totals per month, only months with payments
+    revenue_data = [
+        {'month': point['bucket'], 'total': point['value']}
+        for point in time_series(
+            Invoice.objects.filter(status='paid'), 'paid_at',
+            start_date, end_date, 'month', value=Sum('amount')
+        )
+        if point['value']
+    ]
     
     # Task completion rates
     task_stats = Task.objects.aggregate(
@@ -175,15 +186,33 @@ def analytics_overview(request):
     
     return Response({
         'client_growth': client_growth,
-        'revenue_trends': list(revenue_data),
+        'revenue_trends': revenue_data,
         'task_stats': task_stats,
         'completion_rate': completion_rate
     })
 
+PERFORMANCE_EXPORT_COLUMNS = [
+    ('Month', 'month'),
+    ('Followers', 'followers'),
+    ('Engagement', 'engagement'),
+    ('Reach', 'reach'),
+    ('Clicks', 'clicks'),
+    ('Impressions', 'impressions'),
+    ('Growth rate', 'growth_rate'),
+]
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def client_performance_report(request, client_id):
-    """Generate client performance report"""
+    """
+    Generate client performance report
+    ?export=csv|xlsx streams the monthly performance rows as a spreadsheet
+    """
+    export_format = request.query_params.get('export')
+    if export_format and export_format not in EXPORT_FORMATS:
+        return Response({'error': f"export must be one of {', '.join(EXPORT_FORMATS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
     try:
         client = Client.objects.get(id=client_id)
     except Client.DoesNotExist:
@@ -202,6 +231,15 @@ def client_performance_report(request, client_id):
         month__gte=start_date
     ).order_by('month')
     
+    if export_format:
+        return export_response(
+            performance_data.values(*[key for _, key in PERFORMANCE_EXPORT_COLUMNS]),
+            PERFORMANCE_EXPORT_COLUMNS,
+            f"performance_{client.id}_{start_date}_{end_date}",
+            export_format,
+            'Performance'
+        )
+    
     # Calculate summary metrics
     if performance_data.exists():
         latest = performance_data.last()
@@ -234,10 +272,17 @@ def client_performance_report(request, client_id):
     
     serializer = PerformanceDataSerializer(performance_data, many=True)
     
+    # Six months of account history comes from the weekly rollups
+    from ...services.metrics_rollup_service import MetricsRollupService
+    metrics_history = MetricsRollupService.get_history(
+        client.social_accounts.filter(is_active=True), start_date, end_date
+    )
+    
     return Response({
         'client_name': client.name,
         'period': f"{start_date} to {end_date}",
         'performance_data': serializer.data,
+        'metrics_history': metrics_history,
         'summary': summary,
         'content_stats': content_stats
     })
@@ -26,6 +26,7 @@ from ...serializers import (
     SocialMediaAccountSerializer, RealTimeMetricsSerializer
 )
 from ...services.notification_trigger_service import NotificationTriggerService
+from ...services.dashboard_cache import DashboardStatsCache
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +104,7 @@ class TaskViewSet(ModelViewSet):
             update_data = {k: v for k, v in serializer.validated_data.items() if k != 'task_ids' and v is not None}
             
             updated_count = Task.objects.filter(id__in=task_ids).update(**update_data)
+            DashboardStatsCache.invalidate(admin=True)
             return Response({'message': f'{updated_count} tasks updated'})
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -7,8 +7,11 @@ from django.db.models import Q
 from django.utils import timezone
 import logging
 
-from ..models import User, Client, Message
+from ..models import User, Client, Message, ConversationParticipant
+from ..pagination import FeedPagination
 from ..serializers import MessageSerializer
+from ..services.conversation_service import ConversationService
+from ..services.notification_service import NotificationService
 from ..services.notification_trigger_service import NotificationTriggerService
 
 logger = logging.getLogger(__name__)
@@ -54,6 +57,8 @@ class MessageViewSet(ModelViewSet):
     """Message management viewset"""
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+    keyset_field = 'timestamp'
     
     def get_queryset(self):
         return Message.objects.filter(
@@ -68,40 +73,49 @@ class MessageViewSet(ModelViewSet):
         NotificationTriggerService.trigger_message_notification(
             recipient_user=message.receiver,
             sender_name=sender_name,
-            message_preview=message.text[:200] if hasattr(message, 'text') else message.message[:200]
+            message_preview=message.content[:200],
+            sender_id=self.request.user.id
         )
     
+    def perform_update(self, serializer):
+        was_read = serializer.instance.read
+        message = serializer.save()
+        if message.read != was_read:
+            if message.read:
+                ConversationService.message_read(message)
+            else:
+                ConversationService.message_unread(message)
+    
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Mark message as read"""
         message = self.get_object()
         if message.receiver == request.user:
-            message.read = True
-            message.save()
+            # Conditional update so a repeated click can't decrement twice
+            if Message.objects.filter(pk=message.pk, read=False).update(read=True):
+                ConversationService.message_read(message)
             return Response({'message': 'Message marked as read'})
         else:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
     @action(detail=False, methods=['get'])
     def conversations(self, request):
-        """Get conversation list"""
-        # Get unique conversation partners
-        conversations = Message.objects.filter(
-            Q(sender=request.user) | Q(receiver=request.user)
-        ).values(
-            'sender', 'receiver', 'sender__first_name', 'sender__last_name',
-            'receiver__first_name', 'receiver__last_name'
-        ).distinct()
-        
-        # Process conversations to get unique partners
-        partners = set()
-        for conv in conversations:
-            if conv['sender'] != request.user.id:
-                partners.add((conv['sender'], f"{conv['sender__first_name']} {conv['sender__last_name']}"))
-            if conv['receiver'] != request.user.id:
-                partners.add((conv['receiver'], f"{conv['receiver__first_name']} {conv['receiver__last_name']}"))
+        """Get conversation list, most recent first"""
+        conversations = []
+        for participant in ConversationService.inbox(request.user):
+            partner = participant.other_user
+            last_message = participant.conversation.last_message
+            conversations.append({
+                'id': partner.id,
+                'name': f"{partner.first_name} {partner.last_name}",
+                'conversation_id': participant.conversation_id,
+                'last_message': MessageSerializer(last_message).data if last_message else None,
+                'last_message_at': participant.last_message_at,
+                'unread_count': participant.unread_count,
+                'last_read_at': participant.last_read_at,
+            })
         
-        return Response([{'id': p[0], 'name': p[1]} for p in partners])
+        return Response(conversations)
     
     
 @api_view(['POST'])
@@ -128,7 +142,7 @@ def send_message_to_admin(request):
         
         # 🔔 NEW: Notify admin of new message
         sender_name = f"{request.user.first_name} {request.user.last_name}" if request.user.first_name else request.user.email
-        NotificationService.notify_message_to_admin(sender_name)
+        NotificationService.notify_message_to_admin(sender_name, sender_id=request.user.id)
         
         logger.info(f"Message sent from {request.user.username} to admin {admin_user.username}")
         
@@ -176,7 +190,8 @@ def send_message_to_client(request):
         sender_name = f"{request.user.first_name} {request.user.last_name}" if request.user.first_name else "Admin"
         NotificationService.notify_message_received(
             recipient_user=client_user,
-            sender_name=sender_name
+            sender_name=sender_name,
+            sender_id=request.user.id
         )
         
         logger.info(f"Message created successfully with ID: {message.id}")
@@ -204,24 +219,23 @@ def get_admin_conversations(request):
         clients = Client.objects.select_related('user').all()
         conversations = []
         
+        # Last message and unread count per client from the admin's conversation threads
+        threads = {
+            participant.other_user_id: participant
+            for participant in ConversationParticipant.objects.filter(user=request.user).select_related(
+                'conversation__last_message__sender', 'conversation__last_message__receiver'
+            )
+        }
+        
         for client in clients:
             # Skip clients without user accounts
             if not client.user:
                 logger.warning(f"Client {client.name} has no user account")
                 continue
             
-            # Get latest message with this client
-            latest_message = Message.objects.filter(
-                Q(sender=request.user, receiver=client.user) |
-                Q(sender=client.user, receiver=request.user)
-            ).order_by('-timestamp').first()
-            
-            # Count unread messages from this client
-            unread_count = Message.objects.filter(
-                sender=client.user,
-                receiver=request.user,
-                read=False
-            ).count()
+            thread = threads.get(client.user.id)
+            latest_message = thread.conversation.last_message if thread else None
+            unread_count = thread.unread_count if thread else 0
             
             conversation_data = {
                 'id': str(client.id),
@@ -276,15 +290,8 @@ def get_conversation_messages(request, user_id):
         logger.info(f"Found {messages.count()} messages")
         
         # Mark messages from the other user as read
-        unread_messages = messages.filter(
-            sender_id=user_id,
-            receiver=request.user,
-            read=False
-        )
-        
-        unread_count = unread_messages.count()
+        unread_count = ConversationService.mark_conversation_read(request.user, other_user.id)
         if unread_count > 0:
-            unread_messages.update(read=True)
             logger.info(f"Marked {unread_count} messages as read")
         
         serializer = MessageSerializer(messages, many=True)
@@ -33,25 +33,46 @@ from ..models import (
     Message, Invoice, TeamMember, Project, File, Notification,
     SocialMediaAccount, RealTimeMetrics
 )
+from ..pagination import FeedPagination
+from ..services.unread_counter import UnreadCounter
 
 class NotificationViewSet(ModelViewSet):
     """Notification management viewset"""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+    keyset_field = 'created_at'
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        queryset = Notification.objects.filter(user=self.request.user)
+        read = self.request.query_params.get('read')
+        if read in ('true', 'false'):
+            queryset = queryset.filter(read=read == 'true')
+        return queryset.order_by('-created_at')
+    
+    def perform_update(self, serializer):
+        was_read = serializer.instance.read
+        notification = serializer.save()
+        if notification.read != was_read:
+            UnreadCounter.adjust({notification.user_id: -1 if notification.read else 1})
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         """Mark notification as read"""
         notification = self.get_object()
-        notification.read = True
-        notification.save()
+        # Conditional update so a repeated click can't decrement twice
+        if Notification.objects.filter(pk=notification.pk, read=False).update(read=True):
+            UnreadCounter.decrement(notification.user_id)
         return Response({'message': 'Notification marked as read'})
     
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
-        updated_count = self.get_queryset().update(read=True)
-        return Response({'message': f'{updated_count} notifications marked as read'})
\ No newline at end of file
+        updated_count = Notification.objects.filter(user=request.user, read=False).update(read=True)
+        UnreadCounter.decrement(request.user.id, updated_count)
+        return Response({'message': f'{updated_count} notifications marked as read'})
+    
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Unread badge count, served from the per-user Redis counter"""
+        return Response({'unread_count': UnreadCounter.get(request.user.id)})
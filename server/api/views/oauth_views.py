@@ -16,6 +16,9 @@ from urllib.parse import urlencode, parse_qs
 from ..models import SocialMediaAccount, Client
 from ..services.instagram_service import InstagramService
 from ..services.youtube_service import YouTubeService
+from ..services.sync_lock import SyncLock
+from ..utils.http_client import get_http_client
+from ..services.sync_scheduler import SyncScheduler
 from ..tasks import sync_instagram_data, sync_youtube_data
 
 logger = logging.getLogger(__name__)
@@ -111,7 +114,7 @@ def handle_instagram_callback(request):
             'code': code
         }
         
-        token_response = requests.post(token_url, data=token_data)
+        token_response = get_http_client('oauth').post(token_url, data=token_data)
         token_response.raise_for_status()
         token_result = token_response.json()
         
@@ -127,7 +130,7 @@ def handle_instagram_callback(request):
         
         # Get user info
         user_info_url = f"https://graph.facebook.com/v18.0/me?fields=id,username&access_token={long_lived_token['access_token']}"
-        user_response = requests.get(user_info_url)
+        user_response = get_http_client('instagram').get(user_info_url)
         user_response.raise_for_status()
         user_data = user_response.json()
         
@@ -154,8 +157,8 @@ def handle_instagram_callback(request):
         if 'oauth_user_id' in request.session:
             del request.session['oauth_user_id']
         
-        # Trigger initial sync
-        sync_instagram_data.delay(str(account.id))
+        # Trigger initial sync (attaches to a running one on reconnect)
+        SyncLock(account.id).dispatch(sync_instagram_data, source='oauth_connect')
         
         logger.info(f"Instagram account connected: {account.username} for user {user.email}")
         
@@ -275,7 +278,7 @@ def handle_youtube_callback(request):
         }
         
         logger.info("Exchanging code for tokens...")
-        token_response = requests.post(token_url, data=token_data)
+        token_response = get_http_client('oauth').post(token_url, data=token_data)
         token_response.raise_for_status()
         token_result = token_response.json()
         
@@ -288,8 +291,8 @@ def handle_youtube_callback(request):
         logger.info("Access token received, fetching channel info...")
         
         # Get YouTube channel info
-        from googleapiclient.discovery import build
         from google.oauth2.credentials import Credentials
+        from ..utils.google_api import build_service
         
         creds = Credentials(
             token=token_result['access_token'],
@@ -299,7 +302,7 @@ def handle_youtube_callback(request):
             client_secret=settings.GOOGLE_CLIENT_SECRET
         )
         
-        youtube = build('youtube', 'v3', credentials=creds)
+        youtube = build_service('youtube', 'v3', creds)
         channels_response = youtube.channels().list(
             part='snippet,statistics',
             mine=True
@@ -348,7 +351,7 @@ def handle_youtube_callback(request):
         
         # Trigger sync
         try:
-            sync_youtube_data.delay(str(account.id))
+            SyncLock(account.id).dispatch(sync_youtube_data, source='oauth_connect')
             logger.info(f"Sync task queued for account {account.id}")
         except Exception as sync_error:
             logger.warning(f"Failed to queue sync task: {sync_error}")
@@ -430,9 +433,9 @@ def get_connected_accounts(request):
                           status=status.HTTP_403_FORBIDDEN)
 
         account_data = []
-        for account in accounts:
+        for account in accounts.select_related('metrics_snapshot'):
             # Get latest metrics
-            latest_metrics = account.metrics.order_by('-date').first()
+            latest_metrics = getattr(account, 'metrics_snapshot', None)
 
             account_info = {
                 'id': str(account.id),
@@ -521,6 +524,17 @@ def trigger_manual_sync(request, account_id):
             return Response({'error': 'Account not found or inactive'}, 
                           status=status.HTTP_404_NOT_FOUND)
         
+        # A sync already running for this account is shared rather than duplicated
+        in_flight = SyncLock(account.id).current()
+        if in_flight:
+            return Response({
+                'message': f'A sync is already running for {account.platform} account "{account.username}"',
+                'task_id': in_flight['task_id'],
+                'attached': True,
+                'queued': False,
+                'account_id': str(account.id)
+            })
+        
         # Check if account was synced recently to prevent abuse
         if account.last_sync and account.last_sync > timezone.now() - timedelta(minutes=15):
             return Response({
@@ -528,18 +542,22 @@ def trigger_manual_sync(request, account_id):
                 'last_sync': account.last_sync
             }, status=status.HTTP_429_TOO_MANY_REQUESTS)
         
-        # Trigger sync based on platform
-        if account.platform == 'instagram':
-            task = sync_instagram_data.delay(str(account.id))
-        elif account.platform == 'youtube':
-            task = sync_youtube_data.delay(str(account.id))
-        else:
+        if account.platform not in SyncScheduler.platforms():
             return Response({'error': f'Manual sync not supported for {account.platform}'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
+        # Manual requests jump the scheduler queue but still respect the API rate limits
+        task_id = SyncScheduler(account.platform).request_sync(account)
+        
         return Response({
-            'message': f'Manual sync triggered for {account.platform} account "{account.username}"',
-            'task_id': task.id,
+            'message': (
+                f'Manual sync triggered for {account.platform} account "{account.username}"'
+                if task_id else
+                f'Manual sync queued for {account.platform} account "{account.username}"'
+            ),
+            'task_id': task_id,
+            'attached': False,
+            'queued': task_id is None,
             'account_id': str(account.id)
         })
         
@@ -595,6 +613,7 @@ def get_sync_status(request, account_id):
                 'last_sync': account.last_sync,
             },
             'sync_logs': sync_logs,
+            'in_flight': SyncLock(account.id).current(),
             'can_sync_now': not account.last_sync or account.last_sync <= timezone.now() - timedelta(minutes=15)
         })
         
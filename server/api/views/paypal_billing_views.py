@@ -12,11 +12,13 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+import uuid
 import requests
 import dateutil.parser
 from ..models import Client, Invoice, User
 from ..services.notification_service import NotificationService  # For subscription cancellation
 from ..services.notification_trigger_service import NotificationTriggerService
+from ..utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +104,7 @@ class PayPalAPIClient:
         self.client_secret = getattr(settings, 'PAYPAL_CLIENT_SECRET', '')
         self.base_url = getattr(settings, 'PAYPAL_BASE_URL', 'https://api-m.sandbox.paypal.com')
         self._access_token = None
+        self.http = get_http_client('paypal')
     
     def get_access_token(self):
         """Get PayPal access token"""
@@ -116,11 +119,12 @@ class PayPalAPIClient:
         data = 'grant_type=client_credentials'
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 url,
                 headers=headers,
                 data=data,
-                auth=(self.client_id, self.client_secret)
+                auth=(self.client_id, self.client_secret),
+                idempotent=True
             )
             response.raise_for_status()
             token_data = response.json()
@@ -137,10 +141,12 @@ class PayPalAPIClient:
         headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {token}',
+            # Lets PayPal deduplicate the call if the client retries it
+            'PayPal-Request-Id': str(uuid.uuid4()),
         }
         
         try:
-            response = requests.request(method, url, headers=headers, json=data)
+            response = self.http.request(method, url, headers=headers, json=data, idempotent=True)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
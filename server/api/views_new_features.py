@@ -17,6 +17,7 @@ from .serializers import (
     WalletSerializer, TransactionSerializer, TopUpWalletSerializer, GiveawaySerializer,
     SupportTicketSerializer, SupportTicketCreateSerializer, TicketMessageSerializer
 )
+from .pagination import FeedPagination
 from .services.notification_trigger_service import NotificationTriggerService
 
 
@@ -426,6 +427,8 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for transactions"""
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
+    keyset_field = 'created_at'
 
     def get_queryset(self):
         if self.request.user.role == 'admin':
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark for Instagram post-insights fetching
+Compares the old one-request-per-post path with the batched fetch used by
+InstagramService.sync_recent_posts, against a local stub Graph API server.
+
+Usage (from the server directory):
+    python benchmark_instagram_insights.py --posts 25 --latency-ms 80
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import django
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
+sys.path.insert(0, str(Path(__file__).parent))
+django.setup()
+
+import requests
+from api.services.instagram_service import InstagramService
+
+
+def insights_payload():
+    """Body returned by the stub for a single /{post_id}/insights call"""
+    return {
+        'data': [
+            {'name': metric, 'values': [{'value': 100}]}
+            for metric in InstagramService.POST_INSIGHT_METRICS.split(',')
+        ]
+    }
+
+
+def make_handler(latency):
+    """Build a request handler that sleeps `latency` seconds per HTTP request"""
+
+    class StubGraphHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            self._send_json(insights_payload())
+
+        def do_POST(self):
+            time.sleep(latency)
+            length = int(self.headers.get('Content-Length', 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            batch = json.loads(form['batch'][0])
+            self._send_json([
+                {'code': 200, 'body': json.dumps(insights_payload())}
+                for _ in batch
+            ])
+
+    return StubGraphHandler
+
+
+def build_service(base_url):
+    """InstagramService bound to a stand-in account that needs no database"""
+    account = SimpleNamespace(
+        username='benchmark',
+        account_id='17841400000000000',
+        get_access_token=lambda: 'token',
+    )
+    service = InstagramService(account)
+    service.base_url = base_url
+    return service
+
+
+def fetch_sequential(service, post_ids):
+    """Previous behaviour: one blocking requests.get per post, no shared session"""
+    results = {}
+    for post_id in post_ids:
+        response = requests.get(
+            f"{service.base_url}/{post_id}/insights",
+            params={'metric': service.POST_INSIGHT_METRICS, 'access_token': service.access_token}
+        )
+        response.raise_for_status()
+        results[post_id] = service._parse_post_insights(response.json())
+    return results
+
+
+def fetch_concurrent(service, post_ids):
+    """Fallback path: bounded thread pool over the pooled session"""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=service.MAX_CONCURRENT_REQUESTS) as executor:
+        return dict(zip(post_ids, executor.map(service._get_post_insights, post_ids)))
+
+
+def time_call(func, *args, rounds=3):
+    """Best wall-clock time over a few rounds"""
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=25, help='Posts per account')
+    parser.add_argument('--latency-ms', type=int, default=80, help='Simulated round-trip latency')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    service = build_service(base_url)
+    post_ids = [str(18000000000000000 + i) for i in range(args.posts)]
+
+    print(f"\n{'='*60}")
+    print(f"  {args.posts} posts per account, {args.latency_ms} ms simulated latency")
+    print('='*60)
+
+    sequential, expected = time_call(fetch_sequential, service, post_ids)
+    concurrent, concurrent_result = time_call(fetch_concurrent, service, post_ids)
+    batched, batched_result = time_call(service._get_posts_insights, post_ids)
+
+    assert concurrent_result == expected, 'Concurrent fetch returned different insights'
+    assert batched_result == expected, 'Batched fetch returned different insights'
+
+    print(f"  Sequential (per-post requests.get): {sequential * 1000:8.1f} ms")
+    print(f"  Concurrent (pooled session):         {concurrent * 1000:8.1f} ms  ({sequential / concurrent:.1f}x)")
+    print(f"  Batched (Graph API batch):           {batched * 1000:8.1f} ms  ({sequential / batched:.1f}x)")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
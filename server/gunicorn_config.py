@@ -1,4 +1,26 @@
 # Gunicorn configuration file
+#
+# Gunicorn serves HTTP through server.wsgi with sync workers, which can't hold
+# WebSocket connections. /ws/ (api/routing.py) is served by a separate daphne
+# process running the ASGI app, next to this one:
+#
+#   daphne -b 127.0.0.1 -p 8001 --proxy-headers server.asgi:application
+#
+# nginx sends /ws/ to it with the upgrade headers, everything else to :8000:
+#
+#   location /ws/ {
+#       proxy_pass http://127.0.0.1:8001;
+#       proxy_http_version 1.1;
+#       proxy_set_header Upgrade $http_upgrade;
+#       proxy_set_header Connection "upgrade";
+#       proxy_set_header Host $host;
+#       proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+#       proxy_read_timeout 3600s;
+#   }
+#
+# Both processes and the Celery workers publish through the Redis channel
+# layer (the default; never CHANNEL_LAYER=memory here), so pushes from any of
+# them reach the sockets held by daphne.
 import multiprocessing
 
 # Server socket
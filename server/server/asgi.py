@@ -2,6 +2,8 @@
 ASGI config for server project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections are routed to the consumers in
+api/routing.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,23 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 
-application = get_asgi_application()
+# Set up Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from api.routing import websocket_urlpatterns  # noqa: E402
+from api.utils.ws_auth import TokenAuthMiddlewareStack  # noqa: E402
+
+# The frontend is served from its own origin, so handshakes are checked against the CORS origins
+websocket_origins = ['*'] if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) else settings.CORS_ALLOWED_ORIGINS
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': OriginValidator(
+        TokenAuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        websocket_origins,
+    ),
+})
@@ -32,9 +32,15 @@ app.conf.task_routes = {
     'api.tasks.sync_instagram_data': {'queue': 'instagram'},
     'api.tasks.sync_youtube_data': {'queue': 'youtube'},
     'api.tasks.sync_all_client_data': {'queue': 'sync'},
+    'api.tasks.sync_all_youtube_accounts': {'queue': 'sync'},
+    'api.tasks.sync_all_instagram_accounts': {'queue': 'sync'},
+    'api.tasks.drain_sync_queues': {'queue': 'sync'},
     'api.tasks.update_client_monthly_performance': {'queue': 'analytics'},
     'api.tasks.cleanup_old_metrics': {'queue': 'maintenance'},
+    'api.tasks.maintain_metric_partitions': {'queue': 'maintenance'},
     'api.tasks.generate_weekly_reports': {'queue': 'reports'},
+    'api.tasks.send_email_outbox': {'queue': 'email'},
+    'api.tasks.send_notification_digests': {'queue': 'email'},
 }
 
 @app.task(bind=True)
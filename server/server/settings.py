@@ -64,6 +64,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'server.wsgi.application'
+ASGI_APPLICATION = 'server.asgi.application'
 
 # Database - PostgreSQL for production
 DATABASES = {
@@ -216,6 +217,10 @@ LINKEDIN_CLIENT_SECRET = config('LINKEDIN_CLIENT_SECRET', default='')
 
 # Encryption key for storing access tokens (32 characters)
 ENCRYPTION_KEY = config('ENCRYPTION_KEY', default='your-32-character-encryption-key-here')
+# Previous keys, still accepted for decryption while tokens are rotated (manage.py rotate_token_encryption)
+ENCRYPTION_KEY_FALLBACKS = config('ENCRYPTION_KEY_FALLBACKS', default='', cast=lambda v: [k.strip() for k in v.split(',') if k.strip()])
+# Seconds decrypted OAuth tokens stay in process memory
+CREDENTIAL_CACHE_TTL = 300
 
 # ============ EMAIL SERVICE CONFIGURATION ============
 
@@ -230,6 +235,26 @@ EMAIL_FROM_NAME = config('EMAIL_FROM_NAME', default='VisionBoost')
 # Redis connection URL
 REDIS_URL = config('REDIS_URL', default='redis://127.0.0.1:6379')
 
+# Database 2 holds coordination state shared across workers (sync queues, rate-limit buckets)
+COORDINATION_REDIS_URL = f'{REDIS_URL}/2'
+
+# Channel layer for WebSocket push (database 3); CHANNEL_LAYER=memory for tests and single-process runs
+if config('CHANNEL_LAYER', default='redis') == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [f'{REDIS_URL}/3'],
+                'capacity': 1500,
+                'expiry': 30,
+            },
+        },
+    }
+
 # ============ CELERY CONFIGURATION (Uses Redis) ============
 
 # Celery broker and result backend
@@ -253,10 +278,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'api.tasks.sync_all_client_data',
         'schedule': crontab(minute=0, hour='*/4'),
     },
-    # Clean up old metrics weekly
+    # Roll up and expire old metrics nightly (keeps weekly rollups current)
     'cleanup-old-metrics': {
         'task': 'api.tasks.cleanup_old_metrics',
-        'schedule': crontab(minute=0, hour=2, day_of_week=0),
+        'schedule': crontab(minute=30, hour=3),
     },
     # Generate weekly reports
     'generate-weekly-reports': {
@@ -273,6 +298,31 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'api.tasks.sync_all_instagram_accounts',
         'schedule': crontab(minute=0, hour='*/4'),  # Every 4 hours
     },
+    # Keep monthly metrics partitions created ahead of time
+    'maintain-metric-partitions': {
+        'task': 'api.tasks.maintain_metric_partitions',
+        'schedule': crontab(minute=0, hour=3),
+    },
+    # Dispatch a slice of the queued social syncs every minute, within rate limits
+    'drain-sync-queues': {
+        'task': 'api.tasks.drain_sync_queues',
+        'schedule': crontab(),  # Every minute (must match SYNC_SCHEDULER['tick_seconds'])
+    },
+    # Retry due emails and pick up any drain dispatch lost after commit
+    'drain-email-outbox': {
+        'task': 'api.tasks.send_email_outbox',
+        'schedule': crontab(),  # Every minute
+    },
+    # Repair drift in the Redis unread notification counters
+    'reconcile-unread-notification-counts': {
+        'task': 'api.tasks.reconcile_unread_notification_counts',
+        'schedule': crontab(minute='*/15'),
+    },
+    # Email notification digests whose window has closed
+    'send-notification-digests': {
+        'task': 'api.tasks.send_notification_digests',
+        'schedule': crontab(),  # Every minute
+    },
     # Aggregate monthly performance daily at 2 AM
     'aggregate-monthly-performance': {
         'task': 'api.tasks.aggregate_monthly_performance',
@@ -280,22 +330,22 @@ CELERY_BEAT_SCHEDULE = {
     },
     # Check overdue invoices daily at 9 AM
     'check-overdue-invoices': {
-        'task': 'api.tasks.notification_tasks.check_overdue_invoices',
+        'task': 'api.tasks.check_overdue_invoices',
         'schedule': crontab(hour=9, minute=0),  # Run daily at 9 AM
     },
     # Check upcoming invoice due dates daily at 9 AM
     'check-upcoming-invoices': {
-        'task': 'api.tasks.notification_tasks.check_upcoming_invoice_due_dates',
+        'task': 'api.tasks.check_upcoming_invoice_due_dates',
         'schedule': crontab(hour=9, minute=0),  # Run daily at 9 AM
     },
     # Check overdue tasks daily at 9 AM
     'check-overdue-tasks': {
-        'task': 'api.tasks.notification_tasks.check_overdue_tasks',
+        'task': 'api.tasks.check_overdue_tasks',
         'schedule': crontab(hour=9, minute=0),  # Run daily at 9 AM
     },
     # Send monthly performance reports on 1st of month at 10 AM
     'send-monthly-reports': {
-        'task': 'api.tasks.notification_tasks.send_performance_reports',
+        'task': 'api.tasks.send_performance_reports',
         'schedule': crontab(day_of_month=1, hour=10, minute=0),  # 1st of month at 10 AM
     },
 }
@@ -313,6 +363,9 @@ CACHE_TIMEOUTS = {
     'api_response': 300,           # 5 minutes
     'dashboard_stats': 180,        # 3 minutes
     'social_metrics': 900,         # 15 minutes
+    'recipients': 3600,            # 1 hour, invalidated by signals
+    'unread_counts': 86400,        # 1 day, kept in sync on write and reconciled
+    'client_directory': 600,       # 10 minutes, invalidated by signals
 }
 
 # Cache configuration using Redis
@@ -476,6 +529,87 @@ API_RATE_LIMITS = {
     }
 }
 
+# Outbound HTTP clients (api/utils/http_client.py): one pooled session per integration.
+# Timeouts are in seconds; POSTs are only retried when the caller marks them idempotent.
+HTTP_CLIENTS = {
+    'default': {
+        'connect_timeout': 5,
+        'read_timeout': 20,
+        'max_retries': 2,
+        'backoff_factor': 0.5,
+        'pool_connections': 10,
+        'pool_maxsize': 10,
+    },
+    'instagram': {
+        'read_timeout': 30,
+        'pool_maxsize': 8,  # InstagramService.MAX_CONCURRENT_REQUESTS
+    },
+    'paypal': {
+        'read_timeout': 30,
+    },
+    'oauth': {
+        'max_retries': 0,  # Authorization codes are single-use
+    },
+    'resend': {
+        'read_timeout': 15,
+    },
+    'google': {
+        'max_retries': 1,
+    },
+}
+HTTP_SLOW_CALL_MS = 2000
+
+# Transactional email outbox, drained by api.tasks.send_email_outbox on the 'email' queue
+EMAIL_OUTBOX = {
+    'batch_size': 100,              # Resend batch endpoint limit
+    'max_batches_per_run': 50,
+    'dispatch_delay_seconds': 2,    # Emails queued within this window share one drain
+    'max_attempts': 6,
+    'backoff_base_seconds': 30,
+    'backoff_max_seconds': 3600,
+    'claim_timeout_seconds': 600,   # Reclaim rows from a worker that died mid-send
+}
+
+# Coalescing of bursty notifications per (recipient, type, source)
+NOTIFICATION_COALESCING = {
+    'window_seconds': 900,          # Unread in-app notifications keep merging while events arrive within this window
+    'digest_seconds': {             # Email cadence per type; types not listed are emailed immediately
+        'message_received': 900,
+    },
+    'max_digest_previews': 5,       # Latest previews kept per digest email
+    'batch_size': 200,
+}
+
+# Rows fetched per server-side cursor round trip by the streaming CSV/XLSX exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Sync scheduler: the "sync all" beat tasks only queue accounts; drain_sync_queues
+# dispatches them spread over interval_seconds. Bucket sizes are in syncs and are
+# derived from the API call limits above via calls_per_sync.
+SYNC_SCHEDULER = {
+    'tick_seconds': 60,
+    # Per-account single-flight lock; outlives CELERY_TASK_TIME_LIMIT so a slow run keeps it
+    'lock_timeout_seconds': 60 * 60,
+    'platforms': {
+        'instagram': {
+            'interval_seconds': 4 * 60 * 60,  # Matches the sync-instagram-accounts beat
+            'calls_per_sync': 4,  # Profile, insights, media page, insights batch
+            'platform_calls_per_day': API_RATE_LIMITS['instagram']['calls_per_day'],
+            'token_calls_per_hour': API_RATE_LIMITS['instagram']['calls_per_hour'],
+            'burst': 20,
+            'max_dispatch_per_tick': 50,
+        },
+        'youtube': {
+            'interval_seconds': 6 * 60 * 60,  # Matches the sync-youtube-accounts beat
+            'calls_per_sync': 5,  # Quota units: channel, playlist page, videos, analytics
+            'platform_calls_per_day': API_RATE_LIMITS['youtube']['calls_per_day'],
+            'token_calls_per_hour': 100,
+            'burst': 20,
+            'max_dispatch_per_tick': 50,
+        },
+    },
+}
+
 # Data retention settings
 DATA_RETENTION_DAYS = {
     'metrics': 365,  # Keep metrics for 1 year
@@ -484,6 +618,36 @@ DATA_RETENTION_DAYS = {
     'payment_logs': 2555,  # Keep payment logs for 7 years (compliance)
 }
 
+# Tiered retention for account metrics (api/services/metrics_rollup_service.py)
+# Daily RealTimeMetrics -> weekly and monthly MetricsRollup; None keeps a tier forever
+METRICS_RETENTION = {
+    'realtime_metrics': {
+        'daily_days': DATA_RETENTION_DAYS['metrics'],
+        'weekly_days': 3 * 365,
+        'monthly_days': None,
+        'batch_size': 5000,
+        'rollup_window_days': 90,  # Daily rows aggregated per rollup query
+    },
+    'sync_logs': {
+        'days': DATA_RETENTION_DAYS['sync_logs'],
+        'batch_size': 5000,
+    },
+    'max_batches_per_run': 200,  # Per tier, bounds a single cleanup run
+    'daily_query_max_days': 90,  # Longer history queries read the rollups
+}
+
+# Monthly range partitions on Postgres (api/services/partition_service.py)
+# RealTimeMetrics partitions are dropped by cleanup_old_metrics once rolled up.
+# PostMetrics stays a plain table: its upsert key (account, post_id) can't
+# include posted_at, which changes when a scheduled video goes public.
+METRICS_PARTITIONS = {
+    'api.RealTimeMetrics': {
+        'column': 'date',
+        'months_ahead': 3,
+        'retention_days': None,
+    },
+}
+
 # Webhook settings for real-time updates
 WEBHOOK_SECRET = config('WEBHOOK_SECRET', default='your-webhook-secret-key')
 WEBHOOK_VERIFY_TOKEN = config('WEBHOOK_VERIFY_TOKEN', default='your-verify-token')